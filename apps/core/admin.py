@@ -1,3 +1,113 @@
-from django.contrib import admin
+"""Core admin interface: background sync jobs and sync telemetry."""
+import json
+from django.contrib import admin, messages
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from .jobs import enqueue
+from .models import SyncJob, SyncLease, SyncRun, SyncSchedule
 
-# Register your models here.
+
+@admin.register(SyncSchedule)
+class SyncScheduleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'command', 'args', 'interval', 'enabled', 'next_run_at', 'last_enqueued_at']
+    list_filter = ['enabled', 'command']
+    search_fields = ['name']
+    readonly_fields = ['last_enqueued_at', 'created_at', 'updated_at']
+    actions = ['run_now']
+
+    @admin.action(description=_('Queue now'))
+    def run_now(self, request, queryset):
+        for schedule in queryset:
+            enqueue(schedule.command, schedule.args, schedule=schedule, requested_by=request.user.get_username())
+        self.message_user(
+            request,
+            _('Queued %(count)d sync jobs; a sync worker will pick them up.') % {'count': queryset.count()},
+            messages.SUCCESS,
+        )
+
+
+@admin.register(SyncJob)
+class SyncJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'command', 'args', 'status', 'attempts', 'requested_by', 'created_at', 'started_at', 'duration',
+    ]
+    list_filter = ['status', 'command']
+    search_fields = ['command', 'worker', 'requested_by', 'error']
+    readonly_fields = [
+        'lock_key', 'schedule', 'status', 'attempts', 'worker', 'requested_by',
+        'output', 'error', 'created_at', 'started_at', 'finished_at',
+    ]
+    fields = [
+        'command', 'args', 'run_after', 'max_attempts', 'lock_key', 'schedule', 'status', 'attempts',
+        'worker', 'requested_by', 'created_at', 'started_at', 'finished_at', 'error', 'output',
+    ]
+    actions = ['requeue']
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            # Jobs added by hand go through enqueue so they get a lock key and are deduplicated
+            job = enqueue(obj.command, obj.args, requested_by=request.user.get_username(), run_after=obj.run_after)
+            obj.pk = job.pk
+            return
+        super().save_model(request, obj, form, change)
+
+    @admin.action(description=_('Queue selected jobs again'))
+    def requeue(self, request, queryset):
+        for job in queryset.exclude(status=SyncJob.RUNNING):
+            enqueue(job.command, job.args, requested_by=request.user.get_username())
+        self.message_user(request, _('Queued the selected jobs again.'), messages.SUCCESS)
+
+
+@admin.register(SyncLease)
+class SyncLeaseAdmin(admin.ModelAdmin):
+    list_display = ['name', 'holder', 'acquired_at', 'expires_at', 'is_live']
+    readonly_fields = ['name', 'holder', 'acquired_at', 'expires_at']
+
+    @admin.display(boolean=True, description=_('Live'))
+    def is_live(self, obj):
+        return obj.expires_at >= timezone.now()
+
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    list_display = [
+        'command', 'status', 'started_at', 'duration', 'fetched', 'created', 'updated', 'errors',
+        'api_seconds', 'db_seconds', 'query_count', 'peak_rss_kb',
+    ]
+    list_filter = ['status', 'command']
+    date_hierarchy = 'started_at'
+    actions = ['export_json']
+
+    fieldsets = (
+        (None, {
+            'fields': ('command', 'args', 'status', 'error', 'started_at', 'finished_at')
+        }),
+        (_('Rows'), {
+            'fields': ('fetched', 'created', 'updated', 'unchanged', 'skipped', 'removed', 'errors')
+        }),
+        (_('Resources'), {
+            'fields': (
+                'api_seconds', 'db_seconds', 'query_count', 'request_count', 'bytes_downloaded', 'peak_rss_kb',
+            )
+        }),
+        (_('Stages'), {
+            'fields': ('stages',)
+        }),
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        # Runs are recorded by the sync commands; the admin only shows them
+        return False
+
+    @admin.action(description=_('Export selected runs as JSON'))
+    def export_json(self, request, queryset):
+        response = HttpResponse(
+            json.dumps([run.as_dict() for run in queryset], indent=2),
+            content_type='application/json',
+        )
+        response['Content-Disposition'] = 'attachment; filename="sync-runs.json"'
+        return response
@@ -0,0 +1,256 @@
+"""
+Two-tier cache for Star Citizen API payloads.
+
+An in-process LRU sits in front of the shared Django cache. Every shared entry
+is written together with a small version stamp, so a worker can confirm its
+local copy is still current by reading the stamp instead of downloading and
+unpickling the full payload again.
+
+Payloads in the shared tier are serialized by a pluggable codec, compressed
+by default, to keep large ship and member lists within backend item limits.
+"""
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4 = None
+
+logger = logging.getLogger(__name__)
+
+
+class Codec:
+    """
+    Serializes cache values with pickle and optionally compresses the result.
+
+    Subclasses only override ``compress``/``decompress``.
+    """
+
+    name = 'pickle'
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+    def encode(self, value: Any) -> bytes:
+        return self.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def decode(self, data: bytes) -> Any:
+        return pickle.loads(self.decompress(data))
+
+
+class ZlibCodec(Codec):
+    """Pickle compressed with zlib."""
+
+    name = 'zlib'
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class LZ4Codec(Codec):
+    """Pickle compressed with LZ4; faster than zlib at a lower ratio."""
+
+    name = 'lz4'
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4.frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4.frame.decompress(data)
+
+
+CODECS: Dict[str, Codec] = {
+    codec.name: codec for codec in (Codec(), ZlibCodec())
+}
+if lz4 is not None:
+    CODECS[LZ4Codec.name] = LZ4Codec()
+
+# Encoded values start with this marker followed by the codec name and a colon
+CODEC_MARKER = b'scapi:'
+
+
+def get_codec(name: str) -> Codec:
+    """Return a registered codec by name."""
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache codec {name!r}, available: {', '.join(sorted(CODECS))}")
+
+
+def frame(codec: Codec, body: bytes) -> bytes:
+    """Prefix an encoded body with the codec used so any reader can decode it."""
+    return CODEC_MARKER + codec.name.encode() + b':' + body
+
+
+def decode_value(data: Any) -> Any:
+    """Decode a framed value; anything else is returned unchanged."""
+    if not isinstance(data, bytes) or not data.startswith(CODEC_MARKER):
+        return data
+    name, _, body = data[len(CODEC_MARKER):].partition(b':')
+    return get_codec(name.decode()).decode(body)
+
+
+class LocalCache:
+    """Thread-safe, size-bounded LRU cache living in the current process."""
+
+    # Every instance, so their locks can be replaced in forked children
+    _instances = weakref.WeakSet()
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        LocalCache._instances.add(self)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+def _reset_local_cache_locks() -> None:
+    """Give every local cache a new lock in a forked child; a parent thread may have held the old one."""
+    for local in list(LocalCache._instances):
+        local._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_local_cache_locks)
+
+
+class TwoTierCache:
+    """
+    In-process LRU tier in front of the shared Django cache.
+
+    Local entries are trusted for ``local_timeout`` seconds. After that the
+    shared version stamp is checked: if it still matches, the local copy is
+    kept; otherwise the payload is reloaded from the shared cache.
+
+    Returned values are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        shared=None,
+        max_entries: Optional[int] = None,
+        local_timeout: Optional[float] = None,
+        codec: Optional[str] = None,
+    ):
+        self.shared = shared or cache
+        self.codec = get_codec(codec or getattr(settings, 'STARCITIZEN_API_CACHE_CODEC', 'zlib'))
+        self.compress_min_size = getattr(settings, 'STARCITIZEN_API_CACHE_COMPRESS_MIN_SIZE', 1024)
+        self.max_item_size = getattr(settings, 'STARCITIZEN_API_CACHE_MAX_ITEM_SIZE', 1024 * 1024)
+        self.local = LocalCache(
+            max_entries or getattr(settings, 'STARCITIZEN_API_LOCAL_CACHE_SIZE', 128)
+        )
+        if local_timeout is None:
+            local_timeout = getattr(settings, 'STARCITIZEN_API_LOCAL_CACHE_TIMEOUT', 5)
+        self.local_timeout = local_timeout
+
+    @staticmethod
+    def version_key(key: str) -> str:
+        return f'{key}_version'
+
+    def get(self, key: str, revalidate: bool = False) -> Optional[Any]:
+        """
+        Return the value for a key.
+
+        Args:
+            key: Cache key
+            revalidate: Check the shared version stamp even if the local copy
+                is within its trust window
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        local = self.local.get(key)
+        now = time.monotonic()
+
+        if local is not None:
+            version, value, checked_at = local
+            if not revalidate and now - checked_at < self.local_timeout:
+                return value
+            if self.shared.get(self.version_key(key)) == version:
+                self.local.set(key, (version, value, now))
+                return value
+
+        entries = self.shared.get_many([key, self.version_key(key)])
+        value = decode_value(entries.get(key))
+        version = entries.get(self.version_key(key))
+        if value is None or version is None:
+            self.local.delete(key)
+            return value
+
+        self.local.set(key, (version, value, now))
+        return value
+
+    def set(self, key: str, value: Any, timeout: Optional[float] = None) -> None:
+        """Store a value in both tiers under a new version stamp."""
+        version = uuid.uuid4().hex
+        failed = self.shared.set_many({key: self._encode(key, value), self.version_key(key): version}, timeout)
+        if failed:
+            logger.error(f"Cache backend rejected {', '.join(failed)}")
+        self.local.set(key, (version, value, time.monotonic()))
+
+    def _encode(self, key: str, value: Any) -> bytes:
+        """Encode a value for the shared tier, logging its size and compression ratio."""
+        raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        codec = self.codec if len(raw) >= self.compress_min_size else CODECS['pickle']
+        encoded = frame(codec, codec.compress(raw))
+
+        logger.info(
+            f"Caching {key}: {len(raw)} bytes -> {len(encoded)} bytes "
+            f"({len(encoded) / max(len(raw), 1):.1%}) with {codec.name}"
+        )
+        if len(encoded) > self.max_item_size:
+            logger.warning(
+                f"Cached value for {key} is {len(encoded)} bytes, above the "
+                f"{self.max_item_size} byte item limit; the backend may drop it"
+            )
+        return encoded
+
+    def delete(self, key: str) -> None:
+        """Remove a value from both tiers."""
+        self.shared.delete_many([key, self.version_key(key)])
+        self.local.delete(key)
+
+
+# Process-wide payload cache shared by all API clients
+payload_cache = TwoTierCache()
@@ -0,0 +1,227 @@
+"""
+Request pacing and failure handling for the Star Citizen API client.
+
+- ``TokenBucket`` spaces out requests to one endpoint family.
+- ``CircuitBreaker`` stops calling upstream for a while after repeated failures.
+- ``RequestPolicy`` ties these together with jittered exponential retries.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limited or a transient upstream failure
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns the time waited."""
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            # A negative balance is the queue of callers ahead of us
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Fails fast after ``failure_threshold`` consecutive failures.
+
+    Once open, requests are refused for ``reset_timeout`` seconds. After that
+    a single trial request is let through: success closes the circuit, failure
+    opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now."""
+        if self.failure_threshold <= 0:
+            return True
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                logger.info("Circuit half-open, sending a trial request")
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit closed, upstream recovered")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"Circuit opened after {self.failures} failures, "
+                        f"failing fast for {self.reset_timeout}s"
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class RequestPolicy:
+    """Retry, rate limiting and circuit breaking settings for API requests."""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30,
+        rate: float = 5,
+        burst: float = 10,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60,
+        connect_timeout: float = 5,
+        read_timeout: float = 30,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate = rate
+        self.burst = burst
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> 'RequestPolicy':
+        """Build a policy from the STARCITIZEN_API_* settings."""
+        return cls(
+            max_retries=getattr(settings, 'STARCITIZEN_API_MAX_RETRIES', 3),
+            backoff_base=getattr(settings, 'STARCITIZEN_API_BACKOFF_BASE', 0.5),
+            backoff_max=getattr(settings, 'STARCITIZEN_API_BACKOFF_MAX', 30),
+            rate=getattr(settings, 'STARCITIZEN_API_RATE_LIMIT', 5),
+            burst=getattr(settings, 'STARCITIZEN_API_RATE_BURST', 10),
+            failure_threshold=getattr(settings, 'STARCITIZEN_API_CIRCUIT_THRESHOLD', 5),
+            reset_timeout=getattr(settings, 'STARCITIZEN_API_CIRCUIT_RESET', 60),
+            connect_timeout=getattr(settings, 'STARCITIZEN_API_CONNECT_TIMEOUT', 5),
+            read_timeout=getattr(settings, 'STARCITIZEN_API_TIMEOUT', 30),
+        )
+
+    @classmethod
+    def default(cls) -> 'RequestPolicy':
+        """Return the process-wide policy, so all clients share limits and circuit state."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls.from_settings()
+            return cls._default
+
+    def reset_locks(self) -> None:
+        """Replace every lock, for use in a forked child where a parent thread may have held one."""
+        self._buckets_lock = threading.Lock()
+        self.breaker._lock = threading.Lock()
+        for bucket in self._buckets.values():
+            bucket._lock = threading.Lock()
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    @staticmethod
+    def endpoint_group(endpoint: str) -> str:
+        """Group endpoints by resource, e.g. 'v1/cache/ships/300i' -> 'v1/cache/ships'."""
+        return '/'.join(endpoint.strip('/').split('/')[:3])
+
+    def throttle(self, endpoint: str) -> None:
+        """Wait for the rate limit of the endpoint's group."""
+        group = self.endpoint_group(endpoint)
+        with self._buckets_lock:
+            bucket = self._buckets.get(group)
+            if bucket is None:
+                bucket = self._buckets[group] = TokenBucket(self.rate, self.burst)
+        waited = bucket.acquire()
+        if waited:
+            logger.debug(f"Rate limited {group} for {waited:.2f}s")
+
+    def retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before retry number ``attempt`` (starting at 0).
+
+        Uses full jitter exponential backoff, or the server's Retry-After
+        (capped at ``backoff_max``) when given.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+def _reset_default_policy_locks() -> None:
+    """Keep the process-wide policy usable in a forked child."""
+    RequestPolicy._default_lock = threading.Lock()
+    if RequestPolicy._default is not None:
+        RequestPolicy._default.reset_locks()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_default_policy_locks)
@@ -0,0 +1,100 @@
+"""
+Change detection for rows synced from the Star Citizen API.
+
+Each synced row stores a hash of its normalized ``api_data``. A sync compares
+the incoming hash in memory and only rewrites rows whose payload changed, and
+only the columns whose values actually differ.
+"""
+import hashlib
+import json
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.db import models
+from django.utils import timezone
+
+
+def payload_hash(data: Any) -> str:
+    """
+    Return a stable SHA-256 hex digest of an API payload.
+
+    Keys are sorted and whitespace is dropped so the digest only changes when
+    the content does, not when the API reorders fields.
+    """
+    encoded = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def normalize_value(field: models.Field, value: Any) -> Any:
+    """Coerce an incoming value to what the database will hand back for ``field``."""
+    if value is None:
+        return None
+    if isinstance(field, models.DecimalField):
+        value = field.to_python(value)
+        return value.quantize(Decimal(1).scaleb(-field.decimal_places))
+    if isinstance(field, models.JSONField):
+        return value
+    return field.to_python(value)
+
+
+def changed_fields(instance: models.Model, values: Dict[str, Any]) -> List[str]:
+    """
+    List the fields of ``instance`` whose stored value differs from ``values``.
+
+    Foreign keys may be given as model instances and are compared by primary key.
+    """
+    opts = instance._meta
+    changed = []
+    for name, value in values.items():
+        field = opts.get_field(name)
+        if field.is_relation:
+            current = getattr(instance, field.attname)
+            value = value.pk if isinstance(value, models.Model) else value
+        else:
+            current = getattr(instance, name)
+            try:
+                value = normalize_value(field, value)
+            except Exception:
+                # Let the database decide what it makes of unexpected input
+                pass
+        if current != value:
+            changed.append(name)
+    return changed
+
+
+def apply_changes(instance: models.Model, values: Dict[str, Any], fields: Iterable[str]) -> None:
+    """Copy the changed ``fields`` from ``values`` onto ``instance``."""
+    for name in fields:
+        setattr(instance, name, values[name])
+
+
+def bulk_update_changed(
+    model: type,
+    rows: Iterable[Tuple[models.Model, List[str]]],
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    Write changed rows, touching only the columns that changed.
+
+    Rows are grouped by their set of changed columns so each ``bulk_update``
+    only sets those columns (plus ``updated_at``) for the rows in its group.
+
+    Returns:
+        Number of rows written
+    """
+    has_updated_at = any(f.name == 'updated_at' for f in model._meta.concrete_fields)
+    now = timezone.now()
+    groups = defaultdict(list)
+    for instance, fields in rows:
+        if not fields:
+            continue
+        if has_updated_at:
+            instance.updated_at = now
+        groups[tuple(sorted(fields))].append(instance)
+
+    written = 0
+    for fields, instances in groups.items():
+        update_fields = list(fields) + (['updated_at'] if has_updated_at else [])
+        model.objects.bulk_update(instances, update_fields, batch_size=batch_size)
+        written += len(instances)
+    return written
@@ -0,0 +1,103 @@
+"""
+Local dump files of Star Citizen API records.
+
+Dumps hold the raw API records, so importing one goes through the same field
+mapping as a sync. They are NDJSON, one record per line, unless the file name
+ends in ``.json``: those hold an array (or, when read, an API response
+envelope like ``{"data": [...]}``). A ``.gz`` suffix selects gzip
+compression. Records are streamed both ways, so dump size does not affect
+memory use.
+"""
+import gzip
+import json
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator
+from .json_stream import JSONStreamError, iter_json_array
+
+CHUNK_SIZE = 64 * 1024
+
+
+class DumpError(Exception):
+    """Raised for unreadable dump files."""
+    pass
+
+
+def open_dump(path: str, mode: str = 'rt') -> IO:
+    """Open a dump file, transparently (de)compressing ``.gz`` files."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode, encoding=None if 'b' in mode else 'utf-8')
+    return open(path, mode, encoding=None if 'b' in mode else 'utf-8')
+
+
+def is_ndjson(path: str) -> bool:
+    """Whether a dump file holds one record per line rather than a JSON document."""
+    name = str(path)
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return Path(name).suffix.lower() != '.json'
+
+
+def iter_dump(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records stored in a dump file.
+
+    Args:
+        path: NDJSON or JSON file, optionally gzip-compressed
+
+    Yields:
+        Record dictionaries
+
+    Raises:
+        DumpError: If the file cannot be read or parsed
+    """
+    try:
+        if is_ndjson(path):
+            with open_dump(path) as handle:
+                for line_number, line in enumerate(handle, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        raise DumpError(f'{path}:{line_number}: invalid JSON: {e}')
+        else:
+            with open_dump(path, 'rb') as handle:
+                chunks = iter(lambda: handle.read(CHUNK_SIZE), b'')
+                yield from iter_json_array(chunks, 'data')
+    except JSONStreamError as e:
+        raise DumpError(f'{path}: {e}')
+    except OSError as e:
+        raise DumpError(f'Cannot read {path}: {e}')
+
+
+def write_dump(path: str, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Write records to a dump file.
+
+    Args:
+        path: Output file; NDJSON unless it ends in ``.json`` (a JSON array),
+            and a ``.gz`` suffix compresses it
+        records: Record dictionaries
+
+    Returns:
+        Number of records written
+    """
+    ndjson = is_ndjson(path)
+    count = 0
+    try:
+        with open_dump(path, 'wt') as handle:
+            if not ndjson:
+                handle.write('[')
+            for record in records:
+                if count and not ndjson:
+                    handle.write(',')
+                handle.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False))
+                if ndjson:
+                    handle.write('\n')
+                count += 1
+            if not ndjson:
+                handle.write(']')
+    except OSError as e:
+        raise DumpError(f'Cannot write {path}: {e}')
+    return count
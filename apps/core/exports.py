@@ -0,0 +1,278 @@
+"""
+Streaming bulk exports of the ship catalog, fleet and organization roster.
+
+Rows are read with a ``values_list()`` projection of only the requested
+columns and ``.iterator()``, which uses a server-side cursor on PostgreSQL,
+and are encoded one at a time as NDJSON or CSV. An export therefore starts
+producing output immediately and runs in constant memory however large the
+table is. The same generators back the ``/export/`` views and the
+``export_data`` command.
+"""
+import csv
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from django.apps import apps
+from django.core.exceptions import FieldError, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+# Rows fetched from the database per round trip
+CHUNK_SIZE = 2000
+# Characters of encoded output collected before handing it to the server
+BUFFER_SIZE = 64 * 1024
+
+BOOLEAN_VALUES = {'true': True, 'yes': True, '1': True, 'false': False, 'no': False, '0': False}
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class ExportError(ValueError):
+    """Raised for an unknown dataset, format, field or filter value."""
+    pass
+
+
+@dataclass
+class Dataset:
+    """
+    An exportable table.
+
+    ``columns`` maps output column names to model field lookups, in output
+    order; ``filters`` maps query parameters to filter lookups, and those in
+    ``boolean_filters`` take values such as ``true`` or ``0``.
+    """
+
+    name: str
+    model: str
+    columns: Dict[str, str]
+    filters: Dict[str, str] = field(default_factory=dict)
+    boolean_filters: Sequence[str] = ()
+
+    def queryset(self) -> QuerySet:
+        return apps.get_model(self.model).objects.order_by('pk')
+
+    @property
+    def view_permission(self) -> str:
+        """The permission needed to export the dataset, e.g. ``fleet.view_fleetship``."""
+        opts = apps.get_model(self.model)._meta
+        return f'{opts.app_label}.view_{opts.model_name}'
+
+
+DATASETS = {
+    dataset.name: dataset
+    for dataset in [
+        Dataset(
+            'ships',
+            'starships.Ship',
+            columns={
+                'id': 'pk',
+                'api_id': 'api_id',
+                'name': 'name',
+                'manufacturer': 'manufacturer__code',
+                'manufacturer_name': 'manufacturer__name',
+                'type': 'type',
+                'size': 'size',
+                'focus': 'focus',
+                'career': 'career',
+                'role': 'role',
+                'length': 'length',
+                'beam': 'beam',
+                'height': 'height',
+                'mass': 'mass',
+                'min_crew': 'min_crew',
+                'max_crew': 'max_crew',
+                'cargo_capacity': 'cargo_capacity',
+                'production_status': 'production_status',
+                'is_flight_ready': 'is_flight_ready',
+                'is_concept': 'is_concept',
+                'pledge_price': 'pledge_price',
+                'store_url': 'store_url',
+                'updated_at': 'updated_at',
+            },
+            filters={
+                'manufacturer': 'manufacturer__code',
+                'type': 'type',
+                'size': 'size',
+                'production_status': 'production_status',
+                'flight_ready': 'is_flight_ready',
+                'updated_since': 'updated_at__gte',
+            },
+            boolean_filters=['flight_ready'],
+        ),
+        Dataset(
+            'fleet',
+            'fleet.FleetShip',
+            columns={
+                'id': 'pk',
+                'owner': 'owner__username',
+                'ship_id': 'ship_id',
+                'ship': 'ship__name',
+                'manufacturer': 'ship__manufacturer__code',
+                'name': 'name',
+                'status': 'status',
+                'purchased_date': 'purchased_date',
+                'is_available_for_missions': 'is_available_for_missions',
+                'created_at': 'created_at',
+                'updated_at': 'updated_at',
+            },
+            filters={
+                'owner': 'owner__username',
+                'status': 'status',
+                'ship_id': 'ship_id',
+                'manufacturer': 'ship__manufacturer__code',
+                'available': 'is_available_for_missions',
+                'updated_since': 'updated_at__gte',
+            },
+            boolean_filters=['available'],
+        ),
+        Dataset(
+            'roster',
+            'organization.OrganizationMember',
+            columns={
+                'organization': 'organization__sid',
+                'handle': 'handle',
+                'display_name': 'display_name',
+                'rank': 'rank',
+                'stars': 'stars',
+                'avatar_url': 'avatar_url',
+                'created_at': 'created_at',
+                'updated_at': 'updated_at',
+            },
+            filters={
+                'organization': 'organization__sid',
+                'rank': 'rank',
+                'min_stars': 'stars__gte',
+                'updated_since': 'updated_at__gte',
+            },
+        ),
+    ]
+}
+
+
+def get_dataset(name: str) -> Dataset:
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise ExportError(f'Unknown dataset {name!r}; choose from {", ".join(DATASETS)}')
+
+
+def select_columns(dataset: Dataset, fields: Optional[Sequence[str]] = None) -> List[str]:
+    """Validate requested column names, defaulting to all of them."""
+    if not fields:
+        return list(dataset.columns)
+    unknown = [name for name in fields if name not in dataset.columns]
+    if unknown:
+        raise ExportError(
+            f'Unknown fields for {dataset.name}: {", ".join(unknown)}; '
+            f'choose from {", ".join(dataset.columns)}'
+        )
+    return list(dict.fromkeys(fields))
+
+
+def export_rows(
+    dataset: Dataset,
+    columns: Sequence[str],
+    filters: Optional[Mapping[str, str]] = None,
+) -> Iterator[Tuple]:
+    """
+    Stream the rows of a dataset as tuples in column order.
+
+    Args:
+        dataset: Table to export
+        columns: Output columns, as returned by ``select_columns``
+        filters: Filter parameters and their values; empty values are ignored
+
+    Raises:
+        ExportError: If a filter is unknown or its value invalid. Raised
+            before the first row is read, so a response never fails halfway.
+    """
+    queryset = dataset.queryset()
+    for name, value in (filters or {}).items():
+        if value in ('', None):
+            continue
+        if name not in dataset.filters:
+            raise ExportError(
+                f'Unknown filter for {dataset.name}: {name}; choose from {", ".join(dataset.filters)}'
+            )
+        if name in dataset.boolean_filters:
+            if value.lower() not in BOOLEAN_VALUES:
+                raise ExportError(f'Invalid value for {name}: expected true or false')
+            value = BOOLEAN_VALUES[value.lower()]
+        try:
+            # Lookup values are validated here, not when the rows are read
+            queryset = queryset.filter(**{dataset.filters[name]: value})
+        except (FieldError, ValidationError, ValueError, TypeError) as e:
+            message = '; '.join(e.messages) if isinstance(e, ValidationError) else str(e)
+            raise ExportError(f'Invalid value for {name}: {message}')
+
+    lookups = [dataset.columns[name] for name in columns]
+    return queryset.values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+
+
+def iter_ndjson(columns: Sequence[str], rows: Iterable[Tuple]) -> Iterator[str]:
+    """Encode rows as NDJSON lines."""
+    encoder = DjangoJSONEncoder(separators=(',', ':'), ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes to it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(columns: Sequence[str], rows: Iterable[Tuple]) -> Iterator[str]:
+    """Encode rows as CSV lines, starting with a header."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def buffered(lines: Iterable[str], size: int = BUFFER_SIZE) -> Iterator[str]:
+    """Join encoded lines into chunks of about ``size`` characters, so each write is worth sending."""
+    buffer, length = [], 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def iter_export(
+    dataset_name: str,
+    output_format: str = 'ndjson',
+    fields: Optional[Sequence[str]] = None,
+    filters: Optional[Mapping[str, str]] = None,
+) -> Iterator[str]:
+    """
+    Validate an export request and return its encoded output as a lazy iterator.
+
+    Args:
+        dataset_name: One of ``DATASETS``
+        output_format: One of ``FORMATS``
+        fields: Output columns (default: all)
+        filters: Filter parameters and their values
+
+    Raises:
+        ExportError: For an unknown dataset, format, field or filter
+    """
+    if output_format not in FORMATS:
+        raise ExportError(f'Unknown format {output_format!r}; choose from {", ".join(FORMATS)}')
+    dataset = get_dataset(dataset_name)
+    columns = select_columns(dataset, fields)
+    rows = export_rows(dataset, columns, filters)
+    encode = iter_csv if output_format == 'csv' else iter_ndjson
+    return buffered(encode(columns, rows))
+
+
+def parse_fields(value: Any) -> List[str]:
+    """Split a comma-separated ``fields`` parameter."""
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
@@ -0,0 +1,330 @@
+"""
+Local stand-ins for the Star Citizen API.
+
+Both classes are ``requests`` transport adapters and can be mounted on a
+client's session to run syncs without network access:
+
+    client.session.mount(client.BASE_URL, FakeStarCitizenAdapter(ships=5000))
+
+- ``FakeStarCitizenAdapter`` serves synthetic payloads of configurable size,
+  with optional latency and injected errors.
+- ``CassetteAdapter`` records real responses to a directory and replays them.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+SHIP_TYPES = ['combat', 'transport', 'exploration', 'industrial', 'support', 'competition']
+SHIP_SIZES = ['vehicle', 'snub', 'small', 'medium', 'large', 'capital']
+PRODUCTION_STATUSES = ['flight_ready', 'flight_ready', 'concept', 'in_production']
+RANKS = ['Recruit', 'Member', 'Officer', 'Director', 'Founder']
+
+
+class _StreamingBody:
+    """File-like response body produced from an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self.chunks = chunks
+        self.buffer = b''
+
+    def read(self, amt: Optional[int] = None, **kwargs) -> bytes:
+        while amt is None or len(self.buffer) < amt:
+            try:
+                self.buffer += next(self.chunks)
+            except StopIteration:
+                break
+        if amt is None:
+            data, self.buffer = self.buffer, b''
+        else:
+            data, self.buffer = self.buffer[:amt], self.buffer[amt:]
+        return data
+
+    def stream(self, amt: int = 65536, decode_content: bool = True) -> Iterator[bytes]:
+        while True:
+            data = self.read(amt)
+            if not data:
+                return
+            yield data
+
+    def close(self) -> None:
+        self.chunks = iter(())
+        self.buffer = b''
+
+    def release_conn(self) -> None:
+        pass
+
+
+def _build_response(
+    request: requests.PreparedRequest,
+    status: int,
+    body: Iterator[bytes],
+    headers: Optional[Dict[str, str]] = None,
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.raw = _StreamingBody(body)
+    response.url = request.url
+    response.request = request
+    response.reason = HTTPStatus(status).phrase
+    response.encoding = 'utf-8'
+    return response
+
+
+class FakeStarCitizenAdapter(BaseAdapter):
+    """
+    Serves deterministic synthetic API payloads.
+
+    Args:
+        ships: Number of ships in the catalog
+        manufacturers: Number of manufacturers ships are spread across
+        members: Number of members in every organization
+        latency: Seconds to sleep before answering each request
+        error_rate: Fraction of requests answered with ``error_status``
+        error_status: Status code used for injected errors
+        seed: Seed for generated values and injected errors
+    """
+
+    ROUTES = [
+        (re.compile(r'^/v1/cache/manufacturers/?$'), 'manufacturers'),
+        (re.compile(r'^/v1/cache/ships/?$'), 'ships'),
+        (re.compile(r'^/v1/cache/ships/(?P<ship_id>[^/]+)/?$'), 'ship'),
+        (re.compile(r'^/v1/cache/organizations/(?P<sid>[^/]+)/members/?$'), 'members'),
+        (re.compile(r'^/v1/cache/organizations/(?P<sid>[^/]+)/?$'), 'organization'),
+    ]
+
+    def __init__(
+        self,
+        ships: int = 200,
+        manufacturers: int = 20,
+        members: int = 500,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 0,
+    ):
+        super().__init__()
+        self.ships = ships
+        self.manufacturers = max(1, manufacturers)
+        self.members = members
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.request_count = 0
+
+    def _manufacturer(self, index: int) -> Dict[str, Any]:
+        return {
+            'id': str(index),
+            'code': f'MF{index:03d}',
+            'name': f'Manufacturer {index}',
+            'description': f'Synthetic manufacturer number {index}.',
+        }
+
+    def _ship(self, index: int) -> Dict[str, Any]:
+        manufacturer = self._manufacturer(index % self.manufacturers)
+        status = PRODUCTION_STATUSES[index % len(PRODUCTION_STATUSES)]
+        return {
+            'id': f'ship-{index}',
+            'name': f'Ship {index}',
+            'manufacturer': {'code': manufacturer['code'], 'name': manufacturer['name']},
+            'type': SHIP_TYPES[index % len(SHIP_TYPES)],
+            'size': SHIP_SIZES[index % len(SHIP_SIZES)],
+            'focus': 'Synthetic',
+            'description': f'Synthetic ship number {index} for offline testing. ' * 4,
+            'career': 'Combat',
+            'role': 'Fighter',
+            'length': 10 + index % 90,
+            'beam': 8 + index % 40,
+            'height': 3 + index % 20,
+            'mass': 10000 + index * 13,
+            'min_crew': 1,
+            'max_crew': 1 + index % 8,
+            'cargo_capacity': index % 200,
+            'production_status': status,
+            'pledge_price': 20 + index % 500,
+            'store_url': f'https://robertsspaceindustries.com/pledge/ships/ship-{index}',
+            'compiled': {
+                'RSIWeapon': {
+                    'weapons': [
+                        {'type': 'weapons', 'name': f'Synthetic Cannon S{1 + index % 4}',
+                         'size': str(1 + index % 4), 'quantity': 1 + index % 3, 'mounts': 1 + index % 3},
+                    ],
+                },
+                'RSIModular': {
+                    'shield_generators': [
+                        {'type': 'shield_generators', 'name': 'Synthetic Shield', 'size': 'S', 'quantity': 1},
+                    ],
+                    'power_plants': [
+                        {'type': 'power_plants', 'name': 'Synthetic Power Plant', 'size': 'S', 'quantity': 1},
+                    ],
+                },
+            },
+        }
+
+    def _member(self, sid: str, index: int) -> Dict[str, Any]:
+        return {
+            'handle': f'{sid.lower()}_member_{index}',
+            'display_name': f'{sid} Member {index}',
+            'rank': RANKS[index % len(RANKS)],
+            'stars': index % 6,
+            'image': f'https://robertsspaceindustries.com/media/avatars/{index}.jpg',
+        }
+
+    def _organization(self, sid: str) -> Dict[str, Any]:
+        return {
+            'sid': sid,
+            'name': f'{sid} Organization',
+            'url': f'https://robertsspaceindustries.com/orgs/{sid}',
+            'archetype': 'Organization',
+            'commitment': 'Regular',
+            'primary_language': 'English',
+            'recruiting': True,
+            'member_count': self.members,
+            'headline': f'Synthetic organization {sid}',
+            'description': '',
+            'history': '',
+            'manifesto': '',
+            'charter': '',
+        }
+
+    def _payload(self, route: str, params: Dict[str, str]) -> Iterator[bytes]:
+        """Render a response envelope chunk by chunk so large payloads are never built whole."""
+        if route == 'manufacturers':
+            items = (self._manufacturer(i) for i in range(self.manufacturers))
+        elif route == 'ships':
+            items = (self._ship(i) for i in range(self.ships))
+        elif route == 'members':
+            items = (self._member(params['sid'], i) for i in range(self.members))
+        else:
+            if route == 'ship':
+                found = re.fullmatch(r'ship-(\d+)', params['ship_id'])
+                index = int(found.group(1)) if found else -1
+                data = self._ship(index) if 0 <= index < self.ships else None
+            else:
+                data = self._organization(params['sid'])
+            yield json.dumps({'success': 1, 'data': data, 'message': 'ok'}).encode()
+            return
+
+        yield b'{"success": 1, "data": ['
+        for i, item in enumerate(items):
+            yield (b',' if i else b'') + json.dumps(item).encode()
+        yield b'], "message": "ok"}'
+
+    def _etag(self, path: str) -> str:
+        key = f'{path}:{self.ships}:{self.manufacturers}:{self.members}:{self.seed}'
+        return '"' + hashlib.sha1(key.encode()).hexdigest()[:16] + '"'
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            return _build_response(request, self.error_status, iter([b'{"success": 0}']))
+
+        path = urlsplit(request.url).path
+        for pattern, route in self.ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            return _build_response(request, 404, iter([b'{"success": 0, "message": "not found"}']))
+
+        etag = self._etag(path)
+        if request.headers.get('If-None-Match') == etag:
+            return _build_response(request, 304, iter(()), {'ETag': etag})
+
+        return _build_response(
+            request, 200, self._payload(route, match.groupdict()),
+            {'ETag': etag, 'Content-Type': 'application/json'},
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    Records API responses to a directory or replays them from it.
+
+    Args:
+        path: Cassette directory
+        record: When True, forward requests to the real API and save the
+            responses; otherwise serve saved responses and answer 404 for
+            anything not recorded
+        latency: Seconds to sleep before replaying each response
+    """
+
+    def __init__(self, path, record: bool = False, latency: float = 0.0):
+        super().__init__()
+        self.path = Path(path)
+        self.record = record
+        self.latency = latency
+        self.transport = HTTPAdapter() if record else None
+        if record:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def _name(self, request) -> str:
+        parts = urlsplit(request.url)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', parts.path).strip('_') or 'root'
+        if parts.query:
+            slug += '_' + hashlib.sha1(parts.query.encode()).hexdigest()[:8]
+        return slug
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        name = self._name(request)
+        meta_path = self.path / f'{name}.json'
+        body_path = self.path / f'{name}.body'
+
+        if self.record:
+            response = self.transport.send(
+                request, stream=False, timeout=timeout, verify=verify, cert=cert, proxies=proxies
+            )
+            body_path.write_bytes(response.content)
+            meta_path.write_text(json.dumps({
+                'status': response.status_code,
+                'headers': dict(response.headers),
+                'url': request.url,
+            }, indent=2))
+            logger.info(f"Recorded {request.url} to {meta_path}")
+            return response
+
+        if self.latency:
+            time.sleep(self.latency)
+        if not meta_path.exists():
+            logger.warning(f"No recording for {request.url} in {self.path}")
+            return _build_response(request, 404, iter([b'{"success": 0, "message": "not recorded"}']))
+
+        meta = json.loads(meta_path.read_text())
+        headers = {
+            key: value for key, value in meta['headers'].items()
+            if key.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')
+        }
+
+        def chunks():
+            with body_path.open('rb') as body:
+                while True:
+                    data = body.read(65536)
+                    if not data:
+                        return
+                    yield data
+
+        return _build_response(request, meta['status'], chunks(), headers)
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
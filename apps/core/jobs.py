@@ -0,0 +1,285 @@
+"""
+Database-backed queue for sync jobs.
+
+Jobs are rows in ``SyncJob``; workers (``run_sync_worker``) claim them with a
+conditional update, so any number of containers can poll the same table.
+While a job runs, its worker holds a ``SyncLease`` for every set of rows the
+command writes (its lock key lists them) and renews them from a heartbeat
+thread. Jobs touching the same rows, such as a ship sync and a full sync,
+therefore never overlap, and leases left behind by a crashed worker expire so
+the work can be picked up again. A worker that loses a lease stops its
+command at the next batch (see ``apps.core.sync.cancel_on``) and leaves the
+job to whoever holds it now.
+"""
+import io
+import logging
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterator, List, Optional, Sequence
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.core.models import SyncJob, SyncLease, SyncSchedule
+from apps.core.sync import cancel_on
+
+logger = logging.getLogger(__name__)
+
+# Keep this much of a job's output; the rest is usually per-row progress lines
+MAX_OUTPUT_CHARS = 20000
+
+
+def lease_seconds() -> int:
+    return getattr(settings, 'SYNC_JOB_LEASE_SECONDS', 300)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Delay before retrying a job that failed on its ``attempts``-th try: 1, 2, 4... minutes."""
+    return timedelta(seconds=60 * 2 ** (max(attempts, 1) - 1))
+
+
+def default_worker_id() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+# Rows written by each command; jobs sharing any of these never run together
+COMMAND_LOCKS = {
+    'sync_all': ['catalog', 'organizations'],
+    'sync_ships': ['catalog'],
+    'sync_organization': ['organizations'],
+    'sync_org_members': ['organizations'],
+    'sync_orgs': ['organizations'],
+}
+
+
+def lock_key_for(command: str) -> str:
+    """Comma-separated lease names a command needs."""
+    return ','.join(COMMAND_LOCKS.get(command, [command]))
+
+
+def lease_names(job: SyncJob) -> List[str]:
+    return [name for name in job.lock_key.split(',') if name]
+
+
+def enqueue(
+    command: str,
+    args: Sequence[str] = (),
+    schedule: Optional[SyncSchedule] = None,
+    requested_by: str = '',
+    run_after=None,
+) -> SyncJob:
+    """
+    Queue a sync command unless the same one is already waiting.
+
+    Args:
+        command: Management command name, one of ``SYNC_COMMAND_CHOICES``
+        args: Command line arguments
+        schedule: Schedule that queued the job, if any
+        requested_by: Who asked for it, shown in the admin
+        run_after: Earliest start time (default: now)
+
+    Returns:
+        The new job, or the already queued identical one
+    """
+    args = [str(arg) for arg in args]
+    existing = SyncJob.objects.filter(command=command, args=args, status=SyncJob.QUEUED).first()
+    if existing is not None:
+        return existing
+    return SyncJob.objects.create(
+        command=command,
+        args=args,
+        lock_key=lock_key_for(command),
+        schedule=schedule,
+        requested_by=requested_by,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def enqueue_due_schedules(now=None) -> List[SyncJob]:
+    """Queue a job for every enabled schedule that is due."""
+    now = now or timezone.now()
+    jobs = []
+    for schedule in SyncSchedule.objects.filter(enabled=True, next_run_at__lte=now):
+        # Only the worker that moves next_run_at forward queues the job
+        claimed = SyncSchedule.objects.filter(pk=schedule.pk, next_run_at=schedule.next_run_at).update(
+            next_run_at=now + timedelta(seconds=schedule.interval),
+            last_enqueued_at=now,
+        )
+        if claimed:
+            jobs.append(enqueue(schedule.command, schedule.args, schedule=schedule, requested_by='schedule'))
+    return jobs
+
+
+def acquire_lease(name: str, holder: str, seconds: Optional[int] = None) -> bool:
+    """Take the named lease if it is free or expired."""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=seconds or lease_seconds())
+    try:
+        with transaction.atomic():
+            SyncLease.objects.create(name=name, holder=holder, acquired_at=now, expires_at=expires_at)
+        return True
+    except IntegrityError:
+        pass
+    taken = SyncLease.objects.filter(name=name, expires_at__lt=now).update(
+        holder=holder, acquired_at=now, expires_at=expires_at
+    )
+    return bool(taken)
+
+
+def renew_lease(name: str, holder: str, seconds: Optional[int] = None) -> bool:
+    """Extend a lease we hold; False if it was lost to another holder."""
+    expires_at = timezone.now() + timedelta(seconds=seconds or lease_seconds())
+    return bool(SyncLease.objects.filter(name=name, holder=holder).update(expires_at=expires_at))
+
+
+def release_leases(names: Sequence[str], holder: str) -> None:
+    SyncLease.objects.filter(name__in=names, holder=holder).delete()
+
+
+def acquire_leases(names: Sequence[str], holder: str) -> bool:
+    """Take all of the named leases or none of them."""
+    acquired = []
+    for name in names:
+        if not acquire_lease(name, holder):
+            release_leases(acquired, holder)
+            return False
+        acquired.append(name)
+    return True
+
+
+@contextmanager
+def hold_leases(names: Sequence[str], holder: str, seconds: Optional[int] = None) -> Iterator[threading.Event]:
+    """
+    Keep acquired leases renewed from a heartbeat thread while the block runs,
+    releasing them afterwards.
+
+    Yields an event that is set if a lease is lost, e.g. because the
+    database was unreachable for longer than the lease lasts.
+    """
+    seconds = seconds or lease_seconds()
+    stop = threading.Event()
+    lost = threading.Event()
+
+    def heartbeat():
+        try:
+            while not stop.wait(seconds / 3):
+                for name in names:
+                    try:
+                        if not renew_lease(name, holder, seconds):
+                            logger.error(f"Lost lease {name}")
+                            lost.set()
+                            return
+                    except Exception as e:
+                        logger.warning(f"Heartbeat for lease {name} failed: {e}")
+        finally:
+            close_old_connections()
+
+    thread = threading.Thread(target=heartbeat, name=f'lease-{holder}', daemon=True)
+    thread.start()
+    try:
+        yield lost
+    finally:
+        stop.set()
+        thread.join()
+        release_leases(names, holder)
+
+
+def requeue_abandoned() -> int:
+    """Put back jobs left running by workers whose leases expired."""
+    live = set(
+        SyncLease.objects.filter(expires_at__gte=timezone.now()).values_list('name', 'holder')
+    )
+    retried = 0
+    for job in SyncJob.objects.filter(status=SyncJob.RUNNING):
+        if any((name, job.worker) in live for name in lease_names(job)):
+            continue
+        if job.attempts < job.max_attempts:
+            fields = {'status': SyncJob.QUEUED, 'error': 'Worker stopped responding, retrying'}
+            retried += 1
+        else:
+            fields = {'status': SyncJob.FAILED, 'finished_at': timezone.now(), 'error': 'Worker stopped responding'}
+        # Conditional so a worker finishing the job just now wins
+        SyncJob.objects.filter(pk=job.pk, status=SyncJob.RUNNING, worker=job.worker).update(**fields)
+    return retried
+
+
+def claim_next(worker: str) -> Optional[SyncJob]:
+    """
+    Claim the next runnable job, taking the leases for its lock key.
+
+    Returns:
+        The claimed job, now marked running, or None if nothing can run
+    """
+    now = timezone.now()
+    candidates = SyncJob.objects.filter(status=SyncJob.QUEUED, run_after__lte=now).order_by('run_after', 'pk')
+    for job in candidates[:20]:
+        if not acquire_leases(lease_names(job), worker):
+            # Another worker is writing the same rows; leave it queued
+            continue
+        claimed = SyncJob.objects.filter(pk=job.pk, status=SyncJob.QUEUED).update(
+            status=SyncJob.RUNNING,
+            worker=worker,
+            started_at=now,
+            finished_at=None,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        release_leases(lease_names(job), worker)
+    return None
+
+
+def run_job(job: SyncJob, worker: str) -> SyncJob:
+    """
+    Run a claimed job, keeping its lease alive, and record the outcome.
+
+    If a lease is lost the command is cancelled at its next batch and the
+    job goes back to the queue; the outcome is only saved while the job is
+    still running under this worker, so a worker that has since taken it
+    over is not overwritten.
+    """
+    output = io.StringIO()
+    logger.info(f"Running sync job {job.pk}: {job}")
+    # The outcome is saved before the lease is released, so the job is never
+    # seen running without a live lease
+    with hold_leases(lease_names(job), worker) as lost, cancel_on(lost):
+        try:
+            call_command(job.command, *job.args, stdout=output, stderr=output)
+            job.status = SyncJob.SUCCEEDED
+            job.error = ''
+        except Exception as e:
+            if not lost.is_set():
+                logger.exception(f"Sync job {job.pk} failed")
+            job.error = f'{type(e).__name__}: {e}'
+            if job.attempts < job.max_attempts:
+                # Retry later with a growing delay
+                job.status = SyncJob.QUEUED
+                job.run_after = timezone.now() + retry_delay(job.attempts)
+            else:
+                job.status = SyncJob.FAILED
+
+        if lost.is_set():
+            # Another worker may have written the same rows meanwhile
+            logger.error(f"Sync job {job.pk} stopped after losing its lease")
+            job.status = SyncJob.QUEUED if job.attempts < job.max_attempts else SyncJob.FAILED
+            job.run_after = timezone.now()
+            job.error = 'Lease lost while running'
+
+        text = output.getvalue()
+        job.output = text if len(text) <= MAX_OUTPUT_CHARS else '…' + text[-MAX_OUTPUT_CHARS:]
+        job.finished_at = timezone.now()
+        saved = SyncJob.objects.filter(pk=job.pk, status=SyncJob.RUNNING, worker=worker).update(
+            status=job.status,
+            error=job.error,
+            output=job.output,
+            run_after=job.run_after,
+            finished_at=job.finished_at,
+        )
+        if not saved:
+            logger.warning(f"Sync job {job.pk} was requeued while running, discarding this run's outcome")
+    return job
@@ -0,0 +1,142 @@
+"""
+Incremental JSON parsing for large API responses.
+
+The Star Citizen API wraps list results in an envelope such as
+``{"success": 1, "data": [...], "message": "ok"}``. ``iter_json_array`` walks
+that envelope as bytes arrive and yields the items of one array member one at
+a time, so only a single item is held in memory at once.
+"""
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+WHITESPACE = ' \t\n\r'
+NUMBER_CHARS = '0123456789+-.eE'
+
+
+class JSONStreamError(ValueError):
+    """Raised when a streamed document is not valid JSON."""
+    pass
+
+
+class _StreamReader:
+    """Text buffer over an iterable of byte chunks with JSON value decoding."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int = 1) -> bool:
+        """
+        Read at least ``size`` more characters into the buffer, or whatever is
+        left of the input, returning False if nothing more could be read.
+        """
+        if self.eof:
+            return False
+        # Drop consumed text so the buffer only holds what is still needed
+        parts = [self.buffer[self.pos:]]
+        self.pos = 0
+        missing = size
+        for chunk in self.chunks:
+            text = self.decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                parts.append(text)
+                missing -= len(text)
+                if missing <= 0:
+                    break
+        else:
+            parts.append(self.decoder.decode(b'', final=True))
+            self.eof = True
+        # Joined once, since appending chunk by chunk copies the buffer each time
+        self.buffer = ''.join(parts)
+        return len(self.buffer) > len(parts[0])
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at end)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        """Consume the given character or raise."""
+        found = self.peek()
+        if found != char:
+            raise JSONStreamError(f"Expected {char!r} but found {found or 'end of input'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Decoding restarts at the value's first character, so read until
+                # the pending text has doubled rather than retrying after every
+                # chunk, which would be quadratic in the size of a large value
+                if not self._fill(len(self.buffer) - self.pos):
+                    raise JSONStreamError(f"Invalid JSON: {e}")
+                continue
+            # A number at the end of the buffer may continue in the next chunk,
+            # e.g. "-1." read as -1 before "25e3" arrives
+            if not self.eof and not self.buffer[end:].lstrip(NUMBER_CHARS):
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_items(reader: _StreamReader) -> Iterator[Any]:
+    """Yield the items of the array starting at the reader's position."""
+    reader.expect('[')
+    if reader.peek() == ']':
+        return
+    while True:
+        yield reader.value()
+        if reader.peek() == ']':
+            return
+        reader.expect(',')
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str = 'data') -> Iterator[Any]:
+    """
+    Yield the items of the array stored under ``key`` in a top-level JSON object.
+
+    A document that is itself an array has its items yielded directly.
+
+    Args:
+        chunks: Iterable of byte (or text) chunks, e.g. ``response.iter_content()``
+        key: Name of the top-level member holding the array
+
+    Yields:
+        Decoded array items. Nothing is yielded if the member is missing or null.
+    """
+    reader = _StreamReader(chunks)
+    if reader.peek() == '[':
+        yield from _iter_items(reader)
+        return
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(':')
+
+        if name == key and reader.peek() == '[':
+            yield from _iter_items(reader)
+            return
+
+        reader.value()
+        if reader.peek() == '}':
+            return
+        reader.expect(',')
@@ -0,0 +1,152 @@
+"""
+Benchmark the sync commands against a local stand-in for the Star Citizen API.
+Usage: python manage.py benchmark_sync --ships 5000 --members 50000
+"""
+import io
+import json
+import time
+import tracemalloc
+import uuid
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from apps.core.api_cache import TwoTierCache
+from apps.core.fake_api import CassetteAdapter, FakeStarCitizenAdapter
+from apps.core.starcitizen_api import StarCitizenAPIClient, set_api_client
+from apps.core.telemetry import QueryCounter, peak_rss_kb
+
+
+class _Rollback(Exception):
+    """Raised to discard the benchmark's database writes."""
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sync commands offline against synthetic or recorded API data'
+
+    STAGES = ['ships', 'organization', 'members']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ships', type=int, default=1000, help='Synthetic ships to serve')
+        parser.add_argument('--manufacturers', type=int, default=20, help='Synthetic manufacturers to serve')
+        parser.add_argument('--members', type=int, default=5000, help='Synthetic members to serve')
+        parser.add_argument('--sid', default='BENCH', help='Organization SID to sync')
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds of latency per request')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail')
+        parser.add_argument(
+            '--cassette',
+            help='Replay recorded responses from this directory instead of synthetic data',
+        )
+        parser.add_argument(
+            '--record',
+            action='store_true',
+            help='With --cassette, record responses from the live API while benchmarking',
+        )
+        parser.add_argument(
+            '--stages',
+            default=','.join(self.STAGES),
+            help=f'Comma-separated stages to run (default: {",".join(self.STAGES)})',
+        )
+        parser.add_argument('--force', action='store_true', help='Pass --force to the sync commands')
+        parser.add_argument('--keep', action='store_true', help='Commit the synced data instead of rolling back')
+        parser.add_argument(
+            '--no-trace-memory',
+            action='store_true',
+            help='Skip tracemalloc peak measurement, which slows the run down',
+        )
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        stages = [stage.strip() for stage in options['stages'].split(',') if stage.strip()]
+        unknown = set(stages) - set(self.STAGES)
+        if unknown:
+            raise CommandError(f'Unknown stages: {", ".join(sorted(unknown))}')
+        if options['record'] and not options['cassette']:
+            raise CommandError('--record requires --cassette')
+
+        sid = options['sid'].upper()
+        if options['cassette']:
+            adapter = CassetteAdapter(options['cassette'], record=options['record'], latency=options['latency'])
+        else:
+            adapter = FakeStarCitizenAdapter(
+                ships=options['ships'],
+                manufacturers=options['manufacturers'],
+                members=options['members'],
+                latency=options['latency'],
+                error_rate=options['error_rate'],
+            )
+
+        commands = {
+            'ships': ('sync_ships', []),
+            'organization': ('sync_organization', [sid]),
+            'members': ('sync_org_members', [sid]),
+        }
+
+        # A private cache keeps synthetic payloads and locks away from the live ones
+        payload_cache = TwoTierCache(shared=LocMemCache(f'benchmark-sync-{uuid.uuid4().hex}', {}))
+        client = StarCitizenAPIClient(payload_cache=payload_cache)
+        client.session.mount(client.BASE_URL, adapter)
+        previous_client = set_api_client(client)
+        results = []
+        try:
+            with transaction.atomic():
+                for stage in stages:
+                    # Start cold so every run measures the fetch as well as the writes
+                    payload_cache.shared.clear()
+                    payload_cache.local.clear()
+                    name, args = commands[stage]
+                    results.append(self.run_stage(name, args, options))
+                if not options['keep']:
+                    raise _Rollback
+        except _Rollback:
+            pass
+        finally:
+            set_api_client(previous_client)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(self.style.SUCCESS('\n📊 Sync benchmark results'))
+        for result in results:
+            peak = f"{result['peak_memory_mb']:.1f} MB" if result['peak_memory_mb'] is not None else 'n/a'
+            self.stdout.write(
+                f"   {result['command']:<28} "
+                f"wall {result['wall_seconds']:.2f}s  "
+                f"db {result['db_seconds']:.2f}s  "
+                f"queries {result['queries']}  "
+                f"peak {peak}"
+            )
+        max_rss = peak_rss_kb() / 1024
+        self.stdout.write(f'   Process max RSS: {max_rss:.1f} MB')
+        if not options['keep']:
+            self.stdout.write('   Database changes rolled back (use --keep to commit)')
+
+    def run_stage(self, name, args, options):
+        """Run one sync command and measure it."""
+        trace_memory = not options['no_trace_memory']
+        counter = QueryCounter()
+        output = self.stdout if options['verbosity'] > 1 else io.StringIO()
+        command_args = args + (['--force'] if options['force'] else [])
+
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                call_command(name, *command_args, stdout=output)
+        finally:
+            wall = time.perf_counter() - start
+            peak = None
+            if trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                tracemalloc.stop()
+
+        return {
+            'command': ' '.join([name] + command_args),
+            'wall_seconds': round(wall, 4),
+            'db_seconds': round(counter.seconds, 4),
+            'queries': counter.count,
+            'peak_memory_mb': round(peak, 2) if peak is not None else None,
+        }
@@ -0,0 +1,46 @@
+"""
+Stream the ship catalog, fleet or organization roster as NDJSON or CSV.
+Usage: python manage.py export_data ships
+       python manage.py export_data roster --format csv --filter organization=FAROUT -o roster.csv
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.exports import DATASETS, FORMATS, ExportError, iter_export, parse_fields
+
+
+class Command(BaseCommand):
+    help = 'Export the ship catalog, fleet or organization roster as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(DATASETS), help='Table to export')
+        parser.add_argument('--format', choices=list(FORMATS), default='ndjson', help='Output format')
+        parser.add_argument('--fields', default='', help='Comma-separated columns (default: all)')
+        parser.add_argument(
+            '--filter',
+            action='append',
+            default=[],
+            metavar='NAME=VALUE',
+            help='Only export matching rows, e.g. organization=FAROUT (repeatable)',
+        )
+        parser.add_argument('-o', '--output', help='Write to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        filters = {}
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Filters look like NAME=VALUE, got {item!r}')
+            filters[name.strip()] = value.strip()
+
+        try:
+            content = iter_export(options['dataset'], options['format'], parse_fields(options['fields']), filters)
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        if not options['output']:
+            for chunk in content:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', encoding='utf-8', newline='') as handle:
+            handle.writelines(content)
+        self.stderr.write(f'✅ Exported {options["dataset"]} to {options["output"]}')
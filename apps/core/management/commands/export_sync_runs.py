@@ -0,0 +1,38 @@
+"""
+Export recorded sync runs as JSON.
+Usage: python manage.py export_sync_runs
+       python manage.py export_sync_runs --command sync_all --days 30 > runs.json
+"""
+import json
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.core.models import SyncRun
+
+
+class Command(BaseCommand):
+    help = 'Print recorded sync runs with their per-stage metrics as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--command', dest='sync_command', help='Only runs of this command, e.g. sync_all')
+        parser.add_argument('--days', type=int, help='Only runs started in the last N days')
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Only the N most recent runs (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        runs = SyncRun.objects.all()
+        if options['sync_command']:
+            runs = runs.filter(command=options['sync_command'])
+        if options['days']:
+            runs = runs.filter(started_at__gte=timezone.now() - timedelta(days=options['days']))
+        if options['limit']:
+            runs = runs[:options['limit']]
+
+        # Oldest first, so the output reads as a timeline
+        data = [run.as_dict() for run in runs]
+        data.reverse()
+        self.stdout.write(json.dumps(data, indent=2))
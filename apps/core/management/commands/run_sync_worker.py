@@ -0,0 +1,87 @@
+"""
+Run queued and scheduled sync jobs.
+Usage: python manage.py run_sync_worker
+       python manage.py run_sync_worker --once
+"""
+import signal
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from apps.core.jobs import claim_next, default_worker_id, enqueue_due_schedules, requeue_abandoned, run_job
+from apps.core.models import SyncJob
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run queued and scheduled sync jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run every job that is due now, then exit',
+        )
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=getattr(settings, 'SYNC_WORKER_POLL_INTERVAL', 10),
+            help='Seconds between checks for new jobs',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=0,
+            help='Exit after running this many jobs (default: no limit)',
+        )
+        parser.add_argument('--worker-id', default='', help='Name recorded on claimed jobs and leases')
+
+    def handle(self, *args, **options):
+        worker = options['worker_id'] or default_worker_id()
+        stopping = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('🛑 Stopping after the current job...')
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(f'👷 Sync worker {worker} started')
+        ran = 0
+        while not stopping.is_set():
+            close_old_connections()
+            try:
+                requeue_abandoned()
+                for job in enqueue_due_schedules():
+                    self.stdout.write(f'  🗓️  Queued {job} from schedule {job.schedule}')
+                job = claim_next(worker)
+            except Exception as e:
+                # Most likely the database is briefly unavailable; try again next poll
+                logger.error(f"Sync worker could not poll the queue: {e}")
+                job = None
+
+            if job is None:
+                if options['once']:
+                    break
+                stopping.wait(options['poll'])
+                continue
+
+            self.stdout.write(f'  ▶️  Job {job.pk}: {job} (attempt {job.attempts})')
+            job = run_job(job, worker)
+            ran += 1
+            if job.status == SyncJob.SUCCEEDED:
+                self.stdout.write(self.style.SUCCESS(f'  ✅ Job {job.pk} succeeded in {job.duration}'))
+            elif job.status == SyncJob.QUEUED:
+                self.stdout.write(self.style.WARNING(
+                    f'  🔁 Job {job.pk} failed, retrying after {job.run_after}: {job.error}'
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f'  ❌ Job {job.pk} failed: {job.error}'))
+
+            if options['max_jobs'] and ran >= options['max_jobs']:
+                break
+
+        self.stdout.write(f'👋 Sync worker {worker} stopped after {ran} jobs')
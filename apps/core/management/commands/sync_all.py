@@ -0,0 +1,203 @@
+"""
+Refresh all Star Citizen data, running independent sync stages in parallel.
+Usage: python manage.py sync_all
+       python manage.py sync_all --sids FAROUT ALLY --workers 6
+"""
+import json
+import time
+from functools import partial
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.pipeline import FAILED, SKIPPED, Pipeline, Stage
+from apps.core.starcitizen_api import get_api_client, StarCitizenAPIError, StarCitizenAPINotModified
+from apps.core.sync import DEFAULT_BATCH_SIZE, SyncStats
+from apps.core.telemetry import SyncRecorder
+from apps.organization.models import Organization
+from apps.organization.sync import MemberReconciler, upsert_organization
+from apps.starships.sync import ComponentSyncer, ShipUpserter, upsert_manufacturers
+
+
+class Command(BaseCommand):
+    help = 'Sync ships, organizations and members in dependency order, in parallel where possible'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sids',
+            nargs='*',
+            help='Organization SIDs to sync (default: STARCITIZEN_ORG_SIDS)',
+        )
+        parser.add_argument('--skip-catalog', action='store_true', help='Skip manufacturers, ships and components')
+        parser.add_argument('--skip-orgs', action='store_true', help='Skip organizations and members')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Stages run at the same time (default: 4)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Compare every column of existing rows and run stages whose upstream is unchanged',
+        )
+        parser.add_argument(
+            '--keep-departed',
+            action='store_true',
+            help='Keep members who no longer appear in the API roster',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Rows written per bulk statement (default: {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument('--json', action='store_true', help='Print stage results as JSON')
+
+    def handle(self, *args, **options):
+        sids = options['sids']
+        if sids is None:
+            sids = getattr(settings, 'STARCITIZEN_ORG_SIDS', [])
+        sids = list(dict.fromkeys(sid.upper() for sid in sids))
+        if options['skip_orgs']:
+            sids = []
+
+        self.api_client = get_api_client()
+        self.options = options
+        self.recorder = SyncRecorder('sync_all', options)
+        pipeline = self.build_pipeline(sids, catalog=not options['skip_catalog'])
+        if not pipeline.stages:
+            raise CommandError('Nothing to sync: give --sids or set STARCITIZEN_ORG_SIDS')
+
+        if not options['json']:
+            self.stdout.write(f'🔁 Running {len(pipeline.stages)} sync stages with {options["workers"]} workers...')
+
+        start = time.perf_counter()
+        with self.recorder:
+            results = pipeline.run(
+                workers=options['workers'],
+                force=options['force'],
+                on_result=self.on_result,
+            )
+        elapsed = time.perf_counter() - start
+        failed = [result for result in results if result.status == FAILED]
+
+        if options['json']:
+            self.stdout.write(json.dumps([
+                {
+                    'stage': result.name,
+                    'status': result.status,
+                    'changed': result.changed,
+                    'seconds': round(result.seconds, 4),
+                    'detail': getattr(result.detail, '__dict__', result.detail),
+                    'error': result.error,
+                }
+                for result in results
+            ], indent=2))
+        else:
+            self.summarize(results, failed, elapsed)
+        if failed:
+            # Fail the command so sync jobs see the error
+            raise CommandError(f'{len(failed)} of {len(results)} sync stages failed')
+
+    def summarize(self, results, failed, elapsed):
+        """Echo the totals of a run."""
+        skipped = [result for result in results if result.status == SKIPPED]
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(
+            f'\n✅ Sync complete in {elapsed:.1f}s!\n'
+            f'   Stages: {len(results) - len(failed) - len(skipped)} ran, '
+            f'{len(skipped)} skipped, {len(failed)} failed\n'
+            f'   Stage time: {sum(result.seconds for result in results):.1f}s'
+        ))
+
+    def build_pipeline(self, sids, catalog=True):
+        """Describe the sync stages and their dependencies."""
+        pipeline = Pipeline()
+        track = self.recorder.track
+        if catalog:
+            pipeline.add(Stage('manufacturers', track('manufacturers', self.sync_manufacturers)))
+            pipeline.add(Stage('ships', track('ships', self.sync_ships), depends_on=['manufacturers']))
+            # Components are derived from ship data, so unchanged ships mean unchanged components
+            pipeline.add(Stage(
+                'components',
+                track('components', self.sync_components),
+                depends_on=['ships'],
+                skip_if_unchanged=True,
+            ))
+        for sid in sids:
+            pipeline.add(Stage(
+                f'organization:{sid}',
+                track(f'organization:{sid}', partial(self.sync_organization, sid)),
+            ))
+            pipeline.add(Stage(
+                f'members:{sid}',
+                track(f'members:{sid}', partial(self.sync_members, sid)),
+                depends_on=[f'organization:{sid}'],
+            ))
+        return pipeline
+
+    def sync_manufacturers(self):
+        manufacturers_data = self.api_client.get_manufacturers(allow_stale=False)
+        return upsert_manufacturers(manufacturers_data, force=self.options['force'])
+
+    def sync_ships(self):
+        self.ship_upserter = ShipUpserter(
+            force=self.options['force'],
+            batch_size=self.options['batch_size'],
+            components=False,
+        )
+        try:
+            return self.ship_upserter.run(self.api_client.iter_ships(conditional=not self.options['force']))
+        except StarCitizenAPINotModified:
+            # Unchanged since the list was last streamed, so nothing to write
+            return SyncStats()
+
+    def sync_components(self):
+        syncer = ComponentSyncer(batch_size=self.options['batch_size'])
+        if self.options['force']:
+            return syncer.rebuild()
+        return syncer.rebuild(self.ship_upserter.written)
+
+    def sync_organization(self, sid):
+        org_data = self.api_client.get_organization(sid, allow_stale=False)
+        if not org_data:
+            raise StarCitizenAPIError(f'Organization {sid} not found')
+        _, action, _ = upsert_organization(sid, org_data, force=self.options['force'])
+        return SyncStats.for_action(action)
+
+    def sync_members(self, sid):
+        org = Organization.objects.get(sid=sid)
+        reconciler = MemberReconciler(
+            org,
+            force=self.options['force'],
+            batch_size=self.options['batch_size'],
+            prune=not self.options['keep_departed'],
+        )
+        members_data = self.api_client.iter_organization_members(sid, conditional=not self.options['force'])
+        try:
+            return reconciler.run(members_data)
+        except StarCitizenAPINotModified:
+            return SyncStats()
+
+    def on_result(self, result):
+        """Record stages that never ran, and echo each outcome unless printing JSON."""
+        if result.status == SKIPPED:
+            self.recorder.skip(result.name, result.error or result.detail)
+        if not self.options['json']:
+            self.report(result)
+
+    def report(self, result):
+        """Echo one stage's outcome as it finishes."""
+        if result.status == FAILED:
+            self.stdout.write(self.style.ERROR(f'  ❌ {result.name}: {result.error} ({result.seconds:.2f}s)'))
+        elif result.status == SKIPPED:
+            self.stdout.write(f'  ⏭️  {result.name}: skipped, {result.error or result.detail}')
+        else:
+            detail = result.detail
+            if hasattr(detail, 'created'):
+                summary = (
+                    f'{detail.created} created, {detail.updated} updated, '
+                    f'{detail.unchanged} unchanged, {detail.removed} removed'
+                )
+            else:
+                summary = 'changed' if result.changed else 'unchanged'
+            self.stdout.write(f'  ✅ {result.name}: {summary} ({result.seconds:.2f}s)')
@@ -0,0 +1,237 @@
+# Generated by Django 5.1.3 on 2026-10-17 17:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncLease",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, unique=True, verbose_name="Name"),
+                ),
+                ("holder", models.CharField(max_length=200, verbose_name="Holder")),
+                (
+                    "acquired_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Acquired"
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(verbose_name="Expires")),
+            ],
+            options={
+                "verbose_name": "Sync Lease",
+                "verbose_name_plural": "Sync Leases",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="SyncSchedule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=100, unique=True, verbose_name="Name"),
+                ),
+                (
+                    "command",
+                    models.CharField(
+                        choices=[
+                            ("sync_all", "Sync everything"),
+                            ("sync_ships", "Sync ships"),
+                            ("sync_organization", "Sync organization"),
+                            ("sync_org_members", "Sync organization members"),
+                            ("sync_orgs", "Sync organizations"),
+                        ],
+                        max_length=50,
+                        verbose_name="Command",
+                    ),
+                ),
+                (
+                    "args",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text='Command line arguments, e.g. ["FAROUT", "--force"]',
+                        verbose_name="Arguments",
+                    ),
+                ),
+                (
+                    "interval",
+                    models.PositiveIntegerField(
+                        default=86400, verbose_name="Interval (seconds)"
+                    ),
+                ),
+                ("enabled", models.BooleanField(default=True, verbose_name="Enabled")),
+                (
+                    "next_run_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Next Run"
+                    ),
+                ),
+                (
+                    "last_enqueued_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Last Queued"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated"),
+                ),
+            ],
+            options={
+                "verbose_name": "Sync Schedule",
+                "verbose_name_plural": "Sync Schedules",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="SyncJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "command",
+                    models.CharField(
+                        choices=[
+                            ("sync_all", "Sync everything"),
+                            ("sync_ships", "Sync ships"),
+                            ("sync_organization", "Sync organization"),
+                            ("sync_org_members", "Sync organization members"),
+                            ("sync_orgs", "Sync organizations"),
+                        ],
+                        max_length=50,
+                        verbose_name="Command",
+                    ),
+                ),
+                (
+                    "args",
+                    models.JSONField(
+                        blank=True, default=list, verbose_name="Arguments"
+                    ),
+                ),
+                (
+                    "lock_key",
+                    models.CharField(
+                        help_text="Comma-separated leases the job holds while running; jobs sharing one never overlap",
+                        max_length=255,
+                        verbose_name="Lock Key",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "run_after",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Run After"
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Attempts"),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveIntegerField(default=3, verbose_name="Max Attempts"),
+                ),
+                (
+                    "worker",
+                    models.CharField(blank=True, max_length=200, verbose_name="Worker"),
+                ),
+                (
+                    "requested_by",
+                    models.CharField(
+                        blank=True, max_length=150, verbose_name="Requested By"
+                    ),
+                ),
+                ("output", models.TextField(blank=True, verbose_name="Output")),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Started"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished"
+                    ),
+                ),
+                (
+                    "schedule",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="jobs",
+                        to="core.syncschedule",
+                        verbose_name="Schedule",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Sync Job",
+                "verbose_name_plural": "Sync Jobs",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"],
+                        name="core_syncjo_status_2de91e_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,140 @@
+# Generated by Django 5.1.3 on 2026-10-17 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_sync_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "command",
+                    models.CharField(
+                        db_index=True, max_length=50, verbose_name="Command"
+                    ),
+                ),
+                (
+                    "args",
+                    models.JSONField(blank=True, default=dict, verbose_name="Options"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="running",
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "fetched",
+                    models.PositiveIntegerField(default=0, verbose_name="Fetched"),
+                ),
+                (
+                    "created",
+                    models.PositiveIntegerField(default=0, verbose_name="Created"),
+                ),
+                (
+                    "updated",
+                    models.PositiveIntegerField(default=0, verbose_name="Updated"),
+                ),
+                (
+                    "skipped",
+                    models.PositiveIntegerField(default=0, verbose_name="Skipped"),
+                ),
+                (
+                    "unchanged",
+                    models.PositiveIntegerField(default=0, verbose_name="Unchanged"),
+                ),
+                (
+                    "removed",
+                    models.PositiveIntegerField(default=0, verbose_name="Removed"),
+                ),
+                (
+                    "errors",
+                    models.PositiveIntegerField(default=0, verbose_name="Errors"),
+                ),
+                (
+                    "api_seconds",
+                    models.FloatField(default=0, verbose_name="API Time (s)"),
+                ),
+                (
+                    "db_seconds",
+                    models.FloatField(default=0, verbose_name="Database Time (s)"),
+                ),
+                (
+                    "query_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Queries"),
+                ),
+                (
+                    "request_count",
+                    models.PositiveIntegerField(default=0, verbose_name="API Requests"),
+                ),
+                (
+                    "bytes_downloaded",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Bytes Downloaded"
+                    ),
+                ),
+                (
+                    "peak_rss_kb",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Peak resident memory of the process that ran the sync",
+                        null=True,
+                        verbose_name="Peak Memory (KiB)",
+                    ),
+                ),
+                (
+                    "stages",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="The same measurements for each stage",
+                        verbose_name="Stages",
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Started"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Sync Run",
+                "verbose_name_plural": "Sync Runs",
+                "ordering": ["-started_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["command", "started_at"],
+                        name="core_syncru_command_55f89a_idx",
+                    )
+                ],
+            },
+        ),
+    ]
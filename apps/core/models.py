@@ -1,3 +1,250 @@
+"""
+Core models: the database-backed queue for background sync jobs, the
+telemetry recorded for each sync run and the version counters of cached data.
+"""
 from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+# Management commands that may be queued as sync jobs
+SYNC_COMMAND_CHOICES = [
+    ('sync_all', _('Sync everything')),
+    ('sync_ships', _('Sync ships')),
+    ('sync_organization', _('Sync organization')),
+    ('sync_org_members', _('Sync organization members')),
+    ('sync_orgs', _('Sync organizations')),
+]
+
+
+class SyncSchedule(models.Model):
+    """A sync command queued periodically by the sync worker."""
+
+    name = models.CharField(_('Name'), max_length=100, unique=True)
+    command = models.CharField(_('Command'), max_length=50, choices=SYNC_COMMAND_CHOICES)
+    args = models.JSONField(
+        _('Arguments'),
+        default=list,
+        blank=True,
+        help_text=_('Command line arguments, e.g. ["FAROUT", "--force"]')
+    )
+    interval = models.PositiveIntegerField(_('Interval (seconds)'), default=86400)
+    enabled = models.BooleanField(_('Enabled'), default=True)
+    next_run_at = models.DateTimeField(_('Next Run'), default=timezone.now)
+    last_enqueued_at = models.DateTimeField(_('Last Queued'), null=True, blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(_('Created'), auto_now_add=True)
+    updated_at = models.DateTimeField(_('Updated'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Sync Schedule')
+        verbose_name_plural = _('Sync Schedules')
+        ordering = ['name']
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class SyncJob(models.Model):
+    """One queued or executed run of a sync command."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (QUEUED, _('Queued')),
+        (RUNNING, _('Running')),
+        (SUCCEEDED, _('Succeeded')),
+        (FAILED, _('Failed')),
+    ]
+
+    command = models.CharField(_('Command'), max_length=50, choices=SYNC_COMMAND_CHOICES)
+    args = models.JSONField(_('Arguments'), default=list, blank=True)
+    lock_key = models.CharField(
+        _('Lock Key'),
+        max_length=255,
+        help_text=_('Comma-separated leases the job holds while running; jobs sharing one never overlap')
+    )
+    schedule = models.ForeignKey(
+        SyncSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name=_('Schedule')
+    )
+
+    # State
+    status = models.CharField(_('Status'), max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    run_after = models.DateTimeField(_('Run After'), default=timezone.now)
+    attempts = models.PositiveIntegerField(_('Attempts'), default=0)
+    max_attempts = models.PositiveIntegerField(_('Max Attempts'), default=3)
+    worker = models.CharField(_('Worker'), max_length=200, blank=True)
+    requested_by = models.CharField(_('Requested By'), max_length=150, blank=True)
+
+    # Results
+    output = models.TextField(_('Output'), blank=True)
+    error = models.TextField(_('Error'), blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(_('Created'), auto_now_add=True)
+    started_at = models.DateTimeField(_('Started'), null=True, blank=True)
+    finished_at = models.DateTimeField(_('Finished'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Sync Job')
+        verbose_name_plural = _('Sync Jobs')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.command} {' '.join(self.args)}".strip()
+
+    @property
+    def duration(self):
+        if self.started_at and self.finished_at:
+            return self.finished_at - self.started_at
+        return None
+
+
+class SyncLease(models.Model):
+    """
+    A named, time-limited lock held by one worker.
+
+    Holders extend ``expires_at`` with heartbeats while they work; a lease
+    whose holder died simply expires and can be taken over.
+    """
+
+    name = models.CharField(_('Name'), max_length=255, unique=True)
+    holder = models.CharField(_('Holder'), max_length=200)
+    acquired_at = models.DateTimeField(_('Acquired'), default=timezone.now)
+    expires_at = models.DateTimeField(_('Expires'))
+
+    class Meta:
+        verbose_name = _('Sync Lease')
+        verbose_name_plural = _('Sync Leases')
+        ordering = ['name']
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.holder})"
+
+
+class SyncRun(models.Model):
+    """Timing and row counts recorded for one run of a sync command."""
+
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (RUNNING, _('Running')),
+        (SUCCEEDED, _('Succeeded')),
+        (FAILED, _('Failed')),
+    ]
+
+    command = models.CharField(_('Command'), max_length=50, db_index=True)
+    args = models.JSONField(_('Options'), default=dict, blank=True)
+    status = models.CharField(_('Status'), max_length=20, choices=STATUS_CHOICES, default=RUNNING)
+    error = models.TextField(_('Error'), blank=True)
+
+    # Rows, summed over all stages
+    fetched = models.PositiveIntegerField(_('Fetched'), default=0)
+    created = models.PositiveIntegerField(_('Created'), default=0)
+    updated = models.PositiveIntegerField(_('Updated'), default=0)
+    skipped = models.PositiveIntegerField(_('Skipped'), default=0)
+    unchanged = models.PositiveIntegerField(_('Unchanged'), default=0)
+    removed = models.PositiveIntegerField(_('Removed'), default=0)
+    errors = models.PositiveIntegerField(_('Errors'), default=0)
+
+    # Resources, summed over all stages
+    api_seconds = models.FloatField(_('API Time (s)'), default=0)
+    db_seconds = models.FloatField(_('Database Time (s)'), default=0)
+    query_count = models.PositiveIntegerField(_('Queries'), default=0)
+    request_count = models.PositiveIntegerField(_('API Requests'), default=0)
+    bytes_downloaded = models.PositiveBigIntegerField(_('Bytes Downloaded'), default=0)
+    peak_rss_kb = models.PositiveIntegerField(
+        _('Peak Memory (KiB)'),
+        null=True,
+        blank=True,
+        help_text=_('Peak resident memory of the process that ran the sync')
+    )
+    stages = models.JSONField(
+        _('Stages'),
+        default=list,
+        blank=True,
+        help_text=_('The same measurements for each stage')
+    )
+
+    # Timestamps
+    started_at = models.DateTimeField(_('Started'), auto_now_add=True)
+    finished_at = models.DateTimeField(_('Finished'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Sync Run')
+        verbose_name_plural = _('Sync Runs')
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['command', 'started_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.command} at {self.started_at:%Y-%m-%d %H:%M}"
+
+    @property
+    def duration(self):
+        if self.started_at and self.finished_at:
+            return self.finished_at - self.started_at
+        return None
+
+    def as_dict(self) -> dict:
+        """The run as JSON-serializable data."""
+        return {
+            'id': self.pk,
+            'command': self.command,
+            'options': self.args,
+            'status': self.status,
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'seconds': self.duration.total_seconds() if self.duration else None,
+            'fetched': self.fetched,
+            'created': self.created,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'unchanged': self.unchanged,
+            'removed': self.removed,
+            'errors': self.errors,
+            'api_seconds': self.api_seconds,
+            'db_seconds': self.db_seconds,
+            'query_count': self.query_count,
+            'request_count': self.request_count,
+            'bytes_downloaded': self.bytes_downloaded,
+            'peak_rss_kb': self.peak_rss_kb,
+            'stages': self.stages,
+        }
+
+
+class DataVersion(models.Model):
+    """
+    A counter bumped whenever a set of data changes, e.g. the ship catalog.
+
+    Caches derived from that data store the version they were built from and
+    are rebuilt once it moves on; see ``apps.core.versions``.
+    """
+
+    name = models.CharField(_('Name'), max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(_('Version'), default=1)
+    updated_at = models.DateTimeField(_('Updated'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Data Version')
+        verbose_name_plural = _('Data Versions')
+        ordering = ['name']
+
+    def __str__(self) -> str:
+        return f"{self.name} v{self.version}"
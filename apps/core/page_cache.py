@@ -0,0 +1,109 @@
+"""
+Full-response cache for pages anonymous visitors see.
+
+Responses are cached under a key made of the path, the language, the query
+parameters the page actually reads (sorted, empty ones dropped, anything else
+such as tracking parameters ignored) and the current version of the data the
+page shows; see ``apps.core.versions``. Bumping that version invalidates
+every cached page in one step, and the old entries simply expire.
+
+Pages are kept in an in-process LRU in front of the shared cache, so a hot
+page is served without leaving the process. Entries never go stale there,
+since a new data version means new keys.
+
+An entry holds the body and every header the view set, such as
+Content-Language or Vary, so a hit is the response the view returned.
+Headers added by middleware after the view are added to hits the same way.
+"""
+import hashlib
+from functools import wraps
+from typing import Optional, Sequence
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.http import urlencode
+from django.utils.translation import get_language
+from .api_cache import LocalCache
+from .versions import current
+
+_local: Optional[LocalCache] = None
+
+
+def local_cache() -> LocalCache:
+    global _local
+    if _local is None:
+        _local = LocalCache(getattr(settings, 'PAGE_CACHE_LOCAL_SIZE', 256))
+    return _local
+
+
+def normalized_query(request, params: Sequence[str]) -> str:
+    """The query parameters a page reads, sorted and without empty values."""
+    values = {name: request.GET.get(name, '') for name in params}
+    return urlencode(sorted((name, value) for name, value in values.items() if value))
+
+
+def page_cache_key(request, version: int, params: Sequence[str]) -> str:
+    query = normalized_query(request, params)
+    digest = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    return f'page:{version}:{get_language()}:{digest}'
+
+
+def response_from_entry(entry) -> HttpResponse:
+    """Rebuild a cached response from its ``(content, headers)`` entry."""
+    content, headers = entry
+    if isinstance(headers, str):
+        # Entries cached before headers were stored hold only the content type
+        headers = [('Content-Type', headers)]
+    response = HttpResponse(content)
+    for name, value in headers:
+        response[name] = value
+    return response
+
+
+def is_cacheable(request) -> bool:
+    """Only plain GETs by anonymous visitors without pending messages share responses."""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    if user is None or user.is_authenticated:
+        return False
+    return not len(get_messages(request))
+
+
+def cache_anonymous_page(version_name: str, params: Sequence[str] = (), timeout: Optional[int] = None):
+    """
+    Decorate a view to cache its successful responses to anonymous visitors.
+
+    Args:
+        version_name: Data version the page depends on, e.g. the catalog's
+        params: Query parameters that change the page
+        timeout: Seconds entries live in the shared cache; default
+            ``PAGE_CACHE_TIMEOUT``
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable(request):
+                return view(request, *args, **kwargs)
+
+            key = page_cache_key(request, current(version_name), params)
+            local = local_cache()
+            entry = local.get(key)
+            if entry is None:
+                entry = cache.get(key)
+                if entry is not None:
+                    local.set(key, entry)
+            if entry is not None:
+                return response_from_entry(entry)
+
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                entry = (response.content, list(response.items()))
+                cache.set(key, entry, timeout or getattr(settings, 'PAGE_CACHE_TIMEOUT', 3600))
+                local.set(key, entry)
+            return response
+        return wrapper
+    return decorator
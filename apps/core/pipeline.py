@@ -0,0 +1,168 @@
+"""
+Dependency-ordered execution of sync stages.
+
+A ``Pipeline`` is a DAG of named ``Stage`` objects. Stages run on a thread
+pool as soon as everything they depend on has finished, so independent
+branches (the ship catalog and each organization, say) progress in parallel.
+A failed stage skips its dependents, and stages that only derive data from their
+upstream are skipped when none of it changed.
+"""
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Stage outcomes
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+class PipelineError(Exception):
+    """Raised for an invalid stage graph."""
+    pass
+
+
+@dataclass
+class Stage:
+    """
+    One unit of sync work.
+
+    ``run`` returns its stats; the stage changed data when their ``changed``
+    attribute (or, lacking one, the value itself) is truthy. With
+    ``skip_if_unchanged``, the stage is skipped when every stage it depends
+    on succeeded without changing anything.
+    """
+
+    name: str
+    run: Callable[[], object]
+    depends_on: Sequence[str] = ()
+    skip_if_unchanged: bool = False
+
+
+@dataclass
+class StageResult:
+    """Outcome and timing of one stage."""
+
+    name: str
+    status: str
+    changed: bool = False
+    seconds: float = 0.0
+    detail: object = None
+    error: str = ''
+
+
+@dataclass
+class Pipeline:
+    """A DAG of stages run with bounded parallelism."""
+
+    stages: Dict[str, Stage] = field(default_factory=dict)
+
+    def add(self, stage: Stage) -> Stage:
+        if stage.name in self.stages:
+            raise PipelineError(f'Duplicate stage {stage.name!r}')
+        self.stages[stage.name] = stage
+        return stage
+
+    def validate(self) -> None:
+        """Check that every dependency exists and the graph has no cycles."""
+        for stage in self.stages.values():
+            for dep in stage.depends_on:
+                if dep not in self.stages:
+                    raise PipelineError(f'Stage {stage.name!r} depends on unknown stage {dep!r}')
+
+        visiting, done = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise PipelineError(f'Dependency cycle through stage {name!r}')
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def run(
+        self,
+        workers: int = 4,
+        force: bool = False,
+        on_result: Optional[Callable[[StageResult], None]] = None,
+    ) -> List[StageResult]:
+        """
+        Run every stage once its dependencies have finished.
+
+        Args:
+            workers: Stages run at the same time
+            force: Run ``skip_if_unchanged`` stages regardless
+            on_result: Called with each result as it becomes available
+
+        Returns:
+            Results in completion order
+        """
+        self.validate()
+        results: Dict[str, StageResult] = {}
+        ordered: List[StageResult] = []
+        pending = dict(self.stages)
+
+        def finish(result: StageResult) -> None:
+            results[result.name] = result
+            ordered.append(result)
+            if on_result:
+                on_result(result)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='sync-stage') as executor:
+            running = {}
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    deps = [results.get(dep) for dep in stage.depends_on]
+                    if any(dep is None for dep in deps):
+                        continue
+                    del pending[name]
+
+                    # Stages skipped as unchanged count as succeeded without changes
+                    blocked = [dep.name for dep in deps if dep.status == FAILED or dep.error]
+                    if blocked:
+                        finish(StageResult(name, SKIPPED, error=f'upstream {", ".join(blocked)} did not succeed'))
+                    elif stage.skip_if_unchanged and deps and not force and not any(dep.changed for dep in deps):
+                        finish(StageResult(name, SKIPPED, detail='upstream unchanged'))
+                    else:
+                        running[executor.submit(self._run_stage, stage)] = name
+
+                if not running:
+                    # Everything left was resolved as skipped above; loop to release its dependents
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    finish(future.result())
+
+        return ordered
+
+    @staticmethod
+    def _run_stage(stage: Stage) -> StageResult:
+        """Run one stage on a worker thread, capturing its outcome."""
+        start = time.perf_counter()
+        try:
+            detail = stage.run()
+            return StageResult(
+                stage.name,
+                SUCCEEDED,
+                changed=bool(getattr(detail, 'changed', detail)),
+                seconds=time.perf_counter() - start,
+                detail=detail,
+            )
+        except Exception as e:
+            logger.exception(f"Sync stage {stage.name} failed")
+            return StageResult(stage.name, FAILED, seconds=time.perf_counter() - start, error=str(e))
+        finally:
+            # Each worker thread opened its own database connection
+            connection.close()
@@ -1,11 +1,23 @@
 """
 Star Citizen API client for fetching ship and organization data.
 """
+import asyncio
 import requests
 import logging
-from typing import Dict, List, Optional, Any
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Any
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from django.conf import settings
-from django.core.cache import cache
+from .api_cache import TwoTierCache, payload_cache as default_payload_cache
+from .api_policy import RETRY_STATUSES, RequestPolicy, parse_retry_after
+from .json_stream import JSONStreamError, iter_json_array
+from .telemetry import metered, record_api
 
 logger = logging.getLogger(__name__)
 
@@ -15,173 +27,824 @@ class StarCitizenAPIError(Exception):
     pass
 
 
+class StarCitizenAPIUnavailable(StarCitizenAPIError):
+    """Raised without contacting the API while its circuit breaker is open."""
+    pass
+
+
+class StarCitizenAPINotModified(Exception):
+    """
+    Raised by the streaming ``iter_*`` methods when the API reports that a
+    payload has not changed since it was last streamed in full.
+
+    Streamed payloads are too large to cache, so there is nothing to iterate;
+    whatever was built from the previous download is still current.
+    """
+    pass
+
+
+@dataclass
+class CachedPayload:
+    """
+    An API payload stored in the cache with its validators.
+
+    Payloads that were streamed are stored without their body (``data`` is
+    None). Such entries are never fresh and only serve to make the next
+    request conditional.
+    """
+
+    data: Any
+    etag: str = ''
+    last_modified: str = ''
+    fresh_until: float = 0.0
+
+    @property
+    def has_body(self) -> bool:
+        return self.data is not None
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.has_body and time.time() < self.fresh_until
+
+
 class StarCitizenAPIClient:
     """Client for interacting with Star Citizen API."""
 
     BASE_URL = "https://api.starcitizen-api.com"
     CACHE_TIMEOUT = 3600  # 1 hour
+    STALE_TIMEOUT = 86400  # serve stale data for up to 24 hours past expiry
+    STREAM_CHUNK_SIZE = 64 * 1024
+    LOCK_TIMEOUT = 60  # upper bound on how long one caller may hold a refresh
+    LOCK_WAIT = 10  # how long other callers wait for that refresh to land
+    LOCK_POLL_INTERVAL = 0.1
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        payload_cache: Optional[TwoTierCache] = None,
+        policy: Optional[RequestPolicy] = None,
+        pool_size: Optional[int] = None,
+    ):
+        """
+        Initialize the API client.
 
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize the API client."""
+        Args:
+            api_key: API key; defaults to ``STARCITIZEN_API_KEY``
+            payload_cache: Cache for API payloads; defaults to the process-wide one
+            policy: Pacing, retry and circuit breaker policy; defaults to the
+                process-wide one
+            pool_size: Connections kept open to the API, at least one per thread
+                using the client at once; urllib3's default of 10 when None
+        """
         self.api_key = api_key or getattr(settings, 'STARCITIZEN_API_KEY', None)
-        self.session = requests.Session()
-        if self.api_key:
-            self.session.headers.update({'Authorization': f'Bearer {self.api_key}'})
-        self.session.headers.update({
-            'User-Agent': 'Farout-Django/1.0',
-            'Accept': 'application/json'
-        })
-
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make a request to the Star Citizen API."""
+        self.cache = payload_cache or default_payload_cache
+        self.policy = policy or RequestPolicy.default()
+        self.pool_size = pool_size
+        self._session = None
+        self._session_pid = None
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session, created on first use and again in each forked child process."""
+        if self._session is None or self._session_pid != os.getpid():
+            session = requests.Session()
+            if self.api_key:
+                session.headers.update({'Authorization': f'Bearer {self.api_key}'})
+            session.headers.update({
+                'User-Agent': 'Farout-Django/1.0',
+                'Accept': 'application/json'
+            })
+            if self.pool_size:
+                # Mounted here so sessions rebuilt after a fork keep the pool size
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+            self._session = session
+            self._session_pid = os.getpid()
+        return self._session
+
+    @session.setter
+    def session(self, session: requests.Session) -> None:
+        self._session = session
+        self._session_pid = os.getpid()
+
+    def _request(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        """
+        Send a GET request to the Star Citizen API and return the raw response.
+
+        Requests are paced per endpoint by the client's policy. Timeouts,
+        connection errors, 429 and 5xx responses are retried with jittered
+        exponential backoff (or the server's Retry-After); once they run out,
+        the failure counts towards the circuit breaker, as does any other
+        error. While the circuit is open, requests fail immediately with
+        StarCitizenAPIUnavailable.
+        """
         url = f"{self.BASE_URL}/{endpoint.lstrip('/')}"
-
+        policy = self.policy
+
+        if not policy.breaker.allow_request():
+            raise StarCitizenAPIUnavailable(f"Circuit open, not requesting {url}")
+
+        attempt = 0
+        while True:
+            policy.throttle(endpoint)
+            retry_after = None
+            try:
+                logger.debug(f"Making request to {url} with params {params}")
+                start = time.perf_counter()
+                try:
+                    response = self.session.get(
+                        url, params=params, headers=headers, timeout=policy.timeout, stream=stream
+                    )
+                except requests.exceptions.RequestException:
+                    record_api(time.perf_counter() - start, requests=1)
+                    raise
+                # Streamed bodies are metered as they are read
+                record_api(time.perf_counter() - start, 0 if stream else len(response.content), requests=1)
+                if response.status_code in RETRY_STATUSES:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    response.close()
+                response.raise_for_status()
+                policy.breaker.record_success()
+                return response
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code not in RETRY_STATUSES:
+                    # The API answered; a 404 or similar says nothing about its health
+                    policy.breaker.record_success()
+                    logger.error(f"HTTP error fetching {url}: {e}")
+                    raise StarCitizenAPIError(f"HTTP error: {e}")
+                error = StarCitizenAPIError(f"HTTP error: {e}")
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = StarCitizenAPIError(f"Request error: {e}")
+            except requests.exceptions.RequestException as e:
+                # Not worth retrying, but it still has to resolve a half-open
+                # circuit's trial request, or the circuit stays half-open
+                policy.breaker.record_failure()
+                logger.error(f"Request error fetching {url}: {e}")
+                raise StarCitizenAPIError(f"Request error: {e}")
+            except Exception:
+                policy.breaker.record_failure()
+                raise
+
+            if attempt >= policy.max_retries:
+                policy.breaker.record_failure()
+                logger.error(f"Giving up on {url} after {attempt + 1} attempts: {error}")
+                raise error
+
+            delay = policy.retry_delay(attempt, retry_after)
+            attempt += 1
+            logger.warning(f"{error} for {url}, retry {attempt}/{policy.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    def _decode(self, response: requests.Response) -> Dict[str, Any]:
+        """Decode a JSON response body."""
         try:
-            logger.debug(f"Making request to {url} with params {params}")
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
             data = response.json()
-            logger.debug(f"Response: {data}")
-            return data
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error fetching {url}: {e}")
-            raise StarCitizenAPIError(f"HTTP error: {e}")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error fetching {url}: {e}")
-            raise StarCitizenAPIError(f"Request error: {e}")
         except ValueError as e:
-            logger.error(f"JSON decode error for {url}: {e}")
+            logger.error(f"JSON decode error for {response.url}: {e}")
             raise StarCitizenAPIError(f"Invalid JSON response: {e}")
+        logger.debug(f"Response: {data}")
+        return data
 
-    def get_ships(self) -> List[Dict[str, Any]]:
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make a request to the Star Citizen API."""
+        return self._decode(self._request(endpoint, params=params))
+
+    def _get_cached_payload(
+        self,
+        cache_key: str,
+        revalidate: bool = False,
+        validators_only: bool = False,
+    ) -> Optional[CachedPayload]:
         """
-        Fetch all ships from the API.
+        Return the cached payload for a key, ignoring entries in an older format.
+
+        Entries holding only validators are ignored too unless ``validators_only``
+        is set, since callers that need the data cannot use them.
+        """
+        entry = self.cache.get(cache_key, revalidate=revalidate)
+        if not isinstance(entry, CachedPayload):
+            return None
+        if not entry.has_body and not validators_only:
+            return None
+        return entry
+
+    def _acquire_lock(self, lock_key: str) -> Optional[str]:
+        """Try to take a cross-process lock in the cache, returning its token if acquired."""
+        token = uuid.uuid4().hex
+        if self.cache.shared.add(lock_key, token, self.LOCK_TIMEOUT):
+            return token
+        return None
+
+    def _release_lock(self, lock_key: str, token: str) -> None:
+        """Release a lock unless it has expired and been taken over by another caller."""
+        if self.cache.shared.get(lock_key) == token:
+            self.cache.shared.delete(lock_key)
+
+    def _take_refresh_lock(
+        self,
+        cache_key: str,
+        wait: bool = True,
+    ) -> Tuple[Optional[str], Optional[CachedPayload]]:
+        """
+        Take the lock that lets only one caller across all processes hit the
+        API for a given key at a time.
+
+        While another caller holds the lock, poll it until it is released and
+        then look for that caller's result in the cache. If nothing usable
+        appears within ``LOCK_WAIT``, give up so the caller fetches itself.
 
         Returns:
-            List of ship dictionaries
+            The lock token, or None if the lock was not taken; and the fresh
+            entry another caller stored meanwhile, if any
+        """
+        lock_key = f'{cache_key}_lock'
+        deadline = time.monotonic() + self.LOCK_WAIT
+
+        token = self._acquire_lock(lock_key)
+        if token is not None or not wait:
+            return token, None
+
+        while time.monotonic() < deadline:
+            while self.cache.shared.get(lock_key) is not None and time.monotonic() < deadline:
+                time.sleep(self.LOCK_POLL_INTERVAL)
+
+            refreshed = self._get_cached_payload(cache_key, revalidate=True)
+            if refreshed is not None and refreshed.is_fresh:
+                return None, refreshed
+
+            token = self._acquire_lock(lock_key)
+            if token is not None:
+                return token, None
+
+        logger.warning(f"Timed out waiting for refresh of {cache_key}, fetching directly")
+        return None, None
+
+    def _refresh(
+        self,
+        cache_key: str,
+        endpoint: str,
+        entry: Optional[CachedPayload] = None,
+        wait: bool = True,
+    ) -> Optional[CachedPayload]:
         """
-        cache_key = 'starcitizen_ships_all'
-        cached_data = cache.get(cache_key)
+        Refresh a cache entry, letting only one caller across all processes
+        hit the API for a given key at a time.
 
-        if cached_data:
-            logger.info("Returning cached ships data")
-            return cached_data
+        The caller that wins the lock fetches the endpoint; others wait for
+        its result, see ``_take_refresh_lock``. With ``wait=False`` a busy
+        lock returns None immediately.
+        """
+        token, refreshed = self._take_refresh_lock(cache_key, wait)
+        if refreshed is not None:
+            return refreshed
+        if token is None and not wait:
+            return None
 
         try:
-            data = self._make_request('v1/cache/ships')
-            ships = data.get('data', [])
-            cache.set(cache_key, ships, self.CACHE_TIMEOUT)
-            logger.info(f"Fetched {len(ships)} ships from API")
+            return self._fetch(cache_key, endpoint, entry)
+        finally:
+            if token is not None:
+                self._release_lock(f'{cache_key}_lock', token)
+
+    @staticmethod
+    def _conditional_headers(entry: Optional[CachedPayload]) -> Optional[Dict[str, str]]:
+        """Build If-None-Match/If-Modified-Since headers from a cached entry's validators."""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers or None
+
+    def _fetch(self, cache_key: str, endpoint: str, entry: Optional[CachedPayload] = None) -> CachedPayload:
+        """
+        Fetch an endpoint and store the result in the cache.
+
+        When a previous entry is given, the request is made conditional on its
+        validators and a 304 response simply extends the entry's freshness.
+        """
+        response = self._request(endpoint, headers=self._conditional_headers(entry))
+        fresh_until = time.time() + self.CACHE_TIMEOUT
+
+        if response.status_code == 304 and entry is not None:
+            logger.info(f"{cache_key} not modified, renewing cached data")
+            # The entry may be the local cache tier's own object; never change it in place
+            entry = replace(entry, fresh_until=fresh_until)
+        else:
+            entry = CachedPayload(
+                data=self._decode(response).get('data'),
+                etag=response.headers.get('ETag', ''),
+                last_modified=response.headers.get('Last-Modified', ''),
+                fresh_until=fresh_until,
+            )
+
+        if entry.data:
+            self.cache.set(cache_key, entry, self.CACHE_TIMEOUT + self.STALE_TIMEOUT)
+        return entry
+
+    def _revalidate(self, cache_key: str, endpoint: str, entry: CachedPayload) -> None:
+        """Refresh a stale cache entry, logging rather than raising on failure."""
+        try:
+            # Another caller already refreshing this key is as good as us doing it
+            self._refresh(cache_key, endpoint, entry, wait=False)
+        except StarCitizenAPIError as e:
+            logger.warning(f"Background refresh of {cache_key} failed: {e}")
+        finally:
+            with self._revalidating_lock:
+                self._revalidating.discard(cache_key)
+
+    def _revalidate_in_background(self, cache_key: str, endpoint: str, entry: CachedPayload) -> None:
+        """Start a background refresh of a stale entry unless one is already running."""
+        with self._revalidating_lock:
+            if cache_key in self._revalidating:
+                return
+            self._revalidating.add(cache_key)
+
+        # Not a daemon thread so short-lived processes still persist the refresh
+        thread = threading.Thread(
+            target=self._revalidate,
+            args=(cache_key, endpoint, entry),
+            name=f'revalidate-{cache_key}',
+        )
+        thread.start()
+
+    def _cached_get(self, cache_key: str, endpoint: str, allow_stale: bool = True) -> Any:
+        """
+        Return the ``data`` field of an endpoint's payload, using the cache.
+
+        Fresh entries are returned directly. Stale entries are returned
+        immediately when ``allow_stale`` is set while a conditional refresh
+        runs in the background; otherwise they are revalidated first. If a
+        refresh fails, stale data is served in preference to an error.
+        """
+        entry = self._get_cached_payload(cache_key)
+
+        if entry is not None and entry.is_fresh:
+            logger.info(f"Returning cached data for {cache_key}")
+            return entry.data
+
+        if entry is not None and allow_stale:
+            logger.info(f"Returning stale data for {cache_key}, refreshing in background")
+            self._revalidate_in_background(cache_key, endpoint, entry)
+            return entry.data
+
+        try:
+            return self._refresh(cache_key, endpoint, entry).data
+        except StarCitizenAPIError as e:
+            if entry is None:
+                raise
+            logger.warning(f"Refresh of {cache_key} failed, returning stale data: {e}")
+            return entry.data
+
+    def _iter_cached(self, cache_key: str, endpoint: str, conditional: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the items of an endpoint's ``data`` array.
+
+        Fresh cached data is iterated directly. Otherwise the caller takes the
+        same single-flight lock as ``_refresh`` and makes a conditional
+        request: a 304 renews and iterates the cached entry, while a full
+        response is parsed incrementally as it downloads. Streamed payloads
+        are too large to cache whole, so once one has been read to the end
+        only its validators are stored; a later 304 against them raises
+        StarCitizenAPINotModified.
+
+        The lock covers the request only and is released as soon as the
+        response headers are in, before any item is yielded. Callers may
+        spend far longer than ``LOCK_TIMEOUT`` consuming the items, and
+        waiters gain nothing from the stream anyway since its body is not
+        cached.
+
+        Args:
+            cache_key: Cache key of the payload
+            endpoint: API endpoint to stream
+            conditional: Make the request conditional on validators left by an
+                earlier stream; turn off to download the payload regardless
+
+        Raises:
+            StarCitizenAPINotModified: If the payload is unchanged since it was
+                last streamed
+        """
+        entry = self._get_cached_payload(cache_key, validators_only=conditional)
+        if entry is not None and entry.is_fresh:
+            logger.info(f"Iterating cached data for {cache_key}")
+            yield from entry.data
+            return
+
+        token, refreshed = self._take_refresh_lock(cache_key)
+        if refreshed is not None:
+            logger.info(f"Iterating data refreshed by another caller for {cache_key}")
+            yield from refreshed.data
+            return
+
+        def release():
+            nonlocal token
+            if token is not None:
+                self._release_lock(f'{cache_key}_lock', token)
+                token = None
+
+        try:
+            yield from self._stream(cache_key, endpoint, entry, on_response=release)
+        finally:
+            release()
+
+    def _stream(
+        self,
+        cache_key: str,
+        endpoint: str,
+        entry: Optional[CachedPayload] = None,
+        on_response: Optional[Callable[[], None]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Request an endpoint conditionally on ``entry`` and yield its ``data`` items as they download.
+
+        ``on_response`` is called once the outcome of the request is known and
+        any renewed entry is stored, before the first item is yielded.
+        """
+        on_response = on_response or (lambda: None)
+        try:
+            response = self._request(endpoint, headers=self._conditional_headers(entry), stream=True)
+        except StarCitizenAPIError as e:
+            on_response()
+            if entry is None or not entry.has_body:
+                raise
+            logger.warning(f"Refresh of {cache_key} failed, iterating stale data: {e}")
+            yield from entry.data
+            return
+
+        with response:
+            if response.status_code == 304 and entry is not None:
+                if not entry.has_body:
+                    on_response()
+                    logger.info(f"{cache_key} not modified since it was last streamed")
+                    raise StarCitizenAPINotModified(f"{endpoint} not modified")
+                logger.info(f"{cache_key} not modified, renewing cached data")
+                entry = replace(entry, fresh_until=time.time() + self.CACHE_TIMEOUT)
+                self.cache.set(cache_key, entry, self.CACHE_TIMEOUT + self.STALE_TIMEOUT)
+                on_response()
+                yield from entry.data
+                return
+
+            validators = CachedPayload(
+                data=None,
+                etag=response.headers.get('ETag', ''),
+                last_modified=response.headers.get('Last-Modified', ''),
+            )
+            on_response()
+            try:
+                chunks = metered(response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE))
+                yield from iter_json_array(chunks, 'data')
+            except JSONStreamError as e:
+                logger.error(f"JSON decode error for {response.url}: {e}")
+                raise StarCitizenAPIError(f"Invalid JSON response: {e}")
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request error streaming {response.url}: {e}")
+                raise StarCitizenAPIError(f"Request error: {e}")
+
+        # Only a payload read to the end may be revalidated against later
+        if validators.etag or validators.last_modified:
+            self.cache.set(cache_key, validators, self.CACHE_TIMEOUT + self.STALE_TIMEOUT)
+
+    def get_ships(self, allow_stale: bool = True) -> List[Dict[str, Any]]:
+        """
+        Fetch all ships from the API.
+
+        Args:
+            allow_stale: Return expired cached data while refreshing in the background
+
+        Returns:
+            List of ship dictionaries
+        """
+        try:
+            ships = self._cached_get('starcitizen_ships_all', 'v1/cache/ships', allow_stale) or []
+            logger.info(f"Fetched {len(ships)} ships")
             return ships
         except Exception as e:
             logger.error(f"Error fetching ships: {e}")
             raise StarCitizenAPIError(f"Failed to fetch ships: {e}")
 
-    def get_ship(self, ship_id: str) -> Optional[Dict[str, Any]]:
+    def iter_ships(self, conditional: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all ships without loading the full list into memory.
+
+        Args:
+            conditional: Raise StarCitizenAPINotModified instead of downloading
+                the list again when it is unchanged since it was last streamed
+
+        Yields:
+            Ship dictionaries
+        """
+        return self._iter_cached('starcitizen_ships_all', 'v1/cache/ships', conditional)
+
+    def get_ship(self, ship_id: str, allow_stale: bool = True) -> Optional[Dict[str, Any]]:
         """
         Fetch a specific ship by ID.
 
         Args:
             ship_id: Ship identifier
+            allow_stale: Return expired cached data while refreshing in the background
 
         Returns:
             Ship dictionary or None if not found
         """
-        cache_key = f'starcitizen_ship_{ship_id}'
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            logger.info(f"Returning cached ship data for {ship_id}")
-            return cached_data
-
         try:
-            data = self._make_request(f'v1/cache/ships/{ship_id}')
-            ship = data.get('data')
-            if ship:
-                cache.set(cache_key, ship, self.CACHE_TIMEOUT)
-            return ship
+            return self._cached_get(f'starcitizen_ship_{ship_id}', f'v1/cache/ships/{ship_id}', allow_stale)
         except Exception as e:
             logger.error(f"Error fetching ship {ship_id}: {e}")
             return None
 
-    def get_manufacturers(self) -> List[Dict[str, Any]]:
+    def get_manufacturers(self, allow_stale: bool = True) -> List[Dict[str, Any]]:
         """
         Fetch all ship manufacturers.
 
+        Args:
+            allow_stale: Return expired cached data while refreshing in the background
+
         Returns:
             List of manufacturer dictionaries
         """
-        cache_key = 'starcitizen_manufacturers'
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            logger.info("Returning cached manufacturers data")
-            return cached_data
-
         try:
-            data = self._make_request('v1/cache/manufacturers')
-            manufacturers = data.get('data', [])
-            cache.set(cache_key, manufacturers, self.CACHE_TIMEOUT)
-            logger.info(f"Fetched {len(manufacturers)} manufacturers from API")
+            manufacturers = self._cached_get(
+                'starcitizen_manufacturers', 'v1/cache/manufacturers', allow_stale
+            ) or []
+            logger.info(f"Fetched {len(manufacturers)} manufacturers")
             return manufacturers
         except Exception as e:
             logger.error(f"Error fetching manufacturers: {e}")
             raise StarCitizenAPIError(f"Failed to fetch manufacturers: {e}")
 
-    def get_organization(self, sid: str) -> Optional[Dict[str, Any]]:
+    def get_organization(self, sid: str, allow_stale: bool = True) -> Optional[Dict[str, Any]]:
         """
         Fetch organization details.
 
         Args:
             sid: Organization SID (e.g., 'FAROUT')
+            allow_stale: Return expired cached data while refreshing in the background
 
         Returns:
             Organization dictionary or None if not found
         """
-        cache_key = f'starcitizen_org_{sid}'
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            logger.info(f"Returning cached org data for {sid}")
-            return cached_data
-
         try:
-            data = self._make_request(f'v1/cache/organizations/{sid}')
-            org = data.get('data')
-            if org:
-                cache.set(cache_key, org, self.CACHE_TIMEOUT)
-            return org
+            return self._cached_get(f'starcitizen_org_{sid}', f'v1/cache/organizations/{sid}', allow_stale)
         except Exception as e:
             logger.error(f"Error fetching organization {sid}: {e}")
             return None
 
-    def get_organization_members(self, sid: str) -> List[Dict[str, Any]]:
+    def get_organization_members(self, sid: str, allow_stale: bool = True) -> List[Dict[str, Any]]:
         """
         Fetch organization members.
 
         Args:
             sid: Organization SID (e.g., 'FAROUT')
+            allow_stale: Return expired cached data while refreshing in the background
 
         Returns:
             List of member dictionaries
         """
-        cache_key = f'starcitizen_org_members_{sid}'
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            logger.info(f"Returning cached members data for {sid}")
-            return cached_data
-
         try:
-            data = self._make_request(f'v1/cache/organizations/{sid}/members')
-            members = data.get('data', [])
-            cache.set(cache_key, members, self.CACHE_TIMEOUT)
-            logger.info(f"Fetched {len(members)} members from API for {sid}")
+            members = self._cached_get(
+                f'starcitizen_org_members_{sid}', f'v1/cache/organizations/{sid}/members', allow_stale
+            ) or []
+            logger.info(f"Fetched {len(members)} members for {sid}")
             return members
         except Exception as e:
             logger.error(f"Error fetching members for {sid}: {e}")
             raise StarCitizenAPIError(f"Failed to fetch organization members: {e}")
 
+    def iter_organization_members(self, sid: str, conditional: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over organization members without loading the full list into memory.
+
+        Args:
+            sid: Organization SID (e.g., 'FAROUT')
+            conditional: Raise StarCitizenAPINotModified instead of downloading
+                the roster again when it is unchanged since it was last streamed
+
+        Yields:
+            Member dictionaries
+        """
+        return self._iter_cached(
+            f'starcitizen_org_members_{sid}', f'v1/cache/organizations/{sid}/members', conditional
+        )
+
+
+class AsyncStarCitizenAPIClient:
+    """
+    Asyncio variant of StarCitizenAPIClient.
+
+    Exposes the same ``get_*`` methods as coroutines plus batch helpers that
+    fetch many records concurrently. Blocking requests run on a dedicated
+    thread pool; a semaphore caps how many are in flight at once.
+
+    Usage:
+        async with AsyncStarCitizenAPIClient(concurrency=10) as client:
+            ships = await client.get_ships_details(['300i', 'aurora-mr'])
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        client: Optional[StarCitizenAPIClient] = None,
+    ):
+        """
+        Initialize the async client.
+
+        Args:
+            api_key: API key for the client built when ``client`` is not given
+            concurrency: Requests in flight at once; defaults to
+                ``STARCITIZEN_API_CONCURRENCY``
+            client: Client to run requests with, used as is; its ``pool_size``
+                should cover ``concurrency``
+        """
+        self.concurrency = max(1, concurrency or getattr(settings, 'STARCITIZEN_API_CONCURRENCY', 8))
+        # Keep one pooled connection per concurrent request
+        self.client = client or StarCitizenAPIClient(api_key=api_key, pool_size=self.concurrency)
+        if (self.client.pool_size or DEFAULT_POOLSIZE) < self.concurrency:
+            logger.warning(
+                f"Client pool of {self.client.pool_size or DEFAULT_POOLSIZE} connections is smaller "
+                f"than the concurrency of {self.concurrency}; connections will be discarded"
+            )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> 'AsyncStarCitizenAPIClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def _call(self, method, *args, **kwargs) -> Any:
+        """Run a blocking client method on the thread pool."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency,
+                thread_name_prefix='starcitizen-api',
+            )
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(method, *args, **kwargs))
+
+    async def get_ships(self, allow_stale: bool = True) -> List[Dict[str, Any]]:
+        """Fetch all ships from the API."""
+        return await self._call(self.client.get_ships, allow_stale=allow_stale)
+
+    async def get_ship(self, ship_id: str, allow_stale: bool = True) -> Optional[Dict[str, Any]]:
+        """Fetch a specific ship by ID."""
+        return await self._call(self.client.get_ship, ship_id, allow_stale=allow_stale)
+
+    async def get_manufacturers(self, allow_stale: bool = True) -> List[Dict[str, Any]]:
+        """Fetch all ship manufacturers."""
+        return await self._call(self.client.get_manufacturers, allow_stale=allow_stale)
+
+    async def get_organization(self, sid: str, allow_stale: bool = True) -> Optional[Dict[str, Any]]:
+        """Fetch organization details."""
+        return await self._call(self.client.get_organization, sid, allow_stale=allow_stale)
+
+    async def get_organization_members(self, sid: str, allow_stale: bool = True) -> List[Dict[str, Any]]:
+        """Fetch organization members."""
+        return await self._call(self.client.get_organization_members, sid, allow_stale=allow_stale)
+
+    async def get_ships_details(self, ship_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Fetch many ships concurrently.
+
+        Args:
+            ship_ids: Ship identifiers
+
+        Returns:
+            Mapping of ship ID to ship dictionary (None if not found)
+        """
+        ship_ids = list(dict.fromkeys(ship_ids))
+        results = await asyncio.gather(*(self.get_ship(ship_id) for ship_id in ship_ids))
+        return dict(zip(ship_ids, results))
+
+    async def get_organizations(self, sids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Fetch many organizations concurrently.
+
+        Args:
+            sids: Organization SIDs
+
+        Returns:
+            Mapping of SID to organization dictionary (None if not found)
+        """
+        sids = list(dict.fromkeys(sids))
+        results = await asyncio.gather(*(self.get_organization(sid) for sid in sids))
+        return dict(zip(sids, results))
+
+    async def get_organizations_members(self, sids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch the member lists of many organizations concurrently.
+
+        SIDs whose fetch fails are logged and left out of the result.
+
+        Args:
+            sids: Organization SIDs
+
+        Returns:
+            Mapping of SID to list of member dictionaries
+        """
+        sids = list(dict.fromkeys(sids))
+        results = await asyncio.gather(
+            *(self.get_organization_members(sid) for sid in sids),
+            return_exceptions=True,
+        )
+        members = {}
+        for sid, result in zip(sids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching members for {sid}: {result}")
+                continue
+            members[sid] = result
+        return members
+
+
+_api_client: Optional[StarCitizenAPIClient] = None
+_api_client_lock = threading.Lock()
+
+
+def _reset_api_client() -> None:
+    """Drop the parent's client in a forked child so it builds its own connection pool."""
+    global _api_client, _api_client_lock
+    _api_client = None
+    _api_client_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_api_client)
+
+
+def get_api_client(**kwargs) -> StarCitizenAPIClient:
+    """
+    Return the process-wide API client, creating it on first use.
+
+    Args:
+        **kwargs: StarCitizenAPIClient arguments. When given, a new dedicated
+            client is built with them instead of returning the shared one.
+
+    Returns:
+        StarCitizenAPIClient instance
+    """
+    global _api_client
+    if kwargs:
+        return StarCitizenAPIClient(**kwargs)
+
+    if _api_client is None:
+        with _api_client_lock:
+            if _api_client is None:
+                _api_client = StarCitizenAPIClient()
+    return _api_client
+
+
+def set_api_client(client: Optional[StarCitizenAPIClient]) -> Optional[StarCitizenAPIClient]:
+    """
+    Replace the process-wide API client.
+
+    Args:
+        client: Client to use from now on, or None to rebuild one lazily
+
+    Returns:
+        The previous client, so callers can restore it
+    """
+    global _api_client
+    with _api_client_lock:
+        previous, _api_client = _api_client, client
+    return previous
+
+
+class _LazyAPIClient:
+    """Stand-in for the process-wide client that resolves it on each attribute access."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_api_client(), name)
+
+    def __repr__(self) -> str:
+        return f'<lazy {StarCitizenAPIClient.__name__}>'
+
 
-# Global API client instance
-api_client = StarCitizenAPIClient()
+# Global API client, kept for existing imports; prefer get_api_client()
+api_client = _LazyAPIClient()
@@ -0,0 +1,93 @@
+"""
+Shared helpers for the batched API sync engines.
+"""
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, fields as dataclass_fields
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+DEFAULT_BATCH_SIZE = 500
+
+# Set while a sync runs under ``cancel_on``; process-wide so that the
+# thread pools of commands such as sync_orgs see it too
+_cancel_event: Optional[threading.Event] = None
+
+
+class SyncCancelled(Exception):
+    """Raised between batches once the running sync has been told to stop."""
+    pass
+
+
+@dataclass
+class SyncStats:
+    """Counters reported by a sync run."""
+
+    fetched: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    errors: int = 0
+
+    @classmethod
+    def for_action(cls, action: str) -> 'SyncStats':
+        """Counters for one row upserted as ``created``, ``updated`` or ``unchanged``."""
+        stats = cls(fetched=1)
+        setattr(stats, action, 1)
+        return stats
+
+    @property
+    def changed(self) -> bool:
+        """Whether the run wrote anything."""
+        return bool(self.created or self.updated or self.removed)
+
+    def add(self, other: 'SyncStats') -> None:
+        """Accumulate another set of counters into this one."""
+        for field in dataclass_fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+
+@contextmanager
+def cancel_on(event: threading.Event) -> Iterator[None]:
+    """
+    Stop sync engines at their next batch once ``event`` is set.
+
+    Used by the job worker to abandon a command whose lease was lost, since
+    another worker may already be writing the same rows.
+    """
+    global _cancel_event
+    previous, _cancel_event = _cancel_event, event
+    try:
+        yield
+    finally:
+        _cancel_event = previous
+
+
+def check_cancelled() -> None:
+    """
+    Raise ``SyncCancelled`` if the running sync has been cancelled.
+
+    Raises:
+        SyncCancelled: The event passed to ``cancel_on`` is set
+    """
+    event = _cancel_event
+    if event is not None and event.is_set():
+        raise SyncCancelled('Sync cancelled')
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    Yield lists of up to ``size`` items from ``iterable``.
+
+    Checks for cancellation before each list, so every batched loop is a
+    point where a cancelled sync stops.
+    """
+    iterator = iter(iterable)
+    while True:
+        check_cancelled()
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
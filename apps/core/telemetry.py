@@ -0,0 +1,218 @@
+"""
+Telemetry recorded for every sync run.
+
+A ``SyncRecorder`` wraps one sync command and saves a ``SyncRun`` row when it
+finishes. Work inside ``recorder.stage(name)`` is measured per stage: wall
+time, time and queries spent in the database, and time, requests and bytes
+spent on the Star Citizen API. Stages are tracked per thread, so stages
+running in parallel (``sync_all``, ``sync_orgs``) are measured separately;
+the API client reports to whichever stage is active on its thread.
+"""
+import logging
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields as dataclass_fields
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from django.db import connection
+from django.utils import timezone
+from apps.core.sync import SyncStats
+
+logger = logging.getLogger(__name__)
+
+# Stage outcomes, matching the pipeline's
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+# Options every management command has; not worth storing with a run
+BASE_OPTIONS = {
+    'verbosity', 'settings', 'pythonpath', 'traceback', 'no_color', 'force_color', 'skip_checks',
+    'stdout', 'stderr',
+}
+
+_local = threading.local()
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+@dataclass
+class StageMetrics:
+    """Measurements for one stage of a sync run."""
+
+    name: str
+    status: str = SUCCEEDED
+    seconds: float = 0.0
+    api_seconds: float = 0.0
+    db_seconds: float = 0.0
+    queries: int = 0
+    requests: int = 0
+    bytes_downloaded: int = 0
+    fetched: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    errors: int = 0
+    error: str = ''
+
+    def add_stats(self, stats: Any) -> None:
+        """Copy row counters from a ``SyncStats``; other results are ignored."""
+        if isinstance(stats, SyncStats):
+            for field in dataclass_fields(stats):
+                setattr(self, field.name, getattr(self, field.name) + getattr(stats, field.name))
+
+    def fail(self, error: str) -> None:
+        self.status = FAILED
+        self.error = error
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        for key in ('seconds', 'api_seconds', 'db_seconds'):
+            data[key] = round(data[key], 4)
+        return data
+
+
+def current_stage() -> Optional[StageMetrics]:
+    """The stage being measured on this thread, if any."""
+    return getattr(_local, 'stage', None)
+
+
+def record_api(seconds: float, nbytes: int = 0, requests: int = 0) -> None:
+    """Add API time, bytes and requests to the current thread's stage."""
+    stage = current_stage()
+    if stage is not None:
+        stage.api_seconds += seconds
+        stage.bytes_downloaded += nbytes
+        stage.requests += requests
+
+
+def metered(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Pass through a streamed response body, recording download time and size."""
+    iterator = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            record_api(time.perf_counter() - start)
+            return
+        record_api(time.perf_counter() - start, len(chunk))
+        yield chunk
+
+
+def peak_rss_kb() -> int:
+    """Peak resident memory of this process in KiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def command_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """The options a sync command was run with, minus Django's common ones."""
+    return {key: value for key, value in options.items() if key not in BASE_OPTIONS}
+
+
+class SyncRecorder:
+    """
+    Context manager recording one sync command as a ``SyncRun``.
+
+    Usage::
+
+        with SyncRecorder('sync_ships', options) as recorder:
+            with recorder.stage('ships') as stage:
+                stage.add_stats(upserter.run(ships_data))
+    """
+
+    def __init__(self, command: str, options: Optional[Dict[str, Any]] = None):
+        self.command = command
+        self.options = command_options(options or {})
+        self.stages: List[StageMetrics] = []
+        self.run = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'SyncRecorder':
+        # Imported here so the API client can import this module before apps are loaded
+        from apps.core.models import SyncRun
+
+        self.run = SyncRun.objects.create(command=self.command, args=self.options)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.finish(error=f'{exc_type.__name__}: {exc}' if exc_type else '')
+        return False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """Measure the work done in the block on this thread as one stage."""
+        metrics = StageMetrics(name)
+        counter = QueryCounter()
+        previous = current_stage()
+        _local.stage = metrics
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                yield metrics
+        except Exception as e:
+            metrics.fail(str(e))
+            raise
+        finally:
+            _local.stage = previous
+            metrics.seconds = time.perf_counter() - start
+            metrics.db_seconds = counter.seconds
+            metrics.queries = counter.count
+            with self._lock:
+                self.stages.append(metrics)
+
+    def track(self, name: str, run):
+        """Wrap a callable so each call is measured as a stage, counting the ``SyncStats`` it returns."""
+        def tracked():
+            with self.stage(name) as metrics:
+                result = run()
+                metrics.add_stats(result)
+                return result
+        return tracked
+
+    def skip(self, name: str, reason: str = '') -> None:
+        """Record a stage that did not run."""
+        with self._lock:
+            self.stages.append(StageMetrics(name, status=SKIPPED, error=reason))
+
+    def finish(self, error: str = '') -> None:
+        """Total up the stages and save the run."""
+        run = self.run
+        run.finished_at = timezone.now()
+        run.stages = [stage.as_dict() for stage in self.stages]
+        for key in ('fetched', 'created', 'updated', 'skipped', 'unchanged', 'removed', 'errors'):
+            setattr(run, key, sum(getattr(stage, key) for stage in self.stages))
+        run.api_seconds = round(sum(stage.api_seconds for stage in self.stages), 4)
+        run.db_seconds = round(sum(stage.db_seconds for stage in self.stages), 4)
+        run.query_count = sum(stage.queries for stage in self.stages)
+        run.request_count = sum(stage.requests for stage in self.stages)
+        run.bytes_downloaded = sum(stage.bytes_downloaded for stage in self.stages)
+        run.peak_rss_kb = peak_rss_kb()
+        failed = [stage for stage in self.stages if stage.status == FAILED]
+        run.status = run.FAILED if error or failed else run.SUCCEEDED
+        run.error = error or '; '.join(f'{stage.name}: {stage.error}' for stage in failed)
+        try:
+            run.save()
+        except Exception as e:
+            # Losing the telemetry must not fail the sync itself
+            logger.error(f"Could not save sync run {run.pk}: {e}")
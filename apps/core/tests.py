@@ -1,3 +1,1122 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import replace
+from datetime import timedelta
+from decimal import Decimal
+from email.utils import format_datetime
+from unittest import mock, skipUnless
+import requests
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser, Permission
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.core import jobs, views
+from apps.core.api_cache import CODECS, TwoTierCache, decode_value, frame, get_codec
+from apps.core.api_policy import CircuitBreaker, RequestPolicy, TokenBucket, parse_retry_after
+from apps.core.changes import bulk_update_changed, changed_fields, payload_hash
+from apps.core.dumps import DumpError, iter_dump, write_dump
+from apps.core.fake_api import FakeStarCitizenAdapter
+from apps.core.json_stream import JSONStreamError, _StreamReader, iter_json_array
+from apps.core.models import SyncJob, SyncLease, SyncRun
+from apps.core.page_cache import cache_anonymous_page, local_cache, page_cache_key
+from apps.core.pagination import InvalidCursor, KeysetPaginator, decode_cursor, encode_cursor
+from apps.core.pipeline import FAILED, SKIPPED, SUCCEEDED, Pipeline, PipelineError, Stage
+from apps.core.starcitizen_api import (
+    AsyncStarCitizenAPIClient,
+    StarCitizenAPIClient,
+    StarCitizenAPIError,
+    StarCitizenAPINotModified,
+    StarCitizenAPIUnavailable,
+    api_client,
+    get_api_client,
+    set_api_client,
+)
+from apps.core.sync import SyncCancelled, SyncStats, cancel_on, chunked
+from apps.core.telemetry import SyncRecorder, record_api
+from apps.core.versions import current
+from apps.starships.models import Manufacturer, Ship
 
-# Create your tests here.
+
+def split_every(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def offline_client(adapter, **policy):
+    """A client answered by ``adapter``, with its own unthrottled policy and no retries."""
+    policy = RequestPolicy(**{'rate': 0, 'max_retries': 0, **policy})
+    client = StarCitizenAPIClient(api_key='test', payload_cache=TwoTierCache(shared=cache), policy=policy)
+    client.session.mount(client.BASE_URL, adapter)
+    return client
+
+
+def expire(client, key):
+    """Make a cached payload stale without dropping it."""
+    client.cache.set(key, replace(client.cache.get(key), fresh_until=0.0))
+
+
+class IterJSONArrayTests(SimpleTestCase):
+    document = json.dumps({
+        'success': 1,
+        'meta': {'note': 'brackets ] and } in "strings"', 'list': [1, [2, {}]]},
+        'data': [
+            {'name': 'Zeus Mk II', 'price': 12.5, 'tags': ['a', 'b']},
+            -1.25e3,
+            'Ünïcödé ✈ ship',
+            None,
+            True,
+            [],
+        ],
+        'message': 'ok',
+    }, ensure_ascii=False).encode()
+
+    def expected(self):
+        return json.loads(self.document)['data']
+
+    def test_every_chunk_size(self):
+        for size in range(1, 40):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_json_array(split_every(self.document, size))), self.expected())
+
+    def test_every_split_point(self):
+        # Covers splits inside numbers, literals, escapes and multibyte characters
+        for point in range(1, len(self.document)):
+            with self.subTest(point=point):
+                chunks = [self.document[:point], self.document[point:]]
+                self.assertEqual(list(iter_json_array(chunks)), self.expected())
+
+    def test_number_at_the_end_of_a_chunk_is_not_cut_short(self):
+        self.assertEqual(list(iter_json_array([b'{"data": [12', b'34, 5', b'6]}'])), [1234, 56])
+
+    def test_top_level_array_and_missing_member(self):
+        self.assertEqual(list(iter_json_array([b'[1, ', b'2]'])), [1, 2])
+        self.assertEqual(list(iter_json_array([b'{"success": 0, "data": null}'])), [])
+
+    def test_truncated_document_raises(self):
+        with self.assertRaises(JSONStreamError):
+            list(iter_json_array(split_every(self.document[:-20], 7)))
+
+    def test_large_value_is_not_decoded_once_per_chunk(self):
+        item = {'hardpoints': [{'name': f'Hardpoint {n}', 'size': n % 10} for n in range(2000)]}
+        chunks = split_every(json.dumps(item).encode(), 64)
+        reader = _StreamReader(chunks)
+        reader.json_decoder = mock.Mock(wraps=reader.json_decoder)
+
+        self.assertEqual(reader.value(), item)
+        self.assertLess(len(chunks), 2000)
+        self.assertGreater(len(chunks), 1000)
+        self.assertLess(reader.json_decoder.raw_decode.call_count, 20)
+
+
+class StreamingClientTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.adapter = FakeStarCitizenAdapter(ships=30)
+        self.client = StarCitizenAPIClient(api_key='test', payload_cache=TwoTierCache(shared=cache))
+        self.client.session.mount(self.client.BASE_URL, self.adapter)
+
+    def test_streamed_payload_is_revalidated_with_its_etag(self):
+        self.assertEqual(len(list(self.client.iter_ships())), 30)
+        entry = self.client.cache.get('starcitizen_ships_all')
+        self.assertIsNone(entry.data)
+        self.assertTrue(entry.etag)
+
+        with self.assertRaises(StarCitizenAPINotModified):
+            list(self.client.iter_ships())
+        self.assertEqual(self.adapter.request_count, 2)
+
+        self.assertEqual(len(list(self.client.iter_ships(conditional=False))), 30)
+
+    def test_interrupted_stream_stores_no_validators(self):
+        ships = self.client.iter_ships()
+        next(ships)
+        ships.close()
+
+        self.assertIsNone(self.client.cache.get('starcitizen_ships_all'))
+        self.assertIsNone(cache.get('starcitizen_ships_all_lock'))
+
+    def test_refresh_lock_covers_the_request_not_the_stream(self):
+        locked = []
+        request = self.client._request
+
+        def record_lock(*args, **kwargs):
+            locked.append(cache.get('starcitizen_ships_all_lock') is not None)
+            return request(*args, **kwargs)
+
+        with mock.patch.object(self.client, '_request', side_effect=record_lock):
+            ships = self.client.iter_ships()
+            next(ships)
+
+        self.assertEqual(locked, [True])
+        self.assertIsNone(cache.get('starcitizen_ships_all_lock'))
+        self.assertEqual(len(list(ships)), 29)
+
+    def test_not_modified_does_not_change_the_cached_entry_in_place(self):
+        self.client.get_ships()
+        stale = replace(self.client.cache.get('starcitizen_ships_all'), fresh_until=0.0)
+
+        self.client._fetch('starcitizen_ships_all', 'v1/cache/ships', stale)
+
+        self.assertEqual(self.adapter.request_count, 2)
+        self.assertEqual(stale.fresh_until, 0.0)
+        self.assertTrue(self.client.cache.get('starcitizen_ships_all').is_fresh)
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        manufacturers = [
+            Manufacturer.objects.create(code=code, name=f'{code} Corp') for code in ('AEGS', 'DRAK', 'RSI')
+        ]
+        # Few distinct names, so most ships tie on them and only the pk orders them
+        for n in range(11):
+            Ship.objects.create(manufacturer=manufacturers[n % 3], name='xy'[n % 2], api_id=f'ship-{n}')
+
+    def walk(self, paginator):
+        """Follow next cursors from the first page, returning the pages' API ids."""
+        pages = []
+        page = paginator.page()
+        while True:
+            pages.append([ship.api_id for ship in page])
+            if not page.has_next:
+                return pages, page
+            page = paginator.page(page.next_cursor)
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor('n', ['Ünïcödé', 12.5, None, 7])
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor(cursor, 4), ('n', ['Ünïcödé', 12.5, None, 7]))
+
+    def test_invalid_cursors(self):
+        for cursor in ['%%%', 'bm90IGpzb24', encode_cursor('x', [1]), encode_cursor('n', [1, 2])]:
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                decode_cursor(cursor, 1)
+
+    def test_forward_pages_follow_the_ordering_across_ties(self):
+        ordering = ['manufacturer_name', 'name', 'pk']
+        expected = list(Ship.objects.order_by(*ordering).values_list('api_id', flat=True))
+
+        pages, _ = self.walk(KeysetPaginator(Ship.objects.all(), 3, ordering))
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 2])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_previous_cursors_lead_back_to_the_same_pages(self):
+        paginator = KeysetPaginator(Ship.objects.all(), 3, ['-manufacturer_name', 'name', '-pk'])
+        pages, page = self.walk(paginator)
+
+        backwards = []
+        while page.has_previous:
+            page = paginator.page(page.previous_cursor)
+            backwards.append([ship.api_id for ship in page])
+
+        self.assertEqual(backwards, pages[-2::-1])
+        self.assertFalse(page.has_previous)
+        self.assertTrue(page.has_next)
+
+
+class SyncJobQueueTests(TestCase):
+    def expire(self, name):
+        SyncLease.objects.filter(name=name).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_leases_are_taken_all_or_nothing(self):
+        self.assertTrue(jobs.acquire_leases(['organizations'], 'a'))
+
+        self.assertFalse(jobs.acquire_leases(['catalog', 'organizations'], 'b'))
+        self.assertFalse(SyncLease.objects.filter(name='catalog').exists())
+
+        self.expire('organizations')
+        self.assertTrue(jobs.acquire_leases(['catalog', 'organizations'], 'b'))
+        self.assertEqual(SyncLease.objects.get(name='organizations').holder, 'b')
+
+    def test_only_the_holder_renews_a_lease(self):
+        jobs.acquire_lease('catalog', 'a', seconds=10)
+
+        self.assertFalse(jobs.renew_lease('catalog', 'b'))
+        self.assertTrue(jobs.renew_lease('catalog', 'a', seconds=600))
+        self.assertGreater(SyncLease.objects.get(name='catalog').expires_at, timezone.now() + timedelta(seconds=500))
+
+    def test_claim_skips_jobs_whose_rows_are_leased(self):
+        members = jobs.enqueue('sync_org_members', ['FAROUT'], run_after=timezone.now() - timedelta(minutes=2))
+        ships = jobs.enqueue('sync_ships', run_after=timezone.now() - timedelta(minutes=1))
+        jobs.enqueue('sync_orgs', ['FAROUT'], run_after=timezone.now() + timedelta(hours=1))
+        jobs.acquire_lease('organizations', 'other')
+
+        job = jobs.claim_next('worker')
+
+        self.assertEqual(job, ships)
+        self.assertEqual((job.status, job.worker, job.attempts), (SyncJob.RUNNING, 'worker', 1))
+        self.assertEqual(SyncLease.objects.get(name='catalog').holder, 'worker')
+        self.assertIsNone(jobs.claim_next('worker'))
+        members.refresh_from_db()
+        self.assertEqual(members.status, SyncJob.QUEUED)
+
+    def test_abandoned_jobs_are_requeued_until_out_of_attempts(self):
+        alive = jobs.enqueue('sync_ships')
+        abandoned = jobs.enqueue('sync_org_members', ['FAROUT'])
+        exhausted = jobs.enqueue('sync_org_members', ['ELSE'])
+        self.assertEqual(jobs.claim_next('a'), alive)
+        self.assertEqual(jobs.claim_next('b'), abandoned)
+        self.expire('organizations')
+        self.assertEqual(jobs.claim_next('c'), exhausted)
+        SyncJob.objects.filter(pk=exhausted.pk).update(attempts=3)
+        self.expire('organizations')
+
+        self.assertEqual(jobs.requeue_abandoned(), 1)
+
+        statuses = dict(SyncJob.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[alive.pk], SyncJob.RUNNING)
+        self.assertEqual(statuses[abandoned.pk], SyncJob.QUEUED)
+        self.assertEqual(statuses[exhausted.pk], SyncJob.FAILED)
+
+    def test_failed_job_is_retried_with_a_growing_delay(self):
+        self.assertEqual(
+            [jobs.retry_delay(attempts) for attempts in (1, 2, 3)],
+            [timedelta(minutes=1), timedelta(minutes=2), timedelta(minutes=4)],
+        )
+        jobs.enqueue('sync_ships')
+        job = jobs.claim_next('worker')
+        SyncJob.objects.filter(pk=job.pk).update(attempts=2)
+        job.refresh_from_db()
+
+        with mock.patch.object(jobs, 'call_command', side_effect=RuntimeError('boom')):
+            jobs.run_job(job, 'worker')
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (SyncJob.QUEUED, 'RuntimeError: boom'))
+        self.assertAlmostEqual(
+            (job.run_after - job.finished_at).total_seconds(), 120, delta=5
+        )
+        self.assertFalse(SyncLease.objects.exists())
+
+    def test_lost_lease_stops_the_command_and_requeues_the_job(self):
+        jobs.enqueue('sync_ships')
+        job = jobs.claim_next('worker')
+        batches = []
+
+        @contextmanager
+        def lost_lease(names, holder):
+            lost = threading.Event()
+            lost.set()
+            yield lost
+
+        def command(*args, **kwargs):
+            for batch in chunked(range(100), 10):
+                batches.append(batch)
+
+        with mock.patch.object(jobs, 'hold_leases', lost_lease), \
+                mock.patch.object(jobs, 'call_command', side_effect=command):
+            jobs.run_job(job, 'worker')
+
+        self.assertEqual(batches, [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (SyncJob.QUEUED, 'Lease lost while running'))
+
+    def test_outcome_is_not_saved_over_a_job_taken_over_by_another_worker(self):
+        jobs.enqueue('sync_ships')
+        job = jobs.claim_next('worker')
+
+        def taken_over(*args, **kwargs):
+            SyncJob.objects.filter(pk=job.pk).update(worker='other')
+
+        with mock.patch.object(jobs, 'call_command', side_effect=taken_over):
+            jobs.run_job(job, 'worker')
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), (SyncJob.RUNNING, 'other'))
+
+    def test_cancel_on_stops_chunked_at_the_next_batch(self):
+        event = threading.Event()
+        batches = []
+        with cancel_on(event), self.assertRaises(SyncCancelled):
+            for batch in chunked(range(10), 3):
+                batches.append(batch)
+                event.set()
+
+        self.assertEqual(batches, [[0, 1, 2]])
+        self.assertEqual(list(chunked(range(4), 3)), [[0, 1, 2], [3]])
+
+
+class RequestPolicyTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('apps.core.api_policy.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_breaker_opens_after_the_threshold_and_fails_fast(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.now += 59
+        self.assertFalse(breaker.allow_request())
+
+    def test_half_open_trial_closes_or_reopens_the_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        self.now += 60
+
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        self.now += 60
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual((breaker.state, breaker.failures), (CircuitBreaker.CLOSED, 0))
+
+    def test_success_resets_the_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_token_bucket_allows_a_burst_then_queues_callers(self):
+        bucket = TokenBucket(rate=2, capacity=3)
+        with mock.patch('apps.core.api_policy.time.sleep') as sleep:
+            waits = [bucket.acquire() for _ in range(5)]
+            self.assertEqual(waits, [0.0, 0.0, 0.0, 0.5, 1.0])
+            self.assertEqual(sleep.call_count, 2)
+
+            self.now += 10
+            self.assertEqual(bucket.acquire(), 0.0)
+            self.assertEqual(bucket.tokens, 2)
+
+    def test_token_bucket_without_a_rate_never_waits(self):
+        bucket = TokenBucket(rate=0, capacity=1)
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0.0, 0.0, 0.0])
+
+    def test_parse_retry_after(self):
+        future = format_datetime(timezone.now() + timedelta(seconds=120), usegmt=True)
+        self.assertEqual(parse_retry_after('7'), 7.0)
+        self.assertEqual(parse_retry_after('-3'), 0.0)
+        self.assertAlmostEqual(parse_retry_after(future), 120, delta=5)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+        for value in (None, '', 'soon'):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_retry_after(value))
+
+    def test_retry_delay_uses_capped_jitter_or_retry_after(self):
+        policy = RequestPolicy(backoff_base=0.5, backoff_max=4)
+        self.assertEqual(policy.retry_delay(0, retry_after=10), 4)
+        self.assertEqual(policy.retry_delay(0, retry_after=2.5), 2.5)
+        with mock.patch('apps.core.api_policy.random.uniform', side_effect=lambda low, high: high):
+            self.assertEqual([policy.retry_delay(attempt) for attempt in range(5)], [0.5, 1, 2, 4, 4])
+
+    def test_unretried_request_error_resolves_a_half_open_trial(self):
+        policy = RequestPolicy(max_retries=0, rate=0, failure_threshold=1)
+        client = StarCitizenAPIClient(api_key='test', payload_cache=TwoTierCache(shared=cache), policy=policy)
+        policy.breaker.record_failure()
+        self.now += policy.breaker.reset_timeout
+
+        for error in (requests.exceptions.ChunkedEncodingError(), ValueError('bad header')):
+            with self.subTest(error=error), mock.patch.object(client.session, 'get', side_effect=error):
+                with self.assertRaises((StarCitizenAPIError, ValueError)):
+                    client._request('v1/cache/ships')
+                self.assertEqual(policy.breaker.state, CircuitBreaker.OPEN)
+                with self.assertRaises(StarCitizenAPIUnavailable):
+                    client._request('v1/cache/ships')
+                self.now += policy.breaker.reset_timeout
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache().clear()
+        self.calls = 0
+        self.status = 200
+        self.factory = RequestFactory()
+
+    def view(self, request):
+        self.calls += 1
+        response = HttpResponse(f'page {self.calls}', status=self.status, content_type='text/html; charset=utf-8')
+        response['Content-Language'] = 'de'
+        response['Vary'] = 'Accept-Language'
+        return response
+
+    def get(self, path='/ships/', user=None):
+        request = self.factory.get(path)
+        request.user = user or AnonymousUser()
+        return cache_anonymous_page('catalog', params=['q'])(self.view)(request)
+
+    def test_hit_replays_the_body_and_headers(self):
+        first = self.get('/ships/?q=zeus&utm_source=mail')
+        hit = self.get('/ships/?q=zeus')
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(hit.content, first.content)
+        for header in ('Content-Type', 'Content-Language', 'Vary'):
+            self.assertEqual(hit[header], first[header])
+
+        self.get('/ships/?q=drake')
+        self.assertEqual(self.calls, 2)
+
+    def test_hit_from_the_shared_cache(self):
+        self.get()
+        local_cache().clear()
+
+        self.assertEqual(self.get()['Content-Language'], 'de')
+        self.assertEqual(self.calls, 1)
+
+    def test_authenticated_visitors_are_not_served_from_or_stored_in_the_cache(self):
+        user = mock.Mock(is_authenticated=True)
+        self.get(user=user)
+        self.get(user=user)
+        self.get()
+
+        self.assertEqual(self.calls, 3)
+
+    def test_error_responses_and_cookies_are_not_cached(self):
+        self.status = 404
+        self.get()
+        self.get()
+        self.assertEqual(self.calls, 2)
+
+        self.status = 200
+        view = self.view
+
+        def with_cookie(request):
+            response = view(request)
+            response.set_cookie('seen', '1')
+            return response
+
+        self.view = with_cookie
+        self.get()
+        self.get()
+        self.assertEqual(self.calls, 4)
+
+    def test_data_version_bump_misses_the_old_entry(self):
+        self.get()
+        with mock.patch('apps.core.page_cache.current', return_value=1):
+            self.get()
+
+        self.assertEqual(self.calls, 2)
+
+    def test_entry_stored_without_headers_is_still_served(self):
+        key = page_cache_key(self.factory.get('/ships/'), current('catalog'), ['q'])
+        local_cache().set(key, (b'old page', 'text/plain'))
+
+        hit = self.get()
+
+        self.assertEqual((hit.content, hit['Content-Type']), (b'old page', 'text/plain'))
+
+
+class SlowClient:
+    """Blocking client stand-in recording how many calls overlap."""
+
+    def __init__(self, pool_size=None, delay=0.02):
+        self.pool_size = pool_size
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get_organization(self, sid, allow_stale=True):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return {'sid': sid}
+
+    def get_organization_members(self, sid, allow_stale=True):
+        if sid == 'GONE':
+            raise StarCitizenAPIError('HTTP error: 404')
+        return [{'handle': f'{sid.lower()}-1'}]
+
+
+class AsyncClientTests(SimpleTestCase):
+    def test_concurrent_requests_are_capped(self):
+        slow = SlowClient(pool_size=3)
+        sids = [f'ORG{n}' for n in range(12)] + ['ORG0']
+
+        async def fetch():
+            async with AsyncStarCitizenAPIClient(concurrency=3, client=slow) as client:
+                return await client.get_organizations(sids)
+
+        organizations = asyncio.run(fetch())
+
+        self.assertEqual(list(organizations), sids[:12])
+        self.assertEqual(organizations['ORG5'], {'sid': 'ORG5'})
+        self.assertEqual(slow.peak, 3)
+
+    def test_failed_member_lists_are_left_out(self):
+        async def fetch():
+            async with AsyncStarCitizenAPIClient(concurrency=2, client=SlowClient(pool_size=2)) as client:
+                return await client.get_organizations_members(['FAROUT', 'GONE'])
+
+        self.assertEqual(asyncio.run(fetch()), {'FAROUT': [{'handle': 'farout-1'}]})
+
+    def test_connection_pool_matches_the_concurrency(self):
+        client = AsyncStarCitizenAPIClient(api_key='test', concurrency=24)
+
+        adapter = client.client.session.get_adapter(StarCitizenAPIClient.BASE_URL)
+        self.assertEqual((client.client.pool_size, adapter._pool_maxsize), (24, 24))
+
+        with self.assertLogs('apps.core.starcitizen_api', 'WARNING'):
+            AsyncStarCitizenAPIClient(concurrency=24, client=SlowClient())
+
+
+class RevalidationTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.adapter = FakeStarCitizenAdapter(ships=5)
+        self.client = offline_client(self.adapter)
+        self.ships = self.client.get_ships()
+
+    def test_fresh_entry_is_served_without_a_request(self):
+        self.assertEqual(self.client.get_ships(), self.ships)
+        self.assertEqual(self.adapter.request_count, 1)
+
+    def test_stale_entry_is_renewed_by_a_304(self):
+        expire(self.client, 'starcitizen_ships_all')
+        with mock.patch.object(self.adapter, 'send', wraps=self.adapter.send) as sent:
+            self.assertEqual(self.client.get_ships(allow_stale=False), self.ships)
+
+        request = sent.call_args.args[0]
+        self.assertEqual(request.headers['If-None-Match'], self.client.cache.get('starcitizen_ships_all').etag)
+        self.assertTrue(self.client.cache.get('starcitizen_ships_all').is_fresh)
+
+    def test_stale_entry_is_served_while_a_background_refresh_renews_it(self):
+        expire(self.client, 'starcitizen_ships_all')
+
+        self.assertEqual(self.client.get_ships(), self.ships)
+        for thread in threading.enumerate():
+            if thread.name == 'revalidate-starcitizen_ships_all':
+                thread.join()
+
+        self.assertEqual(self.adapter.request_count, 2)
+        self.assertTrue(self.client.cache.get('starcitizen_ships_all').is_fresh)
+
+    def test_failed_refresh_serves_stale_data(self):
+        expire(self.client, 'starcitizen_ships_all')
+        self.adapter.error_rate = 1.0
+
+        self.assertEqual(self.client.get_ships(allow_stale=False), self.ships)
+        self.assertFalse(self.client.cache.get('starcitizen_ships_all').is_fresh)
+
+    def test_changed_payload_replaces_the_entry(self):
+        expire(self.client, 'starcitizen_ships_all')
+        self.adapter.ships = 7
+
+        self.assertEqual(len(self.client.get_ships(allow_stale=False)), 7)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.adapter = FakeStarCitizenAdapter(ships=5)
+        self.client = offline_client(self.adapter)
+        self.client.LOCK_POLL_INTERVAL = 0.01
+
+    def test_concurrent_misses_make_one_request(self):
+        self.adapter.latency = 0.1
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.client.get_ships(allow_stale=False)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.adapter.request_count, 1)
+        self.assertEqual([len(ships) for ships in results], [5] * 5)
+        self.assertIsNone(cache.get('starcitizen_ships_all_lock'))
+
+    def test_waiter_uses_the_result_of_the_lock_holder(self):
+        holder = offline_client(FakeStarCitizenAdapter(ships=5))
+        token, _ = holder._take_refresh_lock('starcitizen_ships_all')
+
+        def finish():
+            holder._fetch('starcitizen_ships_all', 'v1/cache/ships')
+            holder._release_lock('starcitizen_ships_all_lock', token)
+
+        timer = threading.Timer(0.05, finish)
+        timer.start()
+        ships = self.client.get_ships(allow_stale=False)
+        timer.join()
+
+        self.assertEqual(len(ships), 5)
+        self.assertEqual(self.adapter.request_count, 0)
+
+    def test_waiter_fetches_itself_once_the_wait_runs_out(self):
+        self.client.LOCK_WAIT = 0.05
+        cache.add('starcitizen_ships_all_lock', 'someone-else', 60)
+
+        self.assertEqual(len(self.client.get_ships(allow_stale=False)), 5)
+        self.assertEqual(self.adapter.request_count, 1)
+        self.assertEqual(cache.get('starcitizen_ships_all_lock'), 'someone-else')
+
+    def test_background_refresh_skips_a_busy_lock(self):
+        cache.add('starcitizen_ships_all_lock', 'someone-else', 60)
+
+        self.assertIsNone(self.client._refresh('starcitizen_ships_all', 'v1/cache/ships', wait=False))
+        self.assertEqual(self.adapter.request_count, 0)
+
+    def test_expired_lock_taken_over_is_not_released_by_its_old_holder(self):
+        token, _ = self.client._take_refresh_lock('starcitizen_ships_all')
+        cache.set('starcitizen_ships_all_lock', 'new-holder', 60)
+
+        self.client._release_lock('starcitizen_ships_all_lock', token)
+
+        self.assertEqual(cache.get('starcitizen_ships_all_lock'), 'new-holder')
+
+
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.shared = LocMemCache('two-tier-tests', {})
+        self.shared.clear()
+        self.ours = TwoTierCache(shared=self.shared, local_timeout=60)
+        self.theirs = TwoTierCache(shared=self.shared, local_timeout=60)
+        self.value = {'data': list(range(500))}
+        self.ours.set('ships', self.value)
+
+    def test_local_copy_is_trusted_within_its_window(self):
+        with mock.patch.object(self.shared, 'get', wraps=self.shared.get) as get, \
+                mock.patch.object(self.shared, 'get_many', wraps=self.shared.get_many) as get_many:
+            self.assertIs(self.ours.get('ships'), self.value)
+
+        self.assertEqual((get.call_count, get_many.call_count), (0, 0))
+
+    def test_matching_stamp_keeps_the_local_copy_without_reloading_it(self):
+        with mock.patch.object(self.shared, 'get_many', wraps=self.shared.get_many) as get_many:
+            self.assertIs(self.ours.get('ships', revalidate=True), self.value)
+
+        get_many.assert_not_called()
+
+    def test_new_stamp_reloads_the_value_from_the_shared_tier(self):
+        self.assertEqual(self.theirs.get('ships'), self.value)
+        self.theirs.set('ships', {'data': []})
+
+        self.assertEqual(self.ours.get('ships'), self.value)
+        self.assertEqual(self.ours.get('ships', revalidate=True), {'data': []})
+
+    def test_expired_trust_window_checks_the_stamp(self):
+        self.ours.local_timeout = 0
+        self.theirs.set('ships', {'data': [1]})
+
+        self.assertEqual(self.ours.get('ships'), {'data': [1]})
+
+    def test_local_copy_outlives_an_evicted_payload_of_the_same_version(self):
+        self.shared.delete('ships')
+
+        self.assertIs(self.ours.get('ships', revalidate=True), self.value)
+
+    def test_missing_stamp_drops_the_local_copy(self):
+        self.shared.delete_many(['ships', TwoTierCache.version_key('ships')])
+
+        self.assertIsNone(self.ours.get('ships', revalidate=True))
+        self.assertIsNone(self.ours.local.get('ships'))
+
+    def test_delete_clears_both_tiers(self):
+        self.theirs.get('ships')
+        self.ours.delete('ships')
+
+        self.assertIsNone(self.ours.get('ships'))
+        self.assertIsNone(self.theirs.get('ships', revalidate=True))
+
+
+class CacheCodecTests(SimpleTestCase):
+    value = {'data': [{'name': f'Ship {n}', 'description': 'A ship. ' * 20} for n in range(50)]}
+
+    def setUp(self):
+        self.shared = LocMemCache('codec-tests', {})
+        self.shared.clear()
+
+    def test_every_codec_round_trips(self):
+        for name, codec in CODECS.items():
+            with self.subTest(codec=name):
+                self.assertEqual(decode_value(frame(codec, codec.encode(self.value))), self.value)
+
+    def test_unframed_values_are_returned_as_stored(self):
+        for value in (self.value, b'raw bytes', 'text', None):
+            with self.subTest(value=type(value).__name__):
+                self.assertEqual(decode_value(value), value)
+
+    def test_large_values_are_compressed_and_small_ones_are_not(self):
+        payloads = TwoTierCache(shared=self.shared, codec='zlib')
+        payloads.set('large', self.value)
+        payloads.set('small', {'data': []})
+
+        large = self.shared.get('large')
+        self.assertTrue(large.startswith(b'scapi:zlib:'))
+        self.assertLess(len(large), len(json.dumps(self.value)) / 5)
+        self.assertTrue(self.shared.get('small').startswith(b'scapi:pickle:'))
+
+    def test_values_decode_whatever_codec_the_reader_is_configured_with(self):
+        TwoTierCache(shared=self.shared, codec='zlib').set('ships', self.value)
+
+        self.assertEqual(TwoTierCache(shared=self.shared, codec='pickle').get('ships'), self.value)
+
+    def test_legacy_unframed_entry_is_read(self):
+        self.shared.set_many({'ships': self.value, TwoTierCache.version_key('ships'): 'v1'})
+
+        self.assertEqual(TwoTierCache(shared=self.shared).get('ships'), self.value)
+
+    def test_unknown_codec_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, "Unknown cache codec 'brotli'"):
+            get_codec('brotli')
+
+
+class SharedClientTests(SimpleTestCase):
+    def setUp(self):
+        previous = set_api_client(None)
+        self.addCleanup(set_api_client, previous)
+
+    def test_client_is_built_once_on_first_use(self):
+        self.assertEqual(repr(api_client), '<lazy StarCitizenAPIClient>')
+        with mock.patch('apps.core.starcitizen_api.StarCitizenAPIClient', wraps=StarCitizenAPIClient) as build:
+            client = get_api_client()
+
+            self.assertIs(get_api_client(), client)
+            self.assertEqual(api_client.BASE_URL, client.BASE_URL)
+            self.assertEqual(build.call_count, 1)
+
+    def test_arguments_build_a_dedicated_client(self):
+        dedicated = get_api_client(pool_size=4)
+
+        self.assertIsNot(dedicated, get_api_client())
+        self.assertEqual(dedicated.pool_size, 4)
+
+    def test_lazy_proxy_follows_the_replaced_client(self):
+        client = StarCitizenAPIClient(api_key='first')
+        set_api_client(client)
+        self.assertEqual(api_client.api_key, 'first')
+
+        self.assertIs(set_api_client(StarCitizenAPIClient(api_key='second')), client)
+        self.assertEqual(api_client.api_key, 'second')
+
+    @skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+    def test_forked_child_builds_its_own_client_and_session(self):
+        parent = get_api_client()
+        parent_session = parent.session
+        read_end, write_end = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                child = get_api_client()
+                checks = [child is not parent, parent.session is not parent_session]
+                os.write(write_end, json.dumps(checks).encode())
+            finally:
+                os._exit(0)
+
+        os.close(write_end)
+        with os.fdopen(read_end) as pipe:
+            checks = json.loads(pipe.read() or 'null')
+        os.waitpid(pid, 0)
+
+        self.assertEqual(checks, [True, True])
+        self.assertIs(get_api_client(), parent)
+        self.assertIs(parent.session, parent_session)
+
+
+class ChangeDetectionTests(TestCase):
+    def test_payload_hash_ignores_key_order_but_not_content(self):
+        data = {'name': 'Zeus', 'specs': {'length': Decimal('12.5'), 'crew': [1, 2]}}
+
+        self.assertEqual(
+            payload_hash(data),
+            payload_hash({'specs': {'crew': [1, 2], 'length': Decimal('12.5')}, 'name': 'Zeus'}),
+        )
+        self.assertNotEqual(payload_hash(data), payload_hash({**data, 'name': 'Zeus Mk II'}))
+        self.assertNotEqual(payload_hash({'crew': [1, 2]}), payload_hash({'crew': [2, 1]}))
+
+    def test_changed_fields_compares_values_as_stored(self):
+        aegis = Manufacturer.objects.create(code='AEGS', name='Aegis')
+        ship = Ship.objects.create(manufacturer=aegis, name='Avenger', length=Decimal('22.50'), max_crew=1)
+
+        self.assertEqual(changed_fields(ship, {'length': '22.5', 'max_crew': '1', 'manufacturer': aegis}), [])
+        self.assertEqual(
+            changed_fields(ship, {'length': 22.51, 'manufacturer': aegis.pk + 1, 'name': 'Avenger'}),
+            ['length', 'manufacturer'],
+        )
+
+    def test_bulk_update_writes_only_the_changed_columns(self):
+        aegis = Manufacturer.objects.create(code='AEGS', name='Aegis')
+        ships = [
+            Ship.objects.create(manufacturer=aegis, name=f'Ship {n}', api_id=f'ship-{n}', role='Fighter')
+            for n in range(3)
+        ]
+        ships[0].name = 'Renamed'
+        ships[1].role = 'Bomber'
+
+        with CaptureQueriesContext(connection) as queries:
+            written = bulk_update_changed(Ship, [(ships[0], ['name']), (ships[1], ['role']), (ships[2], [])])
+
+        self.assertEqual(written, 2)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertTrue(all('"description"' not in sql and '"updated_at"' in sql for sql in updates))
+        self.assertEqual(Ship.objects.get(pk=ships[1].pk).role, 'Bomber')
+
+
+class PipelineTests(SimpleTestCase):
+    def pipeline(self, *stages):
+        pipeline = Pipeline()
+        for stage in stages:
+            pipeline.add(stage)
+        return pipeline
+
+    def statuses(self, results):
+        return {result.name: result.status for result in results}
+
+    def test_invalid_graphs_are_rejected(self):
+        with self.assertRaisesMessage(PipelineError, "Duplicate stage 'a'"):
+            self.pipeline(Stage('a', dict), Stage('a', dict))
+        with self.assertRaisesMessage(PipelineError, "Stage 'b' depends on unknown stage 'x'"):
+            self.pipeline(Stage('a', dict), Stage('b', dict, ['x'])).validate()
+        with self.assertRaisesMessage(PipelineError, 'Dependency cycle'):
+            self.pipeline(Stage('a', dict, ['c']), Stage('b', dict, ['a']), Stage('c', dict, ['b'])).run()
+
+    def test_stages_run_after_their_dependencies(self):
+        ran = []
+
+        def step(name):
+            return lambda: ran.append(name) or SyncStats(created=1)
+
+        results = self.pipeline(
+            Stage('members', step('members'), ['organization']),
+            Stage('organization', step('organization')),
+            Stage('components', step('components'), ['ships']),
+            Stage('ships', step('ships'), ['manufacturers']),
+            Stage('manufacturers', step('manufacturers')),
+        ).run(workers=3, on_result=lambda result: ran.append(f'done:{result.name}'))
+
+        self.assertEqual(set(self.statuses(results).values()), {SUCCEEDED})
+        for before, after in [('organization', 'members'), ('manufacturers', 'ships'), ('ships', 'components')]:
+            self.assertLess(ran.index(f'done:{before}'), ran.index(after))
+
+    def test_failure_skips_every_stage_downstream(self):
+        def fail():
+            raise RuntimeError('API down')
+
+        results = self.pipeline(
+            Stage('ships', fail),
+            Stage('components', dict, ['ships']),
+            Stage('search', dict, ['components']),
+            Stage('organization', lambda: True),
+        ).run()
+
+        self.assertEqual(
+            self.statuses(results),
+            {'ships': FAILED, 'components': SKIPPED, 'search': SKIPPED, 'organization': SUCCEEDED},
+        )
+        errors = {result.name: result.error for result in results}
+        self.assertEqual(errors['ships'], 'API down')
+        self.assertEqual(errors['components'], 'upstream ships did not succeed')
+
+    def test_derived_stages_are_skipped_when_nothing_upstream_changed(self):
+        upstream = {'ships': SyncStats(unchanged=3)}
+
+        def stages():
+            return self.pipeline(
+                Stage('ships', lambda: upstream['ships']),
+                Stage('components', lambda: SyncStats(created=1), ['ships'], skip_if_unchanged=True),
+                Stage('report', dict, ['components']),
+            )
+
+        results = {result.name: result for result in stages().run()}
+        self.assertEqual((results['components'].status, results['components'].detail), (SKIPPED, 'upstream unchanged'))
+        # Skipped as unchanged is not a failure, so plain dependents still run
+        self.assertEqual(results['report'].status, SUCCEEDED)
+
+        self.assertEqual(self.statuses(stages().run(force=True))['components'], SUCCEEDED)
+        upstream['ships'] = SyncStats(updated=1)
+        self.assertEqual(self.statuses(stages().run())['components'], SUCCEEDED)
+
+
+class SyncRecorderTests(TestCase):
+    def test_stages_are_measured_and_totalled(self):
+        with SyncRecorder('sync_ships', {'force': True, 'verbosity': 2}) as recorder:
+            with recorder.stage('manufacturers') as stage:
+                Manufacturer.objects.create(code='AEGS', name='Aegis')
+                record_api(0.5, 1000, requests=1)
+                stage.add_stats(SyncStats(fetched=1, created=1))
+            recorder.track('ships', lambda: SyncStats(fetched=3, unchanged=3))()
+            recorder.skip('components', 'upstream unchanged')
+
+        run = SyncRun.objects.get()
+        self.assertEqual((run.command, run.args, run.status), ('sync_ships', {'force': True}, run.SUCCEEDED))
+        self.assertEqual((run.fetched, run.created, run.unchanged), (4, 1, 3))
+        self.assertEqual((run.request_count, run.bytes_downloaded, run.api_seconds), (1, 1000, 0.5))
+        self.assertGreater(run.peak_rss_kb, 0)
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(
+            [(stage['name'], stage['status']) for stage in run.stages],
+            [('manufacturers', 'succeeded'), ('ships', 'succeeded'), ('components', 'skipped')],
+        )
+        self.assertEqual(run.query_count, run.stages[0]['queries'])
+        self.assertGreaterEqual(run.query_count, 1)
+
+    def test_api_use_outside_a_stage_is_not_recorded(self):
+        with SyncRecorder('sync_ships') as recorder:
+            record_api(1.0, 500, requests=1)
+            with recorder.stage('ships'):
+                pass
+
+        self.assertEqual(SyncRun.objects.get().request_count, 0)
+
+    def test_failed_stage_fails_the_run(self):
+        with SyncRecorder('sync_all') as recorder:
+            with self.assertRaises(RuntimeError), recorder.stage('ships'):
+                raise RuntimeError('API down')
+            with recorder.stage('organization') as stage:
+                stage.fail('not found')
+
+        run = SyncRun.objects.get()
+        self.assertEqual((run.status, run.error), (run.FAILED, 'ships: API down; organization: not found'))
+
+    def test_exception_leaving_the_run_is_recorded(self):
+        with self.assertRaises(ValueError), SyncRecorder('sync_orgs'):
+            raise ValueError('bad SID file')
+
+        run = SyncRun.objects.get()
+        self.assertEqual((run.status, run.error), (run.FAILED, 'ValueError: bad SID file'))
+
+    def test_parallel_stages_are_measured_per_thread(self):
+        with SyncRecorder('sync_orgs') as recorder:
+            def sync(sid):
+                with recorder.stage(sid):
+                    record_api(0.1, len(sid), requests=1)
+
+            threads = [threading.Thread(target=sync, args=(sid,)) for sid in ('A', 'BB', 'CCC')]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        stages = {stage['name']: stage for stage in SyncRun.objects.get().stages}
+        self.assertEqual(
+            {name: stage['bytes_downloaded'] for name, stage in stages.items()}, {'A': 1, 'BB': 2, 'CCC': 3}
+        )
+
+
+class DumpTests(SimpleTestCase):
+    records = [{'id': f'ship-{n}', 'name': f'Ship {n}', 'tags': ['ü', n]} for n in range(5)]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_round_trip_in_every_format(self):
+        for name in ('ships.ndjson', 'ships.ndjson.gz', 'ships.json', 'ships.JSON.gz'):
+            with self.subTest(name=name):
+                self.assertEqual(write_dump(self.path(name), iter(self.records)), 5)
+                self.assertEqual(list(iter_dump(self.path(name))), self.records)
+
+    def test_api_response_envelope_is_read(self):
+        with open(self.path('ships.json'), 'w') as handle:
+            json.dump({'success': 1, 'data': self.records, 'message': 'ok'}, handle)
+
+        self.assertEqual(list(iter_dump(self.path('ships.json'))), self.records)
+
+    def test_blank_lines_are_skipped_and_bad_ones_located(self):
+        with open(self.path('ships.ndjson'), 'w') as handle:
+            handle.write('{"id": 1}\n\n{"id": 2\n')
+
+        records = iter_dump(self.path('ships.ndjson'))
+        self.assertEqual(next(records), {'id': 1})
+        with self.assertRaisesMessage(DumpError, 'ships.ndjson:3: invalid JSON'):
+            next(records)
+
+    def test_unreadable_files_raise_dump_errors(self):
+        with open(self.path('ships.json'), 'w') as handle:
+            handle.write('[{"id": 1}, ')
+
+        for name in ('ships.json', 'missing.ndjson'):
+            with self.subTest(name=name), self.assertRaises(DumpError):
+                list(iter_dump(self.path(name)))
+        with self.assertRaises(DumpError):
+            write_dump(self.path('missing/ships.ndjson'), self.records)
+
+
+class ExportViewTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        aegis = Manufacturer.objects.create(code='AEGS', name='Aegis')
+        drake = Manufacturer.objects.create(code='DRAK', name='Drake')
+        Ship.objects.create(manufacturer=aegis, name='Avenger', api_id='avenger', is_flight_ready=True)
+        Ship.objects.create(manufacturer=drake, name='Cutlass', api_id='cutlass', is_flight_ready=False)
+        self.user = get_user_model().objects.create_user('exporter', password='x')
+        self.user.user_permissions.add(
+            Permission.objects.get(content_type__app_label='starships', codename='view_ship')
+        )
+
+    def export(self, dataset, user=None, **params):
+        request = self.factory.get(f'/export/{dataset}/', params)
+        request.user = user or self.user
+        return views.export(request, dataset)
+
+    def content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_export_streams_the_requested_fields(self):
+        response = self.export('ships', fields='api_id,manufacturer,api_id')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="ships.ndjson"')
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(rows, [
+            {'api_id': 'avenger', 'manufacturer': 'AEGS'},
+            {'api_id': 'cutlass', 'manufacturer': 'DRAK'},
+        ])
+
+    def test_csv_export_applies_filters(self):
+        response = self.export('ships', format='csv', fields='name,is_flight_ready', flight_ready='no')
+
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(self.content(response).splitlines(), ['name,is_flight_ready', 'Cutlass,False'])
+
+    def test_anonymous_users_are_sent_to_log_in(self):
+        response = self.export('ships', user=AnonymousUser())
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_needs_the_view_permission_of_the_dataset(self):
+        other = get_user_model().objects.create_user('member', password='x')
+
+        self.assertEqual(self.export('ships', user=other).status_code, 403)
+        self.assertEqual(self.export('roster').status_code, 403)
+
+    def test_invalid_requests_are_rejected_before_streaming(self):
+        cases = {
+            'Unknown dataset': ('planets', {}),
+            'Unknown format': ('ships', {'format': 'xml'}),
+            'Unknown fields for ships: secret': ('ships', {'fields': 'name,secret'}),
+            'Unknown filter for ships: color': ('ships', {'color': 'red'}),
+            'Invalid value for flight_ready': ('ships', {'flight_ready': 'maybe'}),
+            'Invalid value for updated_since': ('ships', {'updated_since': 'yesterday'}),
+        }
+        for message, (dataset, params) in cases.items():
+            with self.subTest(message):
+                response = self.export(dataset, **params)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(message, response.content.decode())
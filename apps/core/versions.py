@@ -0,0 +1,80 @@
+"""
+Version counters for data that is cached outside the database.
+
+Writers call ``bump(name)`` inside the transaction that changes the data, and
+readers compare ``current(name)`` with the version their cache was built
+from. ``current`` trusts its in-process copy for
+``DATA_VERSION_CHECK_INTERVAL`` seconds and then asks the shared cache, so hot
+paths rarely leave the process. The database row is only read on a shared
+cache miss, and those entries expire after the same interval. A bump clears
+both copies once its transaction commits. Processes sharing a cache see the
+change on their next check, and processes with a local-memory cache see it
+within two intervals.
+"""
+import threading
+import time
+from typing import Dict, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+_lock = threading.Lock()
+# name -> (version, monotonic time it was read)
+_local: Dict[str, Tuple[int, float]] = {}
+
+
+def cache_key(name: str) -> str:
+    return f'data-version:{name}'
+
+
+def check_interval() -> float:
+    return getattr(settings, 'DATA_VERSION_CHECK_INTERVAL', 5)
+
+
+def current(name: str) -> int:
+    """
+    The current version of a named data set; 0 if it was never bumped.
+
+    May lag a bump made in another process by up to the check interval.
+    """
+    now = time.monotonic()
+    with _lock:
+        local = _local.get(name)
+    if local is not None and now - local[1] < check_interval():
+        return local[0]
+
+    version = cache.get(cache_key(name))
+    if version is None:
+        from apps.core.models import DataVersion
+
+        version = DataVersion.objects.filter(name=name).values_list('version', flat=True).first() or 0
+        cache.set(cache_key(name), version, check_interval())
+
+    with _lock:
+        _local[name] = (version, now)
+    return version
+
+
+def forget(name: str) -> None:
+    """Drop the cached copies of a version so the next read fetches it from the database."""
+    with _lock:
+        _local.pop(name, None)
+    cache.delete(cache_key(name))
+
+
+def bump(name: str) -> None:
+    """
+    Increment the version of a named data set.
+
+    Call it in the transaction that changes the data; cached copies of the
+    version are dropped when that transaction commits.
+    """
+    from apps.core.models import DataVersion
+
+    if not DataVersion.objects.filter(name=name).update(version=F('version') + 1):
+        _, created = DataVersion.objects.get_or_create(name=name)
+        if not created:
+            # Created by a concurrent bump meanwhile
+            DataVersion.objects.filter(name=name).update(version=F('version') + 1)
+    transaction.on_commit(lambda: forget(name))
@@ -2,8 +2,10 @@
 Core views for Farout application.
 """
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_GET
+from .exports import FORMATS, ExportError, get_dataset, iter_export, parse_fields
 from apps.members.models import Member
 from apps.blog.models import BlogPost
 
@@ -50,3 +52,36 @@ def dashboard(request):
         'user': user,
     }
     return render(request, 'dashboard.html', context)
+
+
+@login_required
+@require_GET
+def export(request, dataset):
+    """
+    Stream a dataset (ships, fleet or roster) as NDJSON or CSV.
+
+    Query parameters: ``format`` (ndjson or csv), ``fields`` (comma-separated
+    columns) and the dataset's filters, e.g.
+    ``/export/roster/?format=csv&organization=FAROUT&fields=handle,rank``.
+
+    Exports hold every row of a table, so they need the permission to view
+    the dataset's model, as in the admin.
+    """
+    try:
+        permission = get_dataset(dataset).view_permission
+    except ExportError as e:
+        return HttpResponseBadRequest(str(e))
+    if not request.user.has_perm(permission):
+        return HttpResponseForbidden('You do not have permission to export this dataset.')
+
+    params = request.GET.copy()
+    output_format = params.pop('format', ['ndjson'])[-1]
+    fields = parse_fields(params.pop('fields', [''])[-1])
+    try:
+        content = iter_export(dataset, output_format, fields, params.dict())
+    except ExportError as e:
+        return HttpResponseBadRequest(str(e))
+
+    response = StreamingHttpResponse(content, content_type=f'{FORMATS[output_format]}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{output_format}"'
+    return response
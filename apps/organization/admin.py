@@ -1,6 +1,7 @@
 """Organization admin interface."""
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.translation import gettext_lazy as _
+from apps.core.jobs import enqueue
 from .models import Organization, OrganizationMember
 
 
@@ -18,6 +19,17 @@ class OrganizationAdmin(admin.ModelAdmin):
     list_filter = ['recruiting', 'archetype', 'commitment', 'primary_language']
     search_fields = ['sid', 'name', 'headline', 'description']
     readonly_fields = ['created_at', 'updated_at', 'api_data']
+    actions = ['queue_sync']
+
+    @admin.action(description=_('Queue sync'))
+    def queue_sync(self, request, queryset):
+        sids = list(queryset.values_list('sid', flat=True))
+        enqueue('sync_orgs', sids, requested_by=request.user.get_username())
+        self.message_user(
+            request,
+            _('Queued a sync of %(sids)s; a sync worker will pick it up.') % {'sids': ', '.join(sids)},
+            messages.SUCCESS,
+        )
 
     fieldsets = (
         (_('Basic Information'), {
@@ -52,11 +64,12 @@ class OrganizationMemberAdmin(admin.ModelAdmin):
     list_display = [
         'handle',
         'display_name',
+        'organization',
         'rank',
         'stars',
         'updated_at'
     ]
-    list_filter = ['rank', 'stars']
+    list_filter = ['organization', 'rank', 'stars']
     search_fields = ['handle', 'display_name', 'bio']
     readonly_fields = ['created_at', 'updated_at', 'api_data']
     ordering = ['-stars', 'handle']
@@ -66,7 +79,7 @@ class OrganizationMemberAdmin(admin.ModelAdmin):
             'fields': ('handle', 'display_name')
         }),
         (_('Organization Details'), {
-            'fields': ('rank', 'stars')
+            'fields': ('organization', 'rank', 'stars')
         }),
         (_('Profile'), {
             'fields': ('avatar_url', 'bio'),
@@ -0,0 +1,31 @@
+"""
+Export the stored API records of an organization's members to a local dump file.
+Usage: python manage.py export_members FAROUT members.ndjson.gz
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.dumps import DumpError, write_dump
+from apps.organization.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Write the API records of stored organization members to an NDJSON or JSON dump for import_members'
+
+    def add_arguments(self, parser):
+        parser.add_argument('sid', type=str, help='Organization SID (e.g., FAROUT)')
+        parser.add_argument('path', help='Output file; .json writes a JSON array, .gz compresses')
+
+    def handle(self, *args, **options):
+        sid = options['sid'].upper()
+        org = Organization.objects.filter(sid=sid).first()
+        if not org:
+            raise CommandError(f'Organization {sid} not found in database')
+
+        # Members never synced from the API have no record to export
+        members = org.members.exclude(api_data={})
+        records = members.order_by('pk').values_list('api_data', flat=True).iterator(chunk_size=2000)
+        try:
+            count = write_dump(options['path'], records)
+        except DumpError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Wrote {count} members of {sid} to {options["path"]}'))
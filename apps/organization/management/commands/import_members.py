@@ -0,0 +1,78 @@
+"""
+Import organization members from a local dump file instead of the Star Citizen API.
+Usage: python manage.py import_members FAROUT members.ndjson.gz
+       python manage.py import_members FAROUT members.ndjson --create-organization
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.dumps import DumpError, iter_dump
+from apps.core.sync import DEFAULT_BATCH_SIZE
+from apps.core.telemetry import SyncRecorder
+from apps.organization.models import Organization
+from apps.organization.sync import MemberReconciler
+
+
+class Command(BaseCommand):
+    help = 'Import organization members from an NDJSON or JSON dump of API records (see export_members)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('sid', type=str, help='Organization SID (e.g., FAROUT)')
+        parser.add_argument('path', help='Member dump file; .gz files are decompressed')
+        parser.add_argument(
+            '--create-organization',
+            action='store_true',
+            help='Create a placeholder organization if it does not exist yet; sync_organization fills it in later',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Compare every column of existing members, even when their data is unchanged',
+        )
+        parser.add_argument(
+            '--keep-departed',
+            action='store_true',
+            help='Keep members who do not appear in the dump',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Members written per bulk statement (default: {DEFAULT_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        sid = options['sid'].upper()
+
+        org = Organization.objects.filter(sid=sid).first()
+        if not org:
+            if not options['create_organization']:
+                raise CommandError(
+                    f'Organization {sid} not found in database; sync it first or pass --create-organization'
+                )
+            org = Organization.objects.create(sid=sid, name=sid)
+            self.stdout.write(f'🏢 Created placeholder organization {sid}')
+
+        self.stdout.write(f'👥 Importing members of {sid} from {options["path"]}...')
+        with SyncRecorder('import_members', options) as recorder:
+            with recorder.stage('members') as stage:
+                reconciler = MemberReconciler(
+                    org,
+                    force=options['force'],
+                    batch_size=options['batch_size'],
+                    prune=not options['keep_departed'],
+                )
+                try:
+                    stats = reconciler.run(iter_dump(options['path']))
+                except DumpError as e:
+                    raise CommandError(str(e))
+                stage.add_stats(stats)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Member import complete!\n'
+            f'   Read: {stats.fetched}\n'
+            f'   Created: {stats.created}\n'
+            f'   Updated: {stats.updated}\n'
+            f'   Unchanged: {stats.unchanged}\n'
+            f'   Removed: {stats.removed}\n'
+            f'   Skipped: {stats.skipped}\n'
+            f'   Total members: {org.member_count}'
+        ))
@@ -2,10 +2,12 @@
 Sync organization members from Star Citizen API.
 Usage: python manage.py sync_org_members FAROUT
 """
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from apps.core.starcitizen_api import api_client, StarCitizenAPIError
-from apps.organization.models import Organization, OrganizationMember
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.starcitizen_api import get_api_client, StarCitizenAPIError, StarCitizenAPINotModified
+from apps.core.sync import DEFAULT_BATCH_SIZE
+from apps.core.telemetry import SyncRecorder
+from apps.organization.models import Organization
+from apps.organization.sync import MemberReconciler
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,12 +25,29 @@ class Command(BaseCommand):
         parser.add_argument(
             '--force',
             action='store_true',
-            help='Force update existing members',
+            help='Compare every column of existing members, even when their API data is unchanged',
+        )
+        parser.add_argument(
+            '--keep-departed',
+            action='store_true',
+            help='Keep members who no longer appear in the API roster',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Members written per bulk statement (default: {DEFAULT_BATCH_SIZE})',
         )
 
     def handle(self, *args, **options):
+        with SyncRecorder('sync_org_members', options) as recorder:
+            with recorder.stage('members') as stage:
+                self.sync(stage, options)
+
+    def sync(self, stage, options):
         sid = options['sid'].upper()
         force = options['force']
+        api_client = get_api_client()
 
         self.stdout.write(f'👥 Syncing members for organization {sid}...')
 
@@ -36,63 +55,45 @@ class Command(BaseCommand):
             # Verify organization exists
             org = Organization.objects.filter(sid=sid).first()
             if not org:
-                self.stdout.write(
-                    self.style.WARNING(f'⚠️  Organization {sid} not found in database.')
+                raise CommandError(
+                    f'Organization {sid} not found in database. '
+                    f'Run: python manage.py sync_organization {sid} first'
                 )
-                self.stdout.write(f'   Run: python manage.py sync_organization {sid} first')
-                return
 
-            # Fetch members from API
-            members_data = api_client.get_organization_members(sid)
-            self.stdout.write(f'📦 Fetched {len(members_data)} members from API')
-
-            created_count = 0
-            updated_count = 0
-            error_count = 0
-
-            for member_data in members_data:
-                try:
-                    with transaction.atomic():
-                        handle = member_data.get('handle', '').strip()
-                        if not handle:
-                            continue
-
-                        member, created = OrganizationMember.objects.update_or_create(
-                            handle=handle,
-                            defaults={
-                                'display_name': member_data.get('display_name', handle),
-                                'rank': member_data.get('rank', ''),
-                                'stars': member_data.get('stars', 0),
-                                'avatar_url': member_data.get('image', ''),
-                                'api_data': member_data,
-                            }
-                        )
-
-                        if created:
-                            created_count += 1
-                            self.stdout.write(f'  ✅ Created: {member.handle}')
-                        elif force:
-                            updated_count += 1
-                            self.stdout.write(f'  🔄 Updated: {member.handle}')
-
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Error syncing member {member_data.get('handle')}: {e}")
-                    self.stdout.write(
-                        self.style.ERROR(f'  ❌ Error: {member_data.get("handle")} - {e}')
-                    )
+            # Reconcile the stored members with the roster streamed from the API
+            members_data = api_client.iter_organization_members(sid, conditional=not force)
+
+            reconciler = MemberReconciler(
+                org,
+                force=force,
+                batch_size=options['batch_size'],
+                prune=not options['keep_departed'],
+            )
+            try:
+                stats = reconciler.run(members_data)
+            except StarCitizenAPINotModified:
+                self.stdout.write(self.style.SUCCESS(f'\n✅ Roster of {sid} unchanged since the last sync'))
+                return
+            stage.add_stats(stats)
 
-            # Update organization member count
-            org.member_count = OrganizationMember.objects.count()
-            org.save(update_fields=['member_count'])
+            for handle in reconciler.created:
+                self.stdout.write(f'  ✅ Created: {handle}')
+            for handle in reconciler.updated:
+                self.stdout.write(f'  🔄 Updated: {handle}')
+            for handle in reconciler.removed:
+                self.stdout.write(f'  👋 Removed: {handle}')
 
             self.stdout.write(self.style.SUCCESS(
                 f'\n✅ Member sync complete!\n'
-                f'   Created: {created_count}\n'
-                f'   Updated: {updated_count}\n'
-                f'   Errors: {error_count}\n'
+                f'   Fetched: {stats.fetched}\n'
+                f'   Created: {stats.created}\n'
+                f'   Updated: {stats.updated}\n'
+                f'   Unchanged: {stats.unchanged}\n'
+                f'   Removed: {stats.removed}\n'
+                f'   Skipped: {stats.skipped}\n'
                 f'   Total members: {org.member_count}'
             ))
 
         except StarCitizenAPIError as e:
-            self.stdout.write(self.style.ERROR(f'❌ API Error: {e}'))
+            # Fail the command so sync jobs see the error
+            raise CommandError(f'API Error: {e}') from e
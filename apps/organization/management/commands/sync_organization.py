@@ -2,10 +2,11 @@
 Sync organization from Star Citizen API.
 Usage: python manage.py sync_organization FAROUT
 """
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from apps.core.starcitizen_api import api_client, StarCitizenAPIError
-from apps.organization.models import Organization
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.starcitizen_api import get_api_client, StarCitizenAPIError
+from apps.core.sync import SyncStats
+from apps.core.telemetry import SyncRecorder
+from apps.organization.sync import upsert_organization
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,64 +24,41 @@ class Command(BaseCommand):
         parser.add_argument(
             '--force',
             action='store_true',
-            help='Force update existing organization',
+            help='Compare every column of the organization, even when its API data is unchanged',
         )
 
     def handle(self, *args, **options):
+        with SyncRecorder('sync_organization', options) as recorder:
+            with recorder.stage('organization') as stage:
+                self.sync(stage, options)
+
+    def sync(self, stage, options):
         sid = options['sid'].upper()
         force = options['force']
+        api_client = get_api_client()
 
         self.stdout.write(f'🏢 Syncing organization {sid}...')
 
         try:
             # Fetch organization from API
-            org_data = api_client.get_organization(sid)
+            org_data = api_client.get_organization(sid, allow_stale=False)
 
             if not org_data:
-                self.stdout.write(self.style.ERROR(f'❌ Organization {sid} not found'))
-                return
+                raise CommandError(f'Organization {sid} not found')
 
             self.stdout.write(f'📦 Fetched organization data from API')
 
-            with transaction.atomic():
-                # Check if organization exists
-                org = Organization.objects.filter(sid=sid).first()
-
-                defaults = {
-                    'name': org_data.get('name', sid),
-                    'url': org_data.get('url', ''),
-                    'archetype': org_data.get('archetype', ''),
-                    'commitment': org_data.get('commitment', ''),
-                    'primary_language': org_data.get('primary_language', ''),
-                    'recruiting': org_data.get('recruiting', False),
-                    'member_count': org_data.get('member_count', 0),
-                    'headline': org_data.get('headline', ''),
-                    'description': org_data.get('description', ''),
-                    'history': org_data.get('history', ''),
-                    'manifesto': org_data.get('manifesto', ''),
-                    'charter': org_data.get('charter', ''),
-                    'logo_url': org_data.get('logo', ''),
-                    'banner_url': org_data.get('banner', ''),
-                    'api_data': org_data,
-                }
+            org, action, changed = upsert_organization(sid, org_data, force=force)
+            stage.add_stats(SyncStats.for_action(action))
 
-                if org and force:
-                    # Update existing organization
-                    for key, value in defaults.items():
-                        setattr(org, key, value)
-                    org.save()
-                    self.stdout.write(f'  🔄 Updated: {org.name} ({org.sid})')
-                    action = 'updated'
-                elif not org:
-                    # Create new organization
-                    org = Organization.objects.create(sid=sid, **defaults)
-                    self.stdout.write(f'  ✅ Created: {org.name} ({org.sid})')
-                    action = 'created'
-                else:
-                    self.stdout.write(f'  ⏭️  Skipped: Organization already exists (use --force to update)')
-                    action = 'skipped'
+            if action == 'created':
+                self.stdout.write(f'  ✅ Created: {org.name} ({org.sid})')
+            elif action == 'updated':
+                self.stdout.write(f'  🔄 Updated: {org.name} ({org.sid}) - {", ".join(changed)}')
+            else:
+                self.stdout.write(f'  ⏭️  Unchanged: API data matches the stored organization')
 
-            if action != 'skipped':
+            if action != 'unchanged':
                 self.stdout.write(self.style.SUCCESS(
                     f'\n✅ Organization sync complete!\n'
                     f'   Name: {org.name}\n'
@@ -91,4 +69,5 @@ class Command(BaseCommand):
                 ))
 
         except StarCitizenAPIError as e:
-            self.stdout.write(self.style.ERROR(f'❌ API Error: {e}'))
+            # Fail the command so sync jobs see the error
+            raise CommandError(f'API Error: {e}') from e
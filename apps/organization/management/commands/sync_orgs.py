@@ -0,0 +1,192 @@
+"""
+Sync many organizations and their members from Star Citizen API concurrently.
+Usage: python manage.py sync_orgs FAROUT ALLY1 ALLY2 --workers 8
+       python manage.py sync_orgs --file allies.txt
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from apps.core.starcitizen_api import get_api_client, StarCitizenAPIError, StarCitizenAPINotModified
+from apps.core.sync import DEFAULT_BATCH_SIZE, SyncStats
+from apps.core.telemetry import SyncRecorder
+from apps.organization.sync import MemberReconciler, upsert_organization
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def read_sids(path):
+    """Read SIDs from a file, one per line or separated by whitespace/commas; # starts a comment."""
+    sids = []
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            line = line.split('#', 1)[0]
+            sids.extend(token for token in line.replace(',', ' ').split() if token)
+    return sids
+
+
+class Command(BaseCommand):
+    help = 'Sync several organizations and their members from Star Citizen API in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'sids',
+            nargs='*',
+            help='Organization SIDs (e.g., FAROUT ALLY)',
+        )
+        parser.add_argument(
+            '--file',
+            help='Read additional SIDs from this file',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'STARCITIZEN_API_CONCURRENCY', 8),
+            help='Organizations synced at the same time',
+        )
+        parser.add_argument(
+            '--skip-members',
+            action='store_true',
+            help='Only sync organization details, not their members',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Compare every column of existing rows, even when their API data is unchanged',
+        )
+        parser.add_argument(
+            '--keep-departed',
+            action='store_true',
+            help='Keep members who no longer appear in the API roster',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Members written per bulk statement (default: {DEFAULT_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        sids = list(options['sids'])
+        if options['file']:
+            try:
+                sids.extend(read_sids(options['file']))
+            except OSError as e:
+                raise CommandError(f'Cannot read SIDs from {options["file"]}: {e}')
+        # Keep the given order, drop duplicates
+        sids = list(dict.fromkeys(sid.upper() for sid in sids))
+        if not sids:
+            raise CommandError('Give at least one SID or --file')
+
+        workers = max(1, min(options['workers'], len(sids)))
+        # A client of our own with one pooled connection per worker, leaving
+        # the shared client's pool as it is
+        api_client = get_api_client(pool_size=workers)
+
+        self.stdout.write(f'🏢 Syncing {len(sids)} organizations with {workers} workers...')
+
+        start = time.perf_counter()
+        results = {}
+        with SyncRecorder('sync_orgs', options) as recorder:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sync-orgs') as executor:
+                futures = {
+                    executor.submit(self.sync_one, api_client, recorder, sid, options): sid
+                    for sid in sids
+                }
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result['sid']] = result
+                    self.report(result)
+        elapsed = time.perf_counter() - start
+
+        failed = [result for result in results.values() if result['error']]
+        totals = {
+            key: sum(result[key] for result in results.values())
+            for key in ('created', 'updated', 'unchanged', 'removed')
+        }
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(
+            f'\n✅ Organization sync complete in {elapsed:.1f}s!\n'
+            f'   Organizations: {len(sids) - len(failed)} synced, {len(failed)} failed\n'
+            f'   Members created: {totals["created"]}\n'
+            f'   Members updated: {totals["updated"]}\n'
+            f'   Members unchanged: {totals["unchanged"]}\n'
+            f'   Members removed: {totals["removed"]}'
+        ))
+        for result in failed:
+            self.stdout.write(self.style.ERROR(f'   ❌ {result["sid"]}: {result["error"]}'))
+        if failed:
+            raise CommandError(f'{len(failed)} of {len(sids)} organizations failed to sync')
+
+    def sync_one(self, api_client, recorder, sid, options):
+        """Sync one organization and its roster; runs on a worker thread."""
+        result = {
+            'sid': sid,
+            'action': '',
+            'members': 0,
+            'created': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'removed': 0,
+            'seconds': 0.0,
+            'error': '',
+        }
+        start = time.perf_counter()
+        try:
+            with recorder.stage(f'organization:{sid}') as stage:
+                org_data = api_client.get_organization(sid, allow_stale=False)
+                if not org_data:
+                    result['error'] = 'not found'
+                    stage.fail(result['error'])
+                    return result
+
+                org, result['action'], _ = upsert_organization(sid, org_data, force=options['force'])
+                stage.add_stats(SyncStats.for_action(result['action']))
+
+            if not options['skip_members']:
+                with recorder.stage(f'members:{sid}') as stage:
+                    reconciler = MemberReconciler(
+                        org,
+                        force=options['force'],
+                        batch_size=options['batch_size'],
+                        prune=not options['keep_departed'],
+                    )
+                    try:
+                        stats = reconciler.run(
+                            api_client.iter_organization_members(sid, conditional=not options['force'])
+                        )
+                    except StarCitizenAPINotModified:
+                        # Unchanged since the roster was last streamed
+                        stats = SyncStats()
+                    stage.add_stats(stats)
+                result.update(
+                    created=stats.created,
+                    updated=stats.updated,
+                    unchanged=stats.unchanged,
+                    removed=stats.removed,
+                )
+            result['members'] = org.member_count
+
+        except StarCitizenAPIError as e:
+            result['error'] = f'API Error: {e}'
+        except Exception as e:
+            logger.error(f"Error syncing organization {sid}: {e}")
+            result['error'] = str(e)
+        finally:
+            result['seconds'] = time.perf_counter() - start
+            # Each worker thread opened its own database connection
+            connection.close()
+        return result
+
+    def report(self, result):
+        """Echo the outcome for one organization as it finishes."""
+        if result['error']:
+            self.stdout.write(self.style.ERROR(f'  ❌ {result["sid"]}: {result["error"]}'))
+            return
+        self.stdout.write(
+            f'  ✅ {result["sid"]}: {result["action"]}, {result["members"]} members '
+            f'(+{result["created"]} ~{result["updated"]} -{result["removed"]}) '
+            f'in {result["seconds"]:.1f}s'
+        )
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-17 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organization", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organization",
+            name="api_hash",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Hash of the normalized API data, used to skip unchanged syncs",
+                max_length=64,
+                verbose_name="API Hash",
+            ),
+        ),
+        migrations.AddField(
+            model_name="organizationmember",
+            name="api_hash",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Hash of the normalized API data, used to skip unchanged syncs",
+                max_length=64,
+                verbose_name="API Hash",
+            ),
+        ),
+    ]
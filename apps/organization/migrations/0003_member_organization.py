@@ -0,0 +1,52 @@
+# Generated by Django 5.1.3 on 2026-10-17 17:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_single_organization(apps, schema_editor):
+    """Members synced before this migration belong to the only organization, if unambiguous."""
+    Organization = apps.get_model("organization", "Organization")
+    OrganizationMember = apps.get_model("organization", "OrganizationMember")
+    organizations = list(Organization.objects.all()[:2])
+    if len(organizations) == 1:
+        OrganizationMember.objects.filter(organization__isnull=True).update(
+            organization=organizations[0]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organization", "0002_api_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organizationmember",
+            name="organization",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="members",
+                to="organization.organization",
+                verbose_name="Organization",
+            ),
+        ),
+        migrations.RunPython(assign_single_organization, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="organizationmember",
+            name="handle",
+            field=models.CharField(
+                help_text="Star Citizen handle", max_length=100, verbose_name="Handle"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="organizationmember",
+            constraint=models.UniqueConstraint(
+                fields=("organization", "handle"),
+                name="unique_member_handle_per_organization",
+            ),
+        ),
+    ]
@@ -40,6 +40,13 @@ class Organization(models.Model):
 
     # API metadata
     api_data = models.JSONField(_('API Data'), default=dict, blank=True)
+    api_hash = models.CharField(
+        _('API Hash'),
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text=_('Hash of the normalized API data, used to skip unchanged syncs')
+    )
 
     # Timestamps
     created_at = models.DateTimeField(_('Created'), auto_now_add=True)
@@ -57,11 +64,19 @@ class Organization(models.Model):
 class OrganizationMember(models.Model):
     """Members of Star Citizen organizations."""
 
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='members',
+        verbose_name=_('Organization')
+    )
+
     # Basic info
     handle = models.CharField(
         _('Handle'),
         max_length=100,
-        unique=True,
         help_text=_('Star Citizen handle')
     )
     display_name = models.CharField(_('Display Name'), max_length=200)
@@ -76,6 +91,13 @@ class OrganizationMember(models.Model):
 
     # API metadata
     api_data = models.JSONField(_('API Data'), default=dict, blank=True)
+    api_hash = models.CharField(
+        _('API Hash'),
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text=_('Hash of the normalized API data, used to skip unchanged syncs')
+    )
 
     # Timestamps
     created_at = models.DateTimeField(_('Created'), auto_now_add=True)
@@ -89,6 +111,12 @@ class OrganizationMember(models.Model):
             models.Index(fields=['handle']),
             models.Index(fields=['-stars']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'handle'],
+                name='unique_member_handle_per_organization',
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.display_name} ({self.handle})"
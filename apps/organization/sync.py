@@ -0,0 +1,259 @@
+"""
+Writes API organization data to the database.
+
+``upsert_organization`` stores a single organization, writing only changed
+columns. ``MemberReconciler`` loads the handles and payload hashes of the
+members stored for the organization, streams the roster against them keeping
+only the handles and the records that need writing, and applies the
+resulting inserts, updates and departures with bulk statements in chunks
+inside a single transaction.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from django.db import transaction
+from apps.core.changes import apply_changes, bulk_update_changed, changed_fields, payload_hash
+from apps.core.sync import DEFAULT_BATCH_SIZE, SyncStats, check_cancelled, chunked
+from apps.organization.models import Organization, OrganizationMember
+
+logger = logging.getLogger(__name__)
+
+
+def organization_fields(sid: str, org_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an API organization record to Organization field values, excluding the SID."""
+    return {
+        'name': org_data.get('name', sid),
+        'url': org_data.get('url', ''),
+        'archetype': org_data.get('archetype', ''),
+        'commitment': org_data.get('commitment', ''),
+        'primary_language': org_data.get('primary_language', ''),
+        'recruiting': org_data.get('recruiting', False),
+        'member_count': org_data.get('member_count', 0),
+        'headline': org_data.get('headline', ''),
+        'description': org_data.get('description', ''),
+        'history': org_data.get('history', ''),
+        'manifesto': org_data.get('manifesto', ''),
+        'charter': org_data.get('charter', ''),
+        'logo_url': org_data.get('logo', ''),
+        'banner_url': org_data.get('banner', ''),
+        'api_data': org_data,
+        'api_hash': payload_hash(org_data),
+    }
+
+
+def upsert_organization(
+    sid: str,
+    org_data: Dict[str, Any],
+    force: bool = False,
+) -> Tuple[Organization, str, List[str]]:
+    """
+    Create or update one organization from its API record.
+
+    Args:
+        sid: Organization SID
+        org_data: Organization record from the API
+        force: Compare every column even when the payload hash is unchanged
+
+    Returns:
+        The organization, the action taken ('created', 'updated' or
+        'unchanged') and the names of the columns written on update
+    """
+    defaults = organization_fields(sid, org_data)
+    with transaction.atomic():
+        org = Organization.objects.filter(sid=sid).first()
+        if not org:
+            return Organization.objects.create(sid=sid, **defaults), 'created', []
+        if not force and org.api_hash == defaults['api_hash']:
+            return org, 'unchanged', []
+
+        # Only write the columns that actually changed
+        changed = changed_fields(org, defaults)
+        if not changed:
+            return org, 'unchanged', []
+        apply_changes(org, defaults, changed)
+        org.save(update_fields=changed + ['updated_at'])
+        return org, 'updated', changed
+
+
+def member_fields(member_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an API member record to OrganizationMember field values."""
+    handle = member_data.get('handle', '').strip()
+    return {
+        'handle': handle,
+        'display_name': member_data.get('display_name', handle),
+        'rank': member_data.get('rank', ''),
+        'stars': member_data.get('stars', 0),
+        'avatar_url': member_data.get('image', ''),
+        'api_data': member_data,
+        'api_hash': payload_hash(member_data),
+    }
+
+
+class MemberReconciler:
+    """
+    Makes the stored members of one organization match the API roster.
+
+    Members are created, updated when their payload hash changed (or on
+    ``force`` when any column differs) and, with ``prune``, removed when they
+    no longer appear in the roster. Members synced before rosters were tied
+    to an organization are adopted when their handle shows up.
+    """
+
+    def __init__(
+        self,
+        organization: Organization,
+        force: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        prune: bool = True,
+    ):
+        self.organization = organization
+        self.force = force
+        self.batch_size = max(1, batch_size)
+        self.prune = prune
+        self.stats = SyncStats()
+        self.created: List[str] = []
+        self.updated: List[str] = []
+        self.removed: List[str] = []
+
+    def load(self) -> Dict[str, Tuple[int, str]]:
+        """The organization's stored members as handle -> (pk, api_hash)."""
+        return {
+            handle: (pk, api_hash)
+            for pk, handle, api_hash in self.organization.members.values_list('pk', 'handle', 'api_hash')
+        }
+
+    def collect(
+        self,
+        members_data: Iterable[Dict[str, Any]],
+        existing: Dict[str, Tuple[int, str]],
+    ) -> Tuple[Set[str], Dict[str, Dict[str, Any]]]:
+        """
+        Read the roster, keeping field values only for members that need writing.
+
+        Members whose payload hash matches the stored one are counted as
+        unchanged and only their handle is kept, so a large roster costs a
+        set of handles rather than every member's API data.
+
+        Returns:
+            Every handle in the roster, and the field values of new members and
+            of members whose payload changed (all members on ``force``), keyed
+            by handle
+        """
+        roster = set()
+        changes = {}
+        for member_data in members_data:
+            self.stats.fetched += 1
+            if self.stats.fetched % self.batch_size == 0:
+                check_cancelled()
+            fields = member_fields(member_data)
+            handle = fields['handle']
+            if not handle or handle in roster:
+                self.stats.skipped += 1
+                continue
+            roster.add(handle)
+            stored = existing.get(handle)
+            if stored is not None and not self.force and stored[1] == fields['api_hash']:
+                self.stats.unchanged += 1
+                continue
+            fields['organization'] = self.organization
+            changes[handle] = fields
+        return roster, changes
+
+    def adopt_legacy(self, handles: List[str]) -> Dict[int, str]:
+        """
+        Move members stored without an organization into this one.
+
+        The update only matches rows still without an organization, so when
+        syncs of two organizations listing the same handle race, exactly one
+        adopts the row; the other finds it gone and creates its own member.
+
+        Returns:
+            Handles of the adopted members, keyed by primary key
+        """
+        adopted = {}
+        for batch in chunked(handles, self.batch_size):
+            pks = {}
+            for pk, handle in OrganizationMember.objects.filter(
+                organization__isnull=True, handle__in=batch
+            ).order_by('pk').values_list('pk', 'handle'):
+                # Adopt one row per handle; the unique constraint allows no more
+                pks.setdefault(handle, pk)
+            if not pks:
+                continue
+            OrganizationMember.objects.filter(pk__in=pks.values(), organization__isnull=True).update(
+                organization=self.organization
+            )
+            adopted.update(
+                self.organization.members.filter(pk__in=pks.values()).values_list('pk', 'handle')
+            )
+        return adopted
+
+    def run(self, members_data: Iterable[Dict[str, Any]]) -> SyncStats:
+        """
+        Reconcile the organization's members with ``members_data``.
+
+        Args:
+            members_data: Member records from the API, may be a lazy iterator
+
+        Returns:
+            Counts for the run
+        """
+        existing = self.load()
+        roster, changes = self.collect(members_data, existing)
+
+        with transaction.atomic():
+            candidates: Dict[int, Dict[str, Any]] = {}
+            unseen = [handle for handle in changes if handle not in existing]
+            adopted = self.adopt_legacy(unseen)
+            for pk, handle in adopted.items():
+                candidates[pk] = changes[handle]
+            adopted_handles = set(adopted.values())
+
+            new = []
+            for handle, fields in changes.items():
+                stored = existing.get(handle)
+                if stored is not None:
+                    candidates[stored[0]] = fields
+                elif handle not in adopted_handles:
+                    new.append(OrganizationMember(**fields))
+
+            changed = []
+            for pks in chunked(candidates, self.batch_size):
+                for pk, member in OrganizationMember.objects.in_bulk(pks).items():
+                    fields = candidates[pk]
+                    diff = changed_fields(member, fields)
+                    if not diff:
+                        if pk in adopted:
+                            self.updated.append(member.handle)
+                        else:
+                            self.stats.unchanged += 1
+                        continue
+                    apply_changes(member, fields, diff)
+                    changed.append((member, diff))
+                    self.updated.append(member.handle)
+
+            OrganizationMember.objects.bulk_create(new, batch_size=self.batch_size)
+            bulk_update_changed(OrganizationMember, changed, batch_size=self.batch_size)
+            self.created = [member.handle for member in new]
+
+            departed = [handle for handle in existing if handle not in roster]
+            if departed and not roster:
+                # An empty roster is far more likely an API hiccup than an empty org
+                logger.warning(
+                    f"Roster for {self.organization.sid} is empty, keeping {len(departed)} stored members"
+                )
+            elif departed and self.prune:
+                for handles in chunked(departed, self.batch_size):
+                    self.organization.members.filter(handle__in=handles).delete()
+                self.removed = departed
+
+            # The count comes from the organization's API record (see
+            # upsert_organization) unless a full prune just made the stored
+            # members exactly the roster
+            if self.prune and roster and self.organization.member_count != len(roster):
+                self.organization.member_count = len(roster)
+                self.organization.save(update_fields=['member_count'])
+
+        self.stats.created = len(self.created)
+        self.stats.updated = len(self.updated)
+        self.stats.removed = len(self.removed)
+        return self.stats
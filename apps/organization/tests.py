@@ -1,3 +1,226 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase
+from apps.core.api_cache import TwoTierCache
+from apps.core.api_policy import RequestPolicy
+from apps.core.fake_api import FakeStarCitizenAdapter
+from apps.core.starcitizen_api import StarCitizenAPIClient
+from apps.organization.management.commands.sync_orgs import read_sids
+from apps.organization.models import Organization, OrganizationMember
+from apps.organization.sync import MemberReconciler, upsert_organization
 
-# Create your tests here.
+
+def roster(*handles, rank='Member'):
+    return [{'handle': handle, 'display_name': handle.title(), 'rank': rank} for handle in handles]
+
+
+class MemberReconcilerTests(TestCase):
+    def setUp(self):
+        self.org, _, _ = upsert_organization('FAROUT', {'name': 'Far Out', 'member_count': 40})
+        MemberReconciler(self.org).run(roster('alice', 'bob', 'carol', 'dave'))
+
+    def handles(self):
+        return sorted(self.org.members.values_list('handle', flat=True))
+
+    def test_prune_removes_departed_members_and_counts_the_roster(self):
+        stats = MemberReconciler(self.org).run(roster('alice', 'bob', 'erin'))
+
+        self.assertEqual((stats.created, stats.unchanged, stats.removed), (1, 2, 2))
+        self.assertEqual(self.handles(), ['alice', 'bob', 'erin'])
+        self.org.refresh_from_db()
+        self.assertEqual(self.org.member_count, 3)
+
+    def test_without_prune_the_count_stays_that_of_the_organization_record(self):
+        self.org.member_count = 40
+        self.org.save(update_fields=['member_count'])
+
+        stats = MemberReconciler(self.org, prune=False).run(roster('alice', 'erin'))
+
+        self.assertEqual((stats.created, stats.removed), (1, 0))
+        self.assertEqual(self.handles(), ['alice', 'bob', 'carol', 'dave', 'erin'])
+        self.org.refresh_from_db()
+        self.assertEqual(self.org.member_count, 40)
+
+    def test_empty_roster_keeps_members_and_count(self):
+        stats = MemberReconciler(self.org).run([])
+
+        self.assertEqual(stats.removed, 0)
+        self.assertEqual(len(self.handles()), 4)
+        self.org.refresh_from_db()
+        self.assertEqual(self.org.member_count, 4)
+
+    def test_only_changed_members_are_kept_while_collecting(self):
+        reconciler = MemberReconciler(self.org)
+        members = roster('alice', 'bob', 'carol') + roster('dave', rank='Officer') + roster('erin', 'erin')
+
+        handles, changes = reconciler.collect(members, reconciler.load())
+
+        self.assertEqual(handles, {'alice', 'bob', 'carol', 'dave', 'erin'})
+        self.assertEqual(sorted(changes), ['dave', 'erin'])
+        self.assertEqual((reconciler.stats.unchanged, reconciler.stats.skipped), (3, 1))
+
+    def test_changed_member_is_updated(self):
+        stats = MemberReconciler(self.org).run(roster('alice', 'bob', 'carol') + roster('dave', rank='Officer'))
+
+        self.assertEqual((stats.updated, stats.unchanged), (1, 3))
+        self.assertEqual(OrganizationMember.objects.get(handle='dave').rank, 'Officer')
+
+    def test_legacy_member_is_adopted(self):
+        OrganizationMember.objects.create(handle='frank', display_name='Frank', api_hash='old')
+
+        stats = MemberReconciler(self.org).run(roster('alice', 'bob', 'carol', 'dave', 'frank'))
+
+        self.assertEqual((stats.created, stats.updated), (0, 1))
+        self.assertEqual(OrganizationMember.objects.get(handle='frank').organization, self.org)
+
+    def test_legacy_member_adopted_meanwhile_by_another_organization_is_left_to_it(self):
+        frank = OrganizationMember.objects.create(handle='frank', display_name='Frank', api_hash='old')
+        other, _, _ = upsert_organization('OTHER', {'name': 'Other', 'member_count': 1})
+        stale_read = mock.Mock()
+        stale_read.order_by.return_value.values_list.return_value = [(frank.pk, 'frank')]
+        filter_members = OrganizationMember.objects.filter
+
+        def race(*args, **kwargs):
+            if 'handle__in' in kwargs:
+                # The other organization's sync adopts the row right after this read
+                filter_members(pk=frank.pk).update(organization=other)
+                return stale_read
+            return filter_members(*args, **kwargs)
+
+        with mock.patch.object(OrganizationMember.objects, 'filter', side_effect=race):
+            stats = MemberReconciler(self.org).run(roster('alice', 'bob', 'carol', 'dave', 'frank'))
+
+        self.assertEqual((stats.created, stats.updated), (1, 0))
+        frank.refresh_from_db()
+        self.assertEqual(frank.organization, other)
+        self.assertTrue(self.org.members.filter(handle='frank').exists())
+
+    def test_one_of_several_legacy_rows_for_a_handle_is_adopted(self):
+        for api_hash in ('old', 'older'):
+            OrganizationMember.objects.create(handle='frank', display_name='Frank', api_hash=api_hash)
+
+        stats = MemberReconciler(self.org).run(roster('alice', 'bob', 'carol', 'dave', 'frank'))
+
+        self.assertEqual((stats.created, stats.updated), (0, 1))
+        self.assertEqual(OrganizationMember.objects.filter(handle='frank', organization__isnull=True).count(), 1)
+
+
+class SyncOrgsTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.adapter = FakeStarCitizenAdapter(members=6)
+        self.client = StarCitizenAPIClient(
+            api_key='test',
+            payload_cache=TwoTierCache(shared=cache),
+            policy=RequestPolicy(rate=0, max_retries=0),
+        )
+        self.client.session.mount(self.client.BASE_URL, self.adapter)
+        patcher = mock.patch(
+            'apps.organization.management.commands.sync_orgs.get_api_client', return_value=self.client
+        )
+        self.get_api_client = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sync(self, *args):
+        # One worker: SQLite locks out concurrent writers
+        call_command('sync_orgs', '--workers', '1', *args, stdout=io.StringIO())
+
+    def test_syncs_every_organization_and_its_members(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt') as sids:
+            sids.write('# allies\nally1, ALLY2\nfarout  # ourselves\n')
+            sids.flush()
+            self.sync('farout', '--file', sids.name)
+
+        self.assertEqual(sorted(Organization.objects.values_list('sid', flat=True)), ['ALLY1', 'ALLY2', 'FAROUT'])
+        for org in Organization.objects.all():
+            self.assertEqual(org.members.count(), 6)
+            self.assertEqual(org.member_count, 6)
+
+    def test_unchanged_rosters_are_not_downloaded_again(self):
+        self.sync('FAROUT', 'ALLY1')
+        requests = self.adapter.request_count
+
+        self.sync('FAROUT', 'ALLY1')
+
+        # Organizations come from the cache, rosters are answered with 304
+        self.assertEqual(self.adapter.request_count, requests + 2)
+        self.assertEqual(OrganizationMember.objects.count(), 12)
+
+    def test_failed_organization_does_not_stop_the_others(self):
+        get_organization = self.client.get_organization
+        with mock.patch.object(
+            self.client, 'get_organization',
+            side_effect=lambda sid, **kwargs: None if sid == 'GONE' else get_organization(sid, **kwargs),
+        ):
+            with self.assertRaisesMessage(CommandError, '1 of 2 organizations failed to sync'):
+                self.sync('GONE', 'FAROUT')
+
+        self.assertEqual(list(Organization.objects.values_list('sid', flat=True)), ['FAROUT'])
+
+    def test_client_pool_is_sized_to_the_workers_in_use(self):
+        self.sync('FAROUT', '--workers', '8')
+
+        self.get_api_client.assert_called_once_with(pool_size=1)
+
+    def test_skip_members(self):
+        self.sync('FAROUT', '--skip-members')
+
+        self.assertFalse(OrganizationMember.objects.exists())
+
+    def test_read_sids(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt') as sids:
+            sids.write('A B,C\n\n# D\nE # F\n')
+            sids.flush()
+            self.assertEqual(read_sids(sids.name), ['A', 'B', 'C', 'E'])
+
+
+class MemberDumpTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'members.ndjson.gz')
+        self.org, _, _ = upsert_organization('FAROUT', {'name': 'Far Out', 'member_count': 3})
+        MemberReconciler(self.org).run(roster('alice', 'bob') + roster('carol', rank='Officer'))
+
+    def call(self, *args):
+        call_command(*args, stdout=io.StringIO())
+
+    def members(self, org):
+        return sorted(org.members.values_list('handle', 'rank'))
+
+    def test_export_then_import_restores_the_roster(self):
+        expected = self.members(self.org)
+        self.call('export_members', 'farout', self.path)
+        self.org.members.all().delete()
+
+        self.call('import_members', 'FAROUT', self.path)
+
+        self.assertEqual(self.members(self.org), expected)
+
+    def test_import_prunes_departed_members_unless_told_to_keep_them(self):
+        self.call('export_members', 'FAROUT', self.path)
+        MemberReconciler(self.org).run(roster('alice', 'bob', 'dave') + roster('carol', rank='Officer'))
+
+        self.call('import_members', 'FAROUT', self.path, '--keep-departed')
+        self.assertEqual(self.org.members.count(), 4)
+
+        self.call('import_members', 'FAROUT', self.path)
+        self.assertEqual(self.org.members.count(), 3)
+
+    def test_missing_organization_is_created_only_when_asked(self):
+        self.call('export_members', 'FAROUT', self.path)
+
+        with self.assertRaisesMessage(CommandError, 'Organization ALLY not found in database'):
+            self.call('import_members', 'ally', self.path)
+
+        self.call('import_members', 'ally', self.path, '--create-organization')
+        self.assertEqual(self.members(Organization.objects.get(sid='ALLY')), self.members(self.org))
+
+    def test_export_of_unknown_organization_fails(self):
+        with self.assertRaisesMessage(CommandError, 'Organization NOPE not found in database'):
+            self.call('export_members', 'nope', self.path)
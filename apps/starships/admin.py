@@ -1,7 +1,9 @@
 """Starships admin interface."""
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.translation import gettext_lazy as _
+from apps.core.jobs import enqueue
 from .models import Manufacturer, Ship, ShipComponent
+from .sync import touch_ships
 
 
 @admin.register(Manufacturer)
@@ -43,6 +45,12 @@ class ShipAdmin(admin.ModelAdmin):
     autocomplete_fields = ['manufacturer']
     readonly_fields = ['created_at', 'updated_at', 'api_data']
     inlines = [ShipComponentInline]
+    actions = ['queue_catalog_sync']
+
+    @admin.action(description=_('Queue a sync of the whole ship catalog'))
+    def queue_catalog_sync(self, request, queryset):
+        enqueue('sync_ships', requested_by=request.user.get_username())
+        self.message_user(request, _('Queued a ship catalog sync; a sync worker will pick it up.'), messages.SUCCESS)
 
     fieldsets = (
         (_('Basic Information'), {
@@ -85,3 +93,12 @@ class ShipComponentAdmin(admin.ModelAdmin):
     list_filter = ['component_type', 'size']
     search_fields = ['ship__name', 'name', 'mount_name']
     autocomplete_fields = ['ship']
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        touch_ships([obj.ship_id])
+
+    def delete_queryset(self, request, queryset):
+        ship_ids = set(queryset.values_list('ship_id', flat=True))
+        super().delete_queryset(request, queryset)
+        touch_ships(ship_ids)
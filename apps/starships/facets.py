@@ -0,0 +1,164 @@
+"""
+Filter facets of the ship catalog: the manufacturers, types, sizes and
+statuses to filter by, each with the number of ships it would show.
+
+Counts are conditioned on the other active filters. With a manufacturer
+selected, the type counts only include that manufacturer's ships, while the
+manufacturer counts ignore the manufacturer filter itself so the user can
+still switch. The search text is not taken into account.
+
+Counts are cached per filter combination in the shared cache, under keys that
+include the catalog data version, so any catalog write makes every cached
+entry unreachable at once and the old entries simply expire.
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, QuerySet
+from django.utils.http import urlencode
+from django.utils.translation import gettext_lazy as _
+from apps.core.versions import current
+from .models import CATALOG_VERSION, Ship
+
+# Query parameters the catalog can be filtered by, and their lookups
+FILTERS = {
+    'manufacturer': 'manufacturer__code',
+    'type': 'type',
+    'size': 'size',
+}
+
+STATUS_FILTERS = {
+    'flight_ready': Q(is_flight_ready=True),
+    'concept': Q(is_concept=True),
+}
+
+STATUS_CHOICES = [
+    ('flight_ready', _('Flight Ready')),
+    ('concept', _('Concept')),
+]
+
+FACETS = ['manufacturer', 'type', 'size', 'status']
+
+
+@dataclass
+class FacetValue:
+    """One option of a facet."""
+
+    value: str
+    label: str
+    count: int
+    selected: bool = False
+
+
+def clean_filters(params: Mapping[str, str]) -> Dict[str, str]:
+    """The catalog filters in request parameters, dropping empty and unknown ones."""
+    filters = {name: params.get(name, '').strip() for name in FACETS}
+    if filters['status'] not in STATUS_FILTERS:
+        filters['status'] = ''
+    return {name: value for name, value in filters.items() if value}
+
+
+def filter_ships(queryset: QuerySet, filters: Mapping[str, str], exclude: Optional[str] = None) -> QuerySet:
+    """
+    Apply catalog filters to a ship queryset.
+
+    Args:
+        queryset: Ships to filter
+        filters: Filters as returned by ``clean_filters``
+        exclude: Facet whose own filter is left out
+    """
+    for name, value in filters.items():
+        if name == exclude:
+            continue
+        if name == 'status':
+            queryset = queryset.filter(STATUS_FILTERS[value])
+        else:
+            queryset = queryset.filter(**{FILTERS[name]: value})
+    return queryset
+
+
+def count_facets(filters: Mapping[str, str]) -> Dict[str, List[Tuple[str, str, int]]]:
+    """
+    Count the ships behind every facet option, with one query per facet.
+
+    Returns:
+        Facet names mapped to ``(value, label, count)`` tuples; the label is
+        empty where it comes from model choices, so it is translated on use
+    """
+    ships = Ship.objects.order_by()
+
+    manufacturers = (
+        filter_ships(ships, filters, exclude='manufacturer')
+        .values_list('manufacturer__code', 'manufacturer__name')
+        .annotate(count=Count('pk'))
+        .order_by('manufacturer__name', 'manufacturer__code')
+    )
+    types = (
+        filter_ships(ships, filters, exclude='type')
+        .exclude(type='')
+        .values_list('type')
+        .annotate(count=Count('pk'))
+        .order_by('type')
+    )
+    sizes = dict(
+        filter_ships(ships, filters, exclude='size')
+        .values_list('size')
+        .annotate(count=Count('pk'))
+    )
+    statuses = filter_ships(ships, filters, exclude='status').aggregate(
+        **{value: Count('pk', filter=match) for value, match in STATUS_FILTERS.items()}
+    )
+
+    return {
+        'manufacturer': list(manufacturers),
+        'type': [(ship_type, ship_type, count) for ship_type, count in types],
+        # Sizes in their natural order rather than alphabetically
+        'size': [(size, '', sizes[size]) for size, _label in Ship.SIZE_CHOICES if sizes.get(size)],
+        'status': [(value, '', statuses[value]) for value, _label in STATUS_CHOICES if statuses[value]],
+    }
+
+
+def cache_key(filters: Mapping[str, str], version: int) -> str:
+    digest = hashlib.md5(urlencode(sorted(filters.items())).encode()).hexdigest()
+    return f'ship-facets:{version}:{digest}'
+
+
+def cached_facet_counts(filters: Mapping[str, str]) -> Dict[str, List[Tuple[str, str, int]]]:
+    """``count_facets`` for the current catalog version, from the cache when possible."""
+    key = cache_key(filters, current(CATALOG_VERSION))
+    counts = cache.get(key)
+    if counts is None:
+        counts = count_facets(filters)
+        cache.set(key, counts, getattr(settings, 'SHIP_FACETS_CACHE_TIMEOUT', 86400))
+    return counts
+
+
+def get_facets(filters: Mapping[str, str]) -> Dict[str, List[FacetValue]]:
+    """
+    The catalog facets for a set of active filters.
+
+    Options without ships are left out, except for the selected ones.
+
+    Args:
+        filters: Filters as returned by ``clean_filters``
+
+    Returns:
+        Facet names mapped to their options, in display order
+    """
+    labels = {
+        'size': dict(Ship.SIZE_CHOICES),
+        'status': dict(STATUS_CHOICES),
+    }
+    facets = {}
+    for name, options in cached_facet_counts(filters).items():
+        selected = filters.get(name)
+        values = [
+            FacetValue(value, label or str(labels.get(name, {}).get(value, value)), count, value == selected)
+            for value, label, count in options
+        ]
+        if selected and not any(option.selected for option in values):
+            values.append(FacetValue(selected, str(labels.get(name, {}).get(selected, selected)), 0, True))
+        facets[name] = values
+    return facets
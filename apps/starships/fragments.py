@@ -0,0 +1,65 @@
+"""
+Cached HTML fragments of the ship catalog.
+
+A ship's card on the list page and its specifications on the detail page
+only change when the ship (or its manufacturer's name) does, so they are
+rendered once and cached. Keys are built like those of the ``{% cache %}``
+template tag from the ship's primary key, both ``updated_at`` timestamps and
+the language, so an edited ship simply gets a new key and stale fragments
+expire unused. A list page fetches all of its cards with one ``get_many``
+and stores the missing ones with one ``set_many``.
+"""
+from typing import Iterable, List
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString, mark_safe
+from django.utils.translation import get_language
+from .models import Ship
+
+CARD_TEMPLATE = 'starships/ship_card.html'
+
+
+def fragment_cache():
+    """The cache the ``{% cache %}`` tag uses: ``template_fragments`` if configured."""
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def fragment_timeout() -> int:
+    return getattr(settings, 'SHIP_FRAGMENT_CACHE_TIMEOUT', 86400)
+
+
+def vary_on(ship: Ship, language: str) -> list:
+    """What a ship's fragments depend on, as passed to ``{% cache %}``."""
+    return [ship.pk, ship.updated_at, ship.manufacturer.updated_at, language]
+
+
+def render_cards(ships: Iterable[Ship]) -> List[SafeString]:
+    """
+    The catalog cards of a page of ships, in order, rendering only those not cached.
+
+    Args:
+        ships: Ships with their manufacturers selected
+
+    Returns:
+        One HTML card per ship
+    """
+    ships = list(ships)
+    language = get_language()
+    keys = [make_template_fragment_key('ship_card', vary_on(ship, language)) for ship in ships]
+    cache = fragment_cache()
+    cards = cache.get_many(keys)
+
+    rendered = {
+        key: render_to_string(CARD_TEMPLATE, {'ship': ship})
+        for key, ship in zip(keys, ships)
+        if key not in cards
+    }
+    if rendered:
+        cache.set_many(rendered, fragment_timeout())
+        cards.update(rendered)
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,41 @@
+"""
+Export the stored API records of all ships to a local dump file.
+Usage: python manage.py export_ships ships.ndjson.gz
+       python manage.py export_ships ships.ndjson --manufacturers manufacturers.ndjson
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.dumps import DumpError, write_dump
+from apps.starships.models import Manufacturer, Ship
+
+
+class Command(BaseCommand):
+    help = 'Write the API records of stored ships to an NDJSON or JSON dump for import_ships'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Output file; .json writes a JSON array, .gz compresses')
+        parser.add_argument('--manufacturers', help='Also write manufacturer records to this file')
+
+    def handle(self, *args, **options):
+        try:
+            if options['manufacturers']:
+                count = write_dump(options['manufacturers'], self.records(Manufacturer))
+                self.stdout.write(f'📦 Wrote {count} manufacturers to {options["manufacturers"]}')
+
+            count = write_dump(options['path'], self.records(Ship))
+        except DumpError as e:
+            raise CommandError(str(e))
+
+        skipped = Ship.objects.filter(api_data={}).count()
+        self.stdout.write(self.style.SUCCESS(f'✅ Wrote {count} ships to {options["path"]}'))
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'⚠️  Skipped {skipped} ships without API data'))
+
+    @staticmethod
+    def records(model):
+        """Stream the stored API records of a model, skipping rows never synced from the API."""
+        return (
+            model.objects.exclude(api_data={})
+            .order_by('pk')
+            .values_list('api_data', flat=True)
+            .iterator(chunk_size=2000)
+        )
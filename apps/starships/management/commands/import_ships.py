@@ -0,0 +1,67 @@
+"""
+Import ships from a local dump file instead of the Star Citizen API.
+Usage: python manage.py import_ships ships.ndjson.gz
+       python manage.py import_ships ships.ndjson --manufacturers manufacturers.ndjson
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.dumps import DumpError, iter_dump
+from apps.core.sync import DEFAULT_BATCH_SIZE
+from apps.core.telemetry import SyncRecorder
+from apps.starships.models import Ship
+from apps.starships.sync import ShipUpserter, upsert_manufacturers
+
+
+class Command(BaseCommand):
+    help = 'Import ships from an NDJSON or JSON dump of API records (see export_ships)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Ship dump file; .gz files are decompressed')
+        parser.add_argument(
+            '--manufacturers',
+            help='Manufacturer dump file; without it, manufacturers are created from the ship records',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Compare every column of existing ships, even when their data is unchanged',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Ships written per bulk statement (default: {DEFAULT_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+
+        with SyncRecorder('import_ships', options) as recorder:
+            try:
+                if options['manufacturers']:
+                    self.stdout.write(f'📦 Importing manufacturers from {options["manufacturers"]}...')
+                    with recorder.stage('manufacturers') as stage:
+                        mfr_stats = upsert_manufacturers(iter_dump(options['manufacturers']), force=force)
+                        stage.add_stats(mfr_stats)
+                    self.stdout.write(
+                        f'  ✅ Manufacturers: {mfr_stats.created} created, {mfr_stats.updated} updated, '
+                        f'{mfr_stats.unchanged} unchanged'
+                    )
+
+                self.stdout.write(f'🚢 Importing ships from {options["path"]}...')
+                with recorder.stage('ships') as stage:
+                    upserter = ShipUpserter(force=force, batch_size=options['batch_size'])
+                    stats = upserter.run(iter_dump(options['path']))
+                    stage.add_stats(stats)
+            except DumpError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Ship import complete!\n'
+            f'   Read: {stats.fetched}\n'
+            f'   Created: {stats.created}\n'
+            f'   Updated: {stats.updated}\n'
+            f'   Unchanged: {stats.unchanged}\n'
+            f'   Skipped: {stats.skipped}\n'
+            f'   Errors: {stats.errors}\n'
+            f'   Total ships in database: {Ship.objects.count()}'
+        ))
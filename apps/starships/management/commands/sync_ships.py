@@ -2,10 +2,12 @@
 Sync ships from Star Citizen API.
 Usage: python manage.py sync_ships
 """
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from apps.core.starcitizen_api import api_client, StarCitizenAPIError
-from apps.starships.models import Manufacturer, Ship
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.starcitizen_api import get_api_client, StarCitizenAPIError, StarCitizenAPINotModified
+from apps.core.telemetry import SyncRecorder
+from apps.starships.models import Ship
+from apps.starships.search import update_search_vectors
+from apps.starships.sync import DEFAULT_BATCH_SIZE, ComponentSyncer, ShipUpserter, upsert_manufacturers
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,142 +20,104 @@ class Command(BaseCommand):
         parser.add_argument(
             '--force',
             action='store_true',
-            help='Force update existing ships',
+            help='Compare every column of existing ships, even when their API data is unchanged',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Ships written per bulk statement (default: {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--rebuild-components',
+            action='store_true',
+            help='Only re-extract components from the API data stored on every ship',
+        )
+        parser.add_argument(
+            '--rebuild-search',
+            action='store_true',
+            help='Only recompute the catalog search index of every ship (PostgreSQL)',
         )
 
     def handle(self, *args, **options):
+        with SyncRecorder('sync_ships', options) as recorder:
+            self.sync(recorder, options)
+
+    def sync(self, recorder, options):
         force = options['force']
+        api_client = get_api_client()
+
+        if options['rebuild_search']:
+            self.stdout.write('🔎 Rebuilding the ship search index...')
+            with recorder.stage('search') as stage:
+                count = update_search_vectors()
+                stage.updated = count
+            self.stdout.write(self.style.SUCCESS(f'\n✅ Search index rebuilt for {count} ships'))
+            return
+
+        if options['rebuild_components']:
+            self.stdout.write('🔧 Rebuilding ship components from stored API data...')
+            with recorder.stage('components') as stage:
+                stats = ComponentSyncer(batch_size=options['batch_size']).rebuild()
+                stage.add_stats(stats)
+            self.stdout.write(self.style.SUCCESS(
+                f'\n✅ Component rebuild complete!\n'
+                f'   Ships: {stats.fetched}\n'
+                f'   Components created: {stats.created}\n'
+                f'   Components removed: {stats.removed}\n'
+                f'   Components unchanged: {stats.unchanged}'
+            ))
+            return
 
         self.stdout.write('🚀 Syncing ships from Star Citizen API...')
 
         try:
             # First sync manufacturers
             self.stdout.write('📦 Fetching manufacturers...')
-            manufacturers_data = api_client.get_manufacturers()
-
-            mfr_created = 0
-            mfr_updated = 0
-
-            for mfr_data in manufacturers_data:
-                code = mfr_data.get('code', '').strip()
-                if not code:
-                    continue
-
-                manufacturer, created = Manufacturer.objects.update_or_create(
-                    code=code,
-                    defaults={
-                        'name': mfr_data.get('name', code),
-                        'description': mfr_data.get('description', ''),
-                        'api_id': mfr_data.get('id', ''),
-                        'api_data': mfr_data,
-                    }
-                )
-
-                if created:
-                    mfr_created += 1
-                else:
-                    mfr_updated += 1
-
-            self.stdout.write(f'  ✅ Manufacturers: {mfr_created} created, {mfr_updated} updated')
-
-            # Now sync ships
-            self.stdout.write('🚢 Fetching ships...')
-            ships_data = api_client.get_ships()
-            self.stdout.write(f'📦 Fetched {len(ships_data)} ships from API')
+            with recorder.stage('manufacturers') as stage:
+                manufacturers_data = api_client.get_manufacturers(allow_stale=False)
 
-            created_count = 0
-            updated_count = 0
-            skipped_count = 0
-            error_count = 0
+                mfr_stats = upsert_manufacturers(manufacturers_data, force=force)
+                stage.add_stats(mfr_stats)
+
+            self.stdout.write(
+                f'  ✅ Manufacturers: {mfr_stats.created} created, {mfr_stats.updated} updated, '
+                f'{mfr_stats.unchanged} unchanged'
+            )
+
+            # Now sync ships, writing them in batches as they stream in from the API
+            self.stdout.write('🚢 Fetching ships...')
+            with recorder.stage('ships') as stage:
+                ships_data = api_client.iter_ships(conditional=not force)
 
-            for ship_data in ships_data:
+                upserter = ShipUpserter(force=force, batch_size=options['batch_size'])
                 try:
-                    with transaction.atomic():
-                        # Get or create manufacturer
-                        mfr_code = ship_data.get('manufacturer', {}).get('code', '').strip()
-                        if not mfr_code:
-                            skipped_count += 1
-                            continue
-
-                        manufacturer = Manufacturer.objects.filter(code=mfr_code).first()
-                        if not manufacturer:
-                            # Create manufacturer if not exists
-                            manufacturer = Manufacturer.objects.create(
-                                code=mfr_code,
-                                name=ship_data.get('manufacturer', {}).get('name', mfr_code)
-                            )
-
-                        ship_name = ship_data.get('name', '').strip()
-                        if not ship_name:
-                            skipped_count += 1
-                            continue
-
-                        api_id = ship_data.get('id', '')
-
-                        # Check if ship exists
-                        if api_id:
-                            ship = Ship.objects.filter(api_id=api_id).first()
-                        else:
-                            ship = Ship.objects.filter(
-                                manufacturer=manufacturer,
-                                name=ship_name
-                            ).first()
-
-                        defaults = {
-                            'manufacturer': manufacturer,
-                            'name': ship_name,
-                            'type': ship_data.get('type', ''),
-                            'size': ship_data.get('size', 'small').lower(),
-                            'focus': ship_data.get('focus', ''),
-                            'description': ship_data.get('description', ''),
-                            'career': ship_data.get('career', ''),
-                            'role': ship_data.get('role', ''),
-                            'length': ship_data.get('length'),
-                            'beam': ship_data.get('beam'),
-                            'height': ship_data.get('height'),
-                            'mass': ship_data.get('mass'),
-                            'min_crew': ship_data.get('min_crew'),
-                            'max_crew': ship_data.get('max_crew'),
-                            'cargo_capacity': ship_data.get('cargo_capacity'),
-                            'is_flight_ready': ship_data.get('production_status') == 'flight_ready',
-                            'is_concept': ship_data.get('production_status') == 'concept',
-                            'production_status': ship_data.get('production_status', ''),
-                            'pledge_price': ship_data.get('pledge_price'),
-                            'store_url': ship_data.get('store_url', ''),
-                            'api_id': api_id,
-                            'api_data': ship_data,
-                        }
-
-                        if ship and force:
-                            # Update existing ship
-                            for key, value in defaults.items():
-                                setattr(ship, key, value)
-                            ship.save()
-                            updated_count += 1
-                            self.stdout.write(f'  🔄 Updated: {manufacturer.code} {ship_name}')
-                        elif not ship:
-                            # Create new ship
-                            ship = Ship.objects.create(**defaults)
-                            created_count += 1
-                            self.stdout.write(f'  ✅ Created: {manufacturer.code} {ship_name}')
-                        else:
-                            skipped_count += 1
-
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Error syncing ship {ship_data.get('name')}: {e}")
-                    self.stdout.write(
-                        self.style.ERROR(f'  ❌ Error: {ship_data.get("name")} - {e}')
-                    )
+                    stats = upserter.run(ships_data, on_batch=self.report_batch)
+                except StarCitizenAPINotModified:
+                    self.stdout.write(self.style.SUCCESS('\n✅ Ship list unchanged since the last sync'))
+                    return
+                stage.add_stats(stats)
+            component_stats = upserter.components.stats
 
             self.stdout.write(self.style.SUCCESS(
                 f'\n✅ Ship sync complete!\n'
-                f'   Created: {created_count}\n'
-                f'   Updated: {updated_count}\n'
-                f'   Skipped: {skipped_count}\n'
-                f'   Errors: {error_count}\n'
+                f'   Fetched: {stats.fetched}\n'
+                f'   Created: {stats.created}\n'
+                f'   Updated: {stats.updated}\n'
+                f'   Unchanged: {stats.unchanged}\n'
+                f'   Skipped: {stats.skipped}\n'
+                f'   Errors: {stats.errors}\n'
+                f'   Components: {component_stats.created} created, {component_stats.removed} removed\n'
                 f'   Total ships in database: {Ship.objects.count()}'
             ))
 
         except StarCitizenAPIError as e:
-            self.stdout.write(self.style.ERROR(f'❌ API Error: {e}'))
+            # Fail the command so sync jobs see the error
+            raise CommandError(f'API Error: {e}') from e
+
+    def report_batch(self, created, updated):
+        """Echo the ships written by one batch."""
+        for code, name in created:
+            self.stdout.write(f'  ✅ Created: {code} {name}')
+        for code, name in updated:
+            self.stdout.write(f'  🔄 Updated: {code} {name}')
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.3 on 2026-10-17 17:42
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import Value
+
+
+def populate_search_vectors(apps, schema_editor):
+    # The search vector as defined when this migration was written; later
+    # changes to apps.starships.search must not change what it does
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Manufacturer = apps.get_model("starships", "Manufacturer")
+    Ship = apps.get_model("starships", "Ship")
+    ships = Ship.objects.using(schema_editor.connection.alias)
+    manufacturers = Manufacturer.objects.using(schema_editor.connection.alias)
+    for manufacturer_id, name in manufacturers.values_list("pk", "name"):
+        ships.filter(manufacturer_id=manufacturer_id).update(
+            search_vector=(
+                SearchVector("name", weight="A", config="simple")
+                + SearchVector(Value(name), weight="B", config="simple")
+                + SearchVector("type", "focus", "role", weight="C", config="simple")
+                + SearchVector("description", weight="D", config="simple")
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("starships", "0002_api_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ship",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Search Vector"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ship",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="ship_search_vector_gin"
+            ),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.3 on 2026-10-17 17:51
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_manufacturer_names(apps, schema_editor):
+    Manufacturer = apps.get_model("starships", "Manufacturer")
+    Ship = apps.get_model("starships", "Ship")
+    name = Manufacturer.objects.filter(pk=OuterRef("manufacturer_id")).values("name")[
+        :1
+    ]
+    Ship.objects.update(manufacturer_name=Subquery(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("starships", "0003_search_vector"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="ship",
+            options={
+                "ordering": ["manufacturer_name", "name"],
+                "verbose_name": "Ship",
+                "verbose_name_plural": "Ships",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="ship",
+            name="starships_s_manufac_e380d2_idx",
+        ),
+        migrations.AddField(
+            model_name="ship",
+            name="manufacturer_name",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=100,
+                verbose_name="Manufacturer Name",
+            ),
+        ),
+        migrations.RunPython(copy_manufacturer_names, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="ship",
+            index=models.Index(
+                fields=["manufacturer_name", "name", "id"],
+                name="starships_s_manufac_f23b7b_idx",
+            ),
+        ),
+    ]
@@ -1,9 +1,14 @@
 """
 Starships models for managing Star Citizen ship data.
 """
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+# Data version (see apps.core.versions) bumped by every write to the catalog:
+# manufacturers, ships and their components
+CATALOG_VERSION = 'catalog'
 
 class Manufacturer(models.Model):
     """Ship manufacturers."""
@@ -21,6 +26,13 @@ class Manufacturer(models.Model):
     # API metadata
     api_id = models.CharField(_('API ID'), max_length=50, blank=True)
     api_data = models.JSONField(_('API Data'), default=dict, blank=True)
+    api_hash = models.CharField(
+        _('API Hash'),
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text=_('Hash of the normalized API data, used to skip unchanged syncs')
+    )
 
     # Timestamps
     created_at = models.DateTimeField(_('Created'), auto_now_add=True)
@@ -55,6 +67,8 @@ class Ship(models.Model):
         related_name='ships',
         verbose_name=_('Manufacturer')
     )
+    # Copy of the manufacturer's name, so one index serves the catalog order
+    manufacturer_name = models.CharField(_('Manufacturer Name'), max_length=100, blank=True, editable=False)
 
     # Classification
     type = models.CharField(_('Type'), max_length=100, blank=True)
@@ -142,6 +156,16 @@ class Ship(models.Model):
         blank=True
     )
     api_data = models.JSONField(_('API Data'), default=dict, blank=True)
+    api_hash = models.CharField(
+        _('API Hash'),
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text=_('Hash of the normalized API data, used to skip unchanged syncs')
+    )
+
+    # Catalog search (PostgreSQL only), maintained by apps.starships.search
+    search_vector = SearchVectorField(_('Search Vector'), null=True, editable=False)
 
     # Timestamps
     created_at = models.DateTimeField(_('Created'), auto_now_add=True)
@@ -150,12 +174,14 @@ class Ship(models.Model):
     class Meta:
         verbose_name = _('Ship')
         verbose_name_plural = _('Ships')
-        ordering = ['manufacturer__name', 'name']
+        ordering = ['manufacturer_name', 'name']
         indexes = [
-            models.Index(fields=['manufacturer', 'name']),
+            # Catalog order, the key of its cursor pagination
+            models.Index(fields=['manufacturer_name', 'name', 'id']),
             models.Index(fields=['type']),
             models.Index(fields=['size']),
             models.Index(fields=['is_flight_ready']),
+            GinIndex(fields=['search_vector'], name='ship_search_vector_gin'),
         ]
 
     def __str__(self) -> str:
@@ -0,0 +1,121 @@
+"""
+Full-text search for the ship catalog.
+
+On PostgreSQL every ship stores a weighted ``tsvector`` of its name (A),
+manufacturer name (B), type, focus and role (C) and description (D) in
+``Ship.search_vector``, backed by a GIN index. Searches match every word as a
+prefix and are ordered by rank. The vector includes the manufacturer name, so
+it cannot be a generated column. ``update_search_vectors`` refreshes it,
+called by the sync after each written batch and by the signals in
+``apps.starships.signals`` for single saves.
+
+Other databases (SQLite in development) fall back to ``icontains`` matching,
+with ships whose name matches the query ordered first.
+"""
+import re
+from typing import Iterable, Optional
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import Case, F, FloatField, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Cast
+from apps.starships.models import Manufacturer, Ship
+
+# 'simple' neither stems nor drops stop words, which suits ship and company names
+SEARCH_CONFIG = 'simple'
+
+# Query words; anything else, including tsquery operators, is dropped
+WORD = re.compile(r'\w+')
+
+
+def is_supported(using: str = 'default') -> bool:
+    """Whether the database has full-text search."""
+    return connections[using].vendor == 'postgresql'
+
+
+def ship_search_vector(manufacturer_name: str):
+    """The search vector expression for ships of one manufacturer."""
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(Value(manufacturer_name), weight='B', config=SEARCH_CONFIG)
+        + SearchVector('type', 'focus', 'role', weight='C', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(
+    ship_ids: Optional[Iterable[int]] = None,
+    manufacturer_ids: Optional[Iterable[int]] = None,
+) -> int:
+    """
+    Recompute the search vectors of some or all ships.
+
+    Updates can't read joined columns, so ships are updated with one
+    statement per manufacturer.
+
+    Args:
+        ship_ids: Only these ships
+        manufacturer_ids: Only ships of these manufacturers
+
+    Returns:
+        Number of ships updated; 0 on databases without full-text search
+    """
+    ships = Ship.objects.all()
+    if not is_supported(ships.db):
+        return 0
+    if ship_ids is not None:
+        ships = ships.filter(pk__in=list(ship_ids))
+    if manufacturer_ids is not None:
+        ships = ships.filter(manufacturer_id__in=list(manufacturer_ids))
+
+    updated = 0
+    manufacturers = Manufacturer.objects.filter(pk__in=ships.values('manufacturer_id'))
+    for manufacturer_id, name in manufacturers.values_list('pk', 'name'):
+        updated += ships.filter(manufacturer_id=manufacturer_id).update(search_vector=ship_search_vector(name))
+    return updated
+
+
+def search_ships(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Filter ships to those matching every word of ``text``, best matches first.
+
+    Args:
+        queryset: Ships to search
+        text: Search box input
+
+    Returns:
+        The filtered queryset ordered by relevance, or ``queryset`` unchanged
+        when the text holds no words
+    """
+    words = WORD.findall(text.lower())
+    if not words:
+        return queryset
+
+    if is_supported(queryset.db):
+        query = SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config=SEARCH_CONFIG)
+        # ts_rank returns a real; as a double it survives the round trip
+        # through a pagination cursor exactly
+        rank = Cast(SearchRank(F('search_vector'), query), FloatField())
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=rank)
+            .order_by('-rank', 'manufacturer_name', 'name', 'pk')
+        )
+
+    match = Q()
+    for word in words:
+        match &= (
+            Q(name__icontains=word)
+            | Q(manufacturer__name__icontains=word)
+            | Q(type__icontains=word)
+            | Q(focus__icontains=word)
+            | Q(role__icontains=word)
+            | Q(description__icontains=word)
+        )
+    phrase = ' '.join(words)
+    rank = Case(
+        When(name__istartswith=phrase, then=Value(2)),
+        When(name__icontains=phrase, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    return queryset.filter(match).annotate(rank=rank).order_by('-rank', 'manufacturer_name', 'name', 'pk')
@@ -0,0 +1,49 @@
+"""
+Keep ships' manufacturer names, search vectors and the catalog version
+current for single-row writes, e.g. from the admin.
+
+Syncs write in bulk, which sends no signals, and do both themselves.
+Component deletions have no receiver, so they stay a single bulk query;
+``ShipComponentAdmin`` marks the ships itself when deleting components.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.core.versions import bump
+from .models import CATALOG_VERSION, Manufacturer, Ship, ShipComponent
+from .search import update_search_vectors
+from .sync import copy_manufacturer_names, touch_ships
+
+
+@receiver(pre_save, sender=Ship)
+def copy_ship_manufacturer_name(sender, instance, raw=False, **kwargs):
+    if not raw and instance.manufacturer_id is not None:
+        instance.manufacturer_name = instance.manufacturer.name
+
+
+@receiver(post_save, sender=Ship)
+def update_ship_search_vector(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_search_vectors(ship_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Manufacturer)
+def update_manufacturer_ships(sender, instance, created=False, raw=False, **kwargs):
+    # A new manufacturer has no ships yet
+    if not raw and not created:
+        copy_manufacturer_names([instance.pk])
+        update_search_vectors(manufacturer_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Ship)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Ship)
+@receiver(post_delete, sender=Manufacturer)
+def bump_catalog_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump(CATALOG_VERSION)
+
+
+@receiver(post_save, sender=ShipComponent)
+def touch_component_ship(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_ships([instance.ship_id])
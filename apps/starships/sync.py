@@ -0,0 +1,534 @@
+"""
+Batched upserts of API ship data into the catalog.
+
+Existing manufacturers and ships are loaded into dicts once, incoming records
+are matched against them in memory, and writes go out in chunks through
+``bulk_create`` and ``bulk_update`` so a full catalog sync takes a handful of
+queries instead of several per ship. Rows whose API payload hash is unchanged
+are left alone, and changed rows only have their differing columns written.
+
+Hardpoints listed in each ship's payload are stored as ``ShipComponent``
+rows. A ship's components are diffed against what is stored and only the
+differences are inserted or deleted, in bulk for a whole batch of ships.
+
+Every batch that writes anything bumps the catalog data version, so caches
+built from the catalog are rebuilt.
+"""
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from apps.core.changes import apply_changes, bulk_update_changed, changed_fields, payload_hash
+from apps.core.sync import DEFAULT_BATCH_SIZE, SyncStats, chunked
+from apps.core.versions import bump
+from apps.starships.models import CATALOG_VERSION, Manufacturer, Ship, ShipComponent
+from apps.starships.search import update_search_vectors
+
+logger = logging.getLogger(__name__)
+
+MANUFACTURER_UPDATE_FIELDS = ['name', 'description', 'api_id', 'api_data', 'api_hash', 'updated_at']
+
+SHIP_UPDATE_FIELDS = [
+    'manufacturer', 'manufacturer_name', 'name', 'type', 'size', 'focus', 'description', 'career',
+    'role', 'length', 'beam', 'height', 'mass', 'min_crew', 'max_crew',
+    'cargo_capacity', 'is_flight_ready', 'is_concept', 'production_status',
+    'pledge_price', 'store_url', 'api_data', 'api_hash', 'updated_at',
+]
+
+# API hardpoint types mapped to ShipComponent.component_type; anything else is 'misc'
+COMPONENT_TYPES = {
+    'weapons': 'weapon',
+    'missiles': 'weapon',
+    'turrets': 'weapon',
+    'shield_generators': 'shield',
+    'power_plants': 'power',
+    'coolers': 'cooler',
+    'quantum_drives': 'quantum',
+    'fuel_tanks': 'fuel',
+    'quantum_fuel_tanks': 'fuel',
+    'cargo': 'cargo',
+}
+
+
+def manufacturer_fields(mfr_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an API manufacturer record to Manufacturer field values."""
+    code = mfr_data.get('code', '').strip()
+    return {
+        'code': code,
+        'name': mfr_data.get('name', code),
+        'description': mfr_data.get('description', ''),
+        'api_id': mfr_data.get('id', ''),
+        'api_data': mfr_data,
+        'api_hash': payload_hash(mfr_data),
+    }
+
+
+def ship_fields(ship_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an API ship record to Ship field values, excluding the manufacturer."""
+    production_status = ship_data.get('production_status', '')
+    return {
+        'name': ship_data.get('name', '').strip(),
+        'type': ship_data.get('type', ''),
+        'size': ship_data.get('size', 'small').lower(),
+        'focus': ship_data.get('focus', ''),
+        'description': ship_data.get('description', ''),
+        'career': ship_data.get('career', ''),
+        'role': ship_data.get('role', ''),
+        'length': ship_data.get('length'),
+        'beam': ship_data.get('beam'),
+        'height': ship_data.get('height'),
+        'mass': ship_data.get('mass'),
+        'min_crew': ship_data.get('min_crew'),
+        'max_crew': ship_data.get('max_crew'),
+        'cargo_capacity': ship_data.get('cargo_capacity'),
+        'is_flight_ready': production_status == 'flight_ready',
+        'is_concept': production_status == 'concept',
+        'production_status': production_status,
+        'pledge_price': ship_data.get('pledge_price'),
+        'store_url': ship_data.get('store_url', ''),
+        'api_id': ship_data.get('id', ''),
+        'api_data': ship_data,
+        'api_hash': payload_hash(ship_data),
+    }
+
+
+def component_fields(ship_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield ShipComponent field values for the hardpoints in an API ship record.
+
+    Hardpoints are read from the ``compiled`` section, which groups component
+    lists by class and then by type, e.g.
+    ``{"RSIWeapon": {"weapons": [{"name": ..., "size": ..., "quantity": ...}]}}``.
+    """
+    compiled = ship_data.get('compiled') or {}
+    if not isinstance(compiled, dict):
+        return
+    for group in compiled.values():
+        if not isinstance(group, dict):
+            continue
+        for api_type, entries in group.items():
+            for entry in entries or []:
+                if not isinstance(entry, dict):
+                    continue
+                try:
+                    quantity = int(entry.get('quantity') or entry.get('mounts') or 1)
+                except (TypeError, ValueError):
+                    quantity = 1
+                mount = entry.get('type') or api_type
+                yield {
+                    'component_type': COMPONENT_TYPES.get(mount, 'misc'),
+                    'name': str(entry.get('name') or api_type)[:200],
+                    'size': str(entry.get('size') or entry.get('component_size') or '')[:10],
+                    'quantity': quantity,
+                    'mount_name': str(mount)[:200],
+                    'details': str(entry.get('details') or ''),
+                    'api_data': entry,
+                }
+
+
+def component_signature(fields: Dict[str, Any]) -> Tuple:
+    """Identity of a component row; rows with equal signatures are interchangeable."""
+    return (
+        fields['component_type'],
+        fields['name'],
+        fields['size'],
+        fields['quantity'],
+        fields['mount_name'],
+        fields['details'],
+        payload_hash(fields['api_data']),
+    )
+
+
+def copy_manufacturer_names(manufacturer_ids: Iterable[int]) -> int:
+    """
+    Copy renamed manufacturers' names onto their ships' ``manufacturer_name``,
+    which the catalog is ordered by.
+
+    Returns:
+        Number of ships updated
+    """
+    manufacturer_ids = list(manufacturer_ids)
+    if not manufacturer_ids:
+        return 0
+    name = Manufacturer.objects.filter(pk=OuterRef('manufacturer_id')).values('name')[:1]
+    return Ship.objects.filter(manufacturer_id__in=manufacturer_ids).update(manufacturer_name=Subquery(name))
+
+
+def touch_ships(ship_ids: Iterable[int]) -> None:
+    """
+    Mark ships as changed after writing their components.
+
+    Cached ship fragments are keyed on ``updated_at`` and cached catalog pages
+    on the catalog version, so both have to move on.
+    """
+    Ship.objects.filter(pk__in=list(ship_ids)).update(updated_at=timezone.now())
+    bump(CATALOG_VERSION)
+
+
+class ComponentSyncer:
+    """
+    Replaces the stored components of ships with those in their API data.
+
+    Each ship's stored components are compared with the extracted ones as a
+    multiset; unchanged rows are kept, and the rest are deleted and inserted
+    with one bulk statement each per batch of ships.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+        self.stats = SyncStats()
+
+    def sync(self, ships: Iterable[Tuple[int, Dict[str, Any]]]) -> SyncStats:
+        """
+        Sync components for ``(ship_pk, api_data)`` pairs, batch by batch.
+
+        Returns:
+            Counts of component rows created, removed and left unchanged
+        """
+        for batch in chunked(ships, self.batch_size):
+            with transaction.atomic():
+                stats = self.sync_batch(batch)
+            self.stats.add(stats)
+        return self.stats
+
+    def sync_batch(self, ships: List[Tuple[int, Dict[str, Any]]]) -> SyncStats:
+        """
+        Diff and write the components of one batch of ships.
+
+        Returns:
+            The batch's counts, for the caller to add once its transaction commits
+        """
+        stats = SyncStats()
+        desired = {pk: Counter() for pk, _ in ships}
+        rows = {}
+        for pk, ship_data in ships:
+            stats.fetched += 1
+            for fields in component_fields(ship_data or {}):
+                signature = component_signature(fields)
+                desired[pk][signature] += 1
+                rows[(pk, signature)] = fields
+
+        stale = []
+        touched = set()
+        for component in ShipComponent.objects.filter(ship_id__in=desired).only(
+            'pk', 'ship_id', 'component_type', 'name', 'size', 'quantity', 'mount_name', 'details', 'api_data'
+        ):
+            signature = component_signature(component.__dict__)
+            wanted = desired[component.ship_id]
+            if wanted[signature] > 0:
+                # Already stored; keep it and insert one fewer
+                wanted[signature] -= 1
+                stats.unchanged += 1
+            else:
+                stale.append(component.pk)
+                touched.add(component.ship_id)
+
+        new = [
+            ShipComponent(ship_id=pk, **rows[(pk, signature)])
+            for pk, wanted in desired.items()
+            for signature, count in wanted.items()
+            for _ in range(count)
+        ]
+
+        for pks in chunked(stale, self.batch_size):
+            ShipComponent.objects.filter(pk__in=pks).delete()
+        ShipComponent.objects.bulk_create(new, batch_size=self.batch_size)
+        if new or stale:
+            touch_ships(touched | {component.ship_id for component in new})
+        stats.created = len(new)
+        stats.removed = len(stale)
+        return stats
+
+    def rebuild(self, ship_ids: Optional[Iterable[int]] = None) -> SyncStats:
+        """
+        Sync components from the API data already stored on ships.
+
+        Args:
+            ship_ids: Only these ships; all ships when omitted
+        """
+        ships = Ship.objects.order_by('pk').values_list('pk', 'api_data')
+        if ship_ids is None:
+            return self.sync(ships.iterator(chunk_size=self.batch_size))
+        for pks in chunked(ship_ids, self.batch_size):
+            self.sync(ships.filter(pk__in=pks))
+        return self.stats
+
+
+def upsert_manufacturers(manufacturers_data: Iterable[Dict[str, Any]], force: bool = False) -> SyncStats:
+    """
+    Create or update manufacturers from API records.
+
+    Args:
+        manufacturers_data: Manufacturer records from the API
+        force: Compare every column even when the payload hash is unchanged
+
+    Returns:
+        Created/updated/unchanged/skipped counts
+    """
+    stats = SyncStats()
+    existing = {mfr.code: mfr for mfr in Manufacturer.objects.all()}
+    records: Dict[str, Dict[str, Any]] = {}
+
+    for mfr_data in manufacturers_data:
+        stats.fetched += 1
+        fields = manufacturer_fields(mfr_data)
+        if not fields['code']:
+            stats.skipped += 1
+            continue
+        records[fields['code']] = fields
+
+    new = []
+    changed = []
+    for code, fields in records.items():
+        manufacturer = existing.get(code)
+        if manufacturer is None:
+            new.append(Manufacturer(**fields))
+            continue
+        if not force and manufacturer.api_hash == fields['api_hash']:
+            stats.unchanged += 1
+            continue
+        diff = changed_fields(manufacturer, fields)
+        if not diff:
+            stats.unchanged += 1
+            continue
+        apply_changes(manufacturer, fields, diff)
+        changed.append((manufacturer, diff))
+
+    with transaction.atomic():
+        if new:
+            # Conflicts only happen if another sync created the row meanwhile
+            Manufacturer.objects.bulk_create(
+                new,
+                update_conflicts=True,
+                unique_fields=['code'],
+                update_fields=MANUFACTURER_UPDATE_FIELDS,
+            )
+        stats.updated = bulk_update_changed(Manufacturer, changed)
+        # Ships store the manufacturer name and include it in their search vectors
+        renamed = [mfr.pk for mfr, diff in changed if 'name' in diff]
+        copy_manufacturer_names(renamed)
+        update_search_vectors(manufacturer_ids=renamed)
+        if new or changed:
+            bump(CATALOG_VERSION)
+
+    stats.created = len(new)
+    return stats
+
+
+@dataclass
+class ShipBatch:
+    """What writing one batch of ships did, kept apart until its transaction commits."""
+
+    stats: SyncStats = field(default_factory=SyncStats)
+    # (manufacturer_code, ship_name) labels
+    created: List[Tuple[str, str]] = field(default_factory=list)
+    updated: List[Tuple[str, str]] = field(default_factory=list)
+    # Manufacturers the batch created, by code
+    manufacturers: Dict[str, Manufacturer] = field(default_factory=dict)
+    # Match keys of the records written or skipped as duplicates
+    seen: set = field(default_factory=set)
+    # Created and updated ships
+    ships: List[Ship] = field(default_factory=list)
+    components: Optional[SyncStats] = None
+
+
+class ShipUpserter:
+    """
+    Writes API ship records to the database in batches.
+
+    Ships are matched by ``api_id`` when the API provides one and by
+    manufacturer and name otherwise, mirroring the per-row sync. Existing
+    ships are only rewritten when their payload hash changed, or on ``force``
+    when any column differs. With ``components``, the components of every
+    created or updated ship are synced in the same transaction; either way
+    the primary keys of those ships are collected in ``written``.
+
+    A batch that fails is retried in halves down to single records, so one
+    bad record costs only itself.
+    """
+
+    def __init__(self, force: bool = False, batch_size: int = DEFAULT_BATCH_SIZE, components: bool = True):
+        self.force = force
+        self.batch_size = max(1, batch_size)
+        self.stats = SyncStats()
+        self.components = ComponentSyncer(batch_size) if components else None
+        self.written: List[int] = []
+        self.manufacturers: Dict[str, Manufacturer] = {}
+        # Stored ships as (pk, api_hash)
+        self.by_api_id: Dict[str, Tuple[int, str]] = {}
+        self.by_name: Dict[Tuple[int, str], Tuple[int, str]] = {}
+        self.seen = set()
+
+    def load(self) -> None:
+        """Preload existing manufacturers and ship keys."""
+        self.manufacturers = {mfr.code: mfr for mfr in Manufacturer.objects.all()}
+        for pk, api_id, manufacturer_id, name, api_hash in Ship.objects.values_list(
+            'pk', 'api_id', 'manufacturer_id', 'name', 'api_hash'
+        ):
+            if api_id:
+                self.by_api_id[api_id] = (pk, api_hash)
+            self.by_name[(manufacturer_id, name)] = (pk, api_hash)
+
+    def run(self, ships_data: Iterable[Dict[str, Any]], on_batch=None) -> SyncStats:
+        """
+        Upsert every record in ``ships_data``.
+
+        Args:
+            ships_data: Ship records from the API, may be a lazy iterator
+            on_batch: Optional callable receiving ``(created, updated)`` lists
+                of ``(manufacturer_code, ship_name)`` after each written batch
+
+        Returns:
+            Counts for the whole run
+        """
+        self.load()
+        for batch in chunked(ships_data, self.batch_size):
+            self.stats.fetched += len(batch)
+            self.write(batch, on_batch)
+        return self.stats
+
+    def write(self, batch: List[Dict[str, Any]], on_batch=None) -> None:
+        """
+        Write a batch in one transaction, isolating failures.
+
+        A failed batch is split in half and each half retried, so a bad
+        record only loses itself and the rest of its batch is still written.
+        """
+        try:
+            with transaction.atomic():
+                result = self.write_batch(batch)
+        except Exception as e:
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                self.write(batch[:middle], on_batch)
+                self.write(batch[middle:], on_batch)
+                return
+            self.stats.errors += 1
+            logger.error(f"Error syncing ship {batch[0].get('name', '')!r}: {e}")
+            return
+        self.commit(result)
+        if on_batch:
+            on_batch(result.created, result.updated)
+
+    def commit(self, result: ShipBatch) -> None:
+        """Merge the outcome of a committed batch into the run's state."""
+        self.stats.add(result.stats)
+        self.manufacturers.update(result.manufacturers)
+        self.seen.update(result.seen)
+        for ship in result.ships:
+            self.remember(ship)
+        self.written.extend(ship.pk for ship in result.ships)
+        if self.components is not None and result.components is not None:
+            self.components.stats.add(result.components)
+
+    def resolve_manufacturers(self, batch: List[Dict[str, Any]]) -> Dict[str, Manufacturer]:
+        """Create manufacturers referenced by the batch that do not exist yet, returned by code."""
+        missing = {}
+        for ship_data in batch:
+            mfr = ship_data.get('manufacturer') or {}
+            code = mfr.get('code', '').strip()
+            if code and code not in self.manufacturers:
+                missing[code] = Manufacturer(code=code, name=mfr.get('name', code))
+        if not missing:
+            return {}
+        Manufacturer.objects.bulk_create(missing.values(), ignore_conflicts=True)
+        bump(CATALOG_VERSION)
+        return {mfr.code: mfr for mfr in Manufacturer.objects.filter(code__in=missing)}
+
+    def match(self, fields: Dict[str, Any], manufacturer: Manufacturer) -> Optional[Tuple[int, str]]:
+        """Return ``(pk, api_hash)`` of the stored ship a record refers to, if any."""
+        if fields['api_id']:
+            return self.by_api_id.get(fields['api_id'])
+        return self.by_name.get((manufacturer.pk, fields['name']))
+
+    def remember(self, ship: Ship) -> None:
+        """Record a written ship so later batches match it."""
+        if ship.pk is None:
+            return
+        if ship.api_id:
+            self.by_api_id[ship.api_id] = (ship.pk, ship.api_hash)
+        self.by_name[(ship.manufacturer_id, ship.name)] = (ship.pk, ship.api_hash)
+
+    def write_batch(self, batch: List[Dict[str, Any]]) -> ShipBatch:
+        """
+        Write one batch inside the caller's transaction.
+
+        The run's state is left untouched; the returned ``ShipBatch`` is
+        merged by ``commit`` once the transaction has committed, so nothing
+        from a rolled-back batch leaks into later ones.
+        """
+        result = ShipBatch(manufacturers=self.resolve_manufacturers(batch))
+        stats = result.stats
+        new_keyed: List[Ship] = []
+        new_unkeyed: List[Ship] = []
+        candidates: Dict[int, Dict[str, Any]] = {}
+
+        for ship_data in batch:
+            mfr_code = (ship_data.get('manufacturer') or {}).get('code', '').strip()
+            fields = ship_fields(ship_data)
+            if not mfr_code or not fields['name']:
+                stats.skipped += 1
+                continue
+
+            manufacturer = result.manufacturers.get(mfr_code) or self.manufacturers[mfr_code]
+            key = fields['api_id'] or (manufacturer.pk, fields['name'])
+            if key in self.seen or key in result.seen:
+                # The API listed the same ship twice; one write per run is enough
+                stats.skipped += 1
+                continue
+            result.seen.add(key)
+            fields['manufacturer'] = manufacturer
+            fields['manufacturer_name'] = manufacturer.name
+
+            stored = self.match(fields, manufacturer)
+            if stored is None:
+                ship = Ship(**fields)
+                (new_keyed if fields['api_id'] else new_unkeyed).append(ship)
+                result.created.append((manufacturer.code, fields['name']))
+            elif self.force or stored[1] != fields['api_hash']:
+                candidates[stored[0]] = fields
+            else:
+                stats.unchanged += 1
+
+        changed = []
+        for pk, ship in Ship.objects.in_bulk(candidates).items():
+            fields = candidates[pk]
+            diff = changed_fields(ship, fields)
+            if not diff:
+                stats.unchanged += 1
+                continue
+            apply_changes(ship, fields, diff)
+            changed.append((ship, diff))
+            result.updated.append((fields['manufacturer'].code, fields['name']))
+
+        if new_keyed:
+            # Conflicts only happen if another sync created the row meanwhile
+            Ship.objects.bulk_create(
+                new_keyed,
+                update_conflicts=True,
+                unique_fields=['api_id'],
+                update_fields=SHIP_UPDATE_FIELDS,
+            )
+        if new_unkeyed:
+            Ship.objects.bulk_create(new_unkeyed)
+        bulk_update_changed(Ship, changed)
+
+        written = new_keyed + new_unkeyed + [ship for ship, _ in changed]
+        missing = {ship.api_id: ship for ship in written if ship.pk is None and ship.api_id}
+        if missing:
+            # Backends that cannot return ids from an upsert
+            for pk, api_id in Ship.objects.filter(api_id__in=missing).values_list('pk', 'api_id'):
+                missing[api_id].pk = pk
+        result.ships = [ship for ship in written if ship.pk is not None]
+        update_search_vectors(ship.pk for ship in result.ships)
+        if written:
+            bump(CATALOG_VERSION)
+        if self.components is not None:
+            result.components = self.components.sync_batch([(ship.pk, ship.api_data) for ship in result.ships])
+
+        stats.created = len(result.created)
+        stats.updated = len(result.updated)
+        return result
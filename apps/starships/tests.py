@@ -1,3 +1,529 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import translation
+from apps.core.versions import forget
+from apps.starships import fragments, typeahead
+from apps.starships.facets import clean_filters, count_facets, get_facets
+from apps.starships.models import CATALOG_VERSION, Manufacturer, Ship, ShipComponent
+from apps.starships.search import is_supported, search_ships, update_search_vectors
+from apps.starships.sync import ComponentSyncer, ShipUpserter, component_fields, upsert_manufacturers
+from apps.starships.typeahead import MAX_LIMIT, MAX_PREFIX, Suggestion, TypeaheadIndex
 
-# Create your tests here.
+
+def ship_record(api_id, name, code='AEGS', **extra):
+    record = {
+        'id': api_id,
+        'name': name,
+        'manufacturer': {'code': code, 'name': f'{code} Corp'},
+        'size': 'small',
+    }
+    record.update(extra)
+    return record
+
+
+class ShipUpserterTests(TestCase):
+    def test_bad_record_only_loses_itself(self):
+        records = [ship_record(f'ship-{n}', f'Ship {n}') for n in range(5)]
+        records[2]['length'] = 'not a number'
+
+        stats = ShipUpserter(batch_size=5).run(records)
+
+        self.assertEqual(stats.fetched, 5)
+        self.assertEqual(stats.created, 4)
+        self.assertEqual(stats.errors, 1)
+        self.assertEqual(
+            sorted(Ship.objects.values_list('api_id', flat=True)),
+            ['ship-0', 'ship-1', 'ship-3', 'ship-4'],
+        )
+
+    def test_rolled_back_manufacturer_is_created_again(self):
+        records = [
+            ship_record('bad', 'Bad', code='NEWM', length='not a number'),
+            ship_record('good', 'Good', code='NEWM'),
+        ]
+
+        stats = ShipUpserter(batch_size=1).run(records)
+
+        self.assertEqual((stats.created, stats.errors), (1, 1))
+        ship = Ship.objects.select_related('manufacturer').get(api_id='good')
+        self.assertEqual(ship.manufacturer.code, 'NEWM')
+        self.assertEqual(Manufacturer.objects.filter(code='NEWM').count(), 1)
+
+    def test_rolled_back_record_is_not_treated_as_seen(self):
+        records = [
+            ship_record('x', 'Ship X', length='not a number'),
+            ship_record('x', 'Ship X'),
+        ]
+
+        stats = ShipUpserter(batch_size=1).run(records)
+
+        self.assertEqual((stats.created, stats.skipped, stats.errors), (1, 0, 1))
+        self.assertTrue(Ship.objects.filter(api_id='x').exists())
+
+    def test_unchanged_records_are_skipped_on_the_next_run(self):
+        records = [ship_record(f'ship-{n}', f'Ship {n}') for n in range(3)]
+        ShipUpserter().run(records)
+
+        stats = ShipUpserter().run(records)
+
+        self.assertEqual((stats.created, stats.updated, stats.unchanged), (0, 0, 3))
+
+    def test_only_records_whose_payload_changed_are_written(self):
+        records = [ship_record(f'ship-{n}', f'Ship {n}') for n in range(3)]
+        ShipUpserter().run(records)
+        Ship.objects.filter(api_id='ship-1').update(role='Edited locally')
+        records[2]['role'] = 'Explorer'
+
+        stats = ShipUpserter().run(records)
+
+        self.assertEqual((stats.updated, stats.unchanged), (1, 2))
+        self.assertEqual(
+            dict(Ship.objects.values_list('api_id', 'role')),
+            {'ship-0': '', 'ship-1': 'Edited locally', 'ship-2': 'Explorer'},
+        )
+
+    def test_force_rewrites_rows_whose_columns_differ(self):
+        records = [ship_record(f'ship-{n}', f'Ship {n}') for n in range(3)]
+        ShipUpserter().run(records)
+        Ship.objects.filter(api_id='ship-1').update(name='Edited locally')
+
+        stats = ShipUpserter(force=True).run(records)
+
+        self.assertEqual((stats.updated, stats.unchanged), (1, 2))
+        self.assertEqual(Ship.objects.get(api_id='ship-1').name, 'Ship 1')
+
+
+def hardpoints(*weapons, shields=1):
+    return {
+        'compiled': {
+            'RSIWeapon': {'weapons': [dict(weapon) for weapon in weapons]},
+            'RSIModular': {
+                'shield_generators': [{'name': 'Shield', 'size': 'S', 'quantity': shields}],
+                'turrets': None,
+            },
+        },
+    }
+
+
+class ComponentFieldsTests(SimpleTestCase):
+    def test_hardpoints_are_mapped_to_component_rows(self):
+        rows = list(component_fields(hardpoints({'name': 'Cannon', 'size': 3, 'mounts': 2, 'type': 'weapons'})))
+
+        self.assertEqual(
+            [(row['component_type'], row['name'], row['size'], row['quantity'], row['mount_name']) for row in rows],
+            [('weapon', 'Cannon', '3', 2, 'weapons'), ('shield', 'Shield', 'S', 1, 'shield_generators')],
+        )
+
+    def test_unknown_and_malformed_entries(self):
+        data = {
+            'compiled': {
+                'RSIAvionic': {'radars': [{'quantity': 'lots'}, 'not a dict']},
+                'broken': ['not', 'a', 'group'],
+            },
+        }
+
+        rows = list(component_fields(data))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]['component_type'], rows[0]['name'], rows[0]['quantity']), ('misc', 'radars', 1))
+        self.assertEqual(list(component_fields({'compiled': 'none'})), [])
+        self.assertEqual(list(component_fields({})), [])
+
+
+class ComponentSyncerTests(TestCase):
+    def setUp(self):
+        self.ship = Ship.objects.create(
+            manufacturer=Manufacturer.objects.create(code='AEGS', name='Aegis'), name='Gladius', api_id='gladius'
+        )
+        self.cannon = {'name': 'Cannon', 'size': '3', 'quantity': 1}
+        ComponentSyncer().sync([(self.ship.pk, hardpoints(self.cannon, self.cannon))])
+
+    def components(self):
+        return sorted(self.ship.components.values_list('name', 'quantity'))
+
+    def test_components_are_created_from_hardpoints(self):
+        self.assertEqual(self.components(), [('Cannon', 1), ('Cannon', 1), ('Shield', 1)])
+
+    def test_unchanged_components_are_kept(self):
+        pks = set(ShipComponent.objects.values_list('pk', flat=True))
+
+        stats = ComponentSyncer().sync([(self.ship.pk, hardpoints(self.cannon, self.cannon))])
+
+        self.assertEqual((stats.created, stats.removed, stats.unchanged), (0, 0, 3))
+        self.assertEqual(set(ShipComponent.objects.values_list('pk', flat=True)), pks)
+
+    def test_only_changed_components_are_replaced(self):
+        shield = ShipComponent.objects.get(name='Shield')
+        updated_at = Ship.objects.get(pk=self.ship.pk).updated_at
+
+        stats = ComponentSyncer().sync([(self.ship.pk, hardpoints(self.cannon, shields=2))])
+
+        self.assertEqual((stats.created, stats.removed, stats.unchanged), (1, 2, 1))
+        self.assertEqual(self.components(), [('Cannon', 1), ('Shield', 2)])
+        self.assertFalse(ShipComponent.objects.filter(pk=shield.pk).exists())
+        self.assertGreater(Ship.objects.get(pk=self.ship.pk).updated_at, updated_at)
+
+    def test_rebuild_reads_the_stored_api_data(self):
+        Ship.objects.filter(pk=self.ship.pk).update(api_data=hardpoints(shields=3))
+
+        ComponentSyncer().rebuild([self.ship.pk])
+
+        self.assertEqual(self.components(), [('Shield', 3)])
+
+
+class ManufacturerNameTests(TestCase):
+    def test_ships_store_their_manufacturer_name(self):
+        ShipUpserter().run([ship_record('a', 'Avenger', code='AEGS')])
+        ship = Ship.objects.get(api_id='a')
+        self.assertEqual(ship.manufacturer_name, 'AEGS Corp')
+
+        ship.manufacturer = Manufacturer.objects.create(code='RSI', name='Roberts Space Industries')
+        ship.save()
+        self.assertEqual(Ship.objects.get(api_id='a').manufacturer_name, 'Roberts Space Industries')
+
+    def test_renaming_a_manufacturer_renames_its_ships(self):
+        ShipUpserter().run([ship_record('a', 'Avenger', code='AEGS'), ship_record('b', 'Aurora', code='RSI')])
+
+        upsert_manufacturers([{'code': 'AEGS', 'name': 'Aegis Dynamics'}])
+        self.assertEqual(
+            dict(Ship.objects.values_list('api_id', 'manufacturer_name')),
+            {'a': 'Aegis Dynamics', 'b': 'RSI Corp'},
+        )
+
+        manufacturer = Manufacturer.objects.get(code='RSI')
+        manufacturer.name = 'Roberts Space Industries'
+        manufacturer.save()
+        self.assertEqual(Ship.objects.get(api_id='b').manufacturer_name, 'Roberts Space Industries')
+
+
+class ShipDumpTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.ships = os.path.join(directory.name, 'ships.ndjson.gz')
+        self.manufacturers = os.path.join(directory.name, 'manufacturers.json')
+        upsert_manufacturers([{'code': 'AEGS', 'name': 'Aegis Dynamics', 'description': 'Military ships'}])
+        ShipUpserter().run([ship_record(f'ship-{n}', f'Ship {n}', length=10 + n) for n in range(3)])
+        Ship.objects.create(manufacturer=Manufacturer.objects.get(code='AEGS'), name='Local only', api_id='local')
+
+    def call(self, *args):
+        call_command(*args, stdout=io.StringIO())
+
+    def test_export_then_import_restores_the_catalog(self):
+        expected = list(Ship.objects.exclude(api_id='local').order_by('api_id').values_list('api_id', 'length'))
+        self.call('export_ships', self.ships, '--manufacturers', self.manufacturers)
+        Ship.objects.all().delete()
+        Manufacturer.objects.all().delete()
+
+        self.call('import_ships', self.ships, '--manufacturers', self.manufacturers)
+
+        self.assertEqual(list(Ship.objects.order_by('api_id').values_list('api_id', 'length')), expected)
+        self.assertEqual(Manufacturer.objects.get(code='AEGS').description, 'Military ships')
+
+    def test_importing_an_unchanged_dump_writes_nothing(self):
+        self.call('export_ships', self.ships)
+
+        out = io.StringIO()
+        call_command('import_ships', self.ships, stdout=out)
+
+        self.assertIn('Created: 0', out.getvalue())
+        self.assertIn('Updated: 0', out.getvalue())
+        self.assertIn('Unchanged: 3', out.getvalue())
+
+    def test_ships_without_api_data_are_left_out_of_the_export(self):
+        out = io.StringIO()
+        call_command('export_ships', self.ships, stdout=out)
+
+        self.assertIn('Wrote 3 ships', out.getvalue())
+        self.assertIn('Skipped 1 ships without API data', out.getvalue())
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        aegis = Manufacturer.objects.create(code='AEGS', name='Aegis Dynamics')
+        drake = Manufacturer.objects.create(code='DRAK', name='Drake Interplanetary')
+        Ship.objects.create(
+            manufacturer=aegis, name='Gladius', focus='Light Fighter', description='Faster than a Dragonfly',
+            api_id='gladius',
+        )
+        Ship.objects.create(manufacturer=aegis, name='Hammerhead', focus='Heavy Gun Ship', api_id='hammerhead')
+        Ship.objects.create(manufacturer=drake, name='Cutlass Black', focus='Medium Fighter', api_id='cutlass')
+        Ship.objects.create(manufacturer=drake, name='Dragonfly', description='A fighter of sorts', api_id='dragonfly')
+        update_search_vectors()
+
+    def search(self, text):
+        return list(search_ships(Ship.objects.all(), text).values_list('name', flat=True))
+
+    def test_every_word_must_match_somewhere(self):
+        self.assertEqual(self.search('drake fighter'), ['Cutlass Black', 'Dragonfly'])
+        self.assertEqual(self.search('aegis fighter'), ['Gladius'])
+        self.assertEqual(self.search('aegis cutlass'), [])
+
+    def test_name_matches_come_first(self):
+        # Alphabetically, Aegis ships would come before Drake ones
+        self.assertEqual(self.search('dragonfly'), ['Dragonfly', 'Gladius'])
+
+    def test_text_without_words_leaves_the_queryset_alone(self):
+        queryset = Ship.objects.order_by('api_id')
+
+        self.assertIs(search_ships(queryset, ' & | !'), queryset)
+
+    def test_query_operators_are_treated_as_plain_words(self):
+        self.assertEqual(self.search('glad:* & !drake'), self.search('glad drake'))
+
+    def test_vectors_are_only_stored_with_full_text_search(self):
+        updated = update_search_vectors(manufacturer_ids=Manufacturer.objects.filter(code='AEGS').values('pk'))
+
+        self.assertEqual(updated, 2 if is_supported() else 0)
+
+    def test_catalog_page_filters_by_the_search_box(self):
+        response = self.client.get('/ships/', {'q': 'drake fighter'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([ship.name for ship in response.context['ships']], ['Cutlass Black', 'Dragonfly'])
+
+
+def suggestion(kind, label, *texts):
+    return Suggestion(kind, label, '', f'/{label}/'), (label,) + texts
+
+
+class TypeaheadIndexTests(SimpleTestCase):
+    def setUp(self):
+        # In rank order, as catalog_entries() lists them
+        self.index = TypeaheadIndex([
+            suggestion('manufacturer', 'Crusader Industries', 'CRUS'),
+            suggestion('type', 'Combat'),
+            suggestion('ship', 'Ares Star Fighter', 'Crusader Industries', 'CRUS'),
+            suggestion('ship', 'C2 Hercules', 'Crusader Industries', 'CRUS'),
+            suggestion('ship', 'Cutlass Black', 'Drake Interplanetary', 'DRAK'),
+            suggestion('ship', 'Supercalifragilisticexpialidocious', 'Drake Interplanetary', 'DRAK'),
+        ])
+
+    def lookup(self, text, limit=10):
+        return [found.label for found in self.index.lookup(text, limit)]
+
+    def test_labels_starting_with_the_query_come_first(self):
+        self.assertEqual(
+            self.lookup('c'),
+            ['Crusader Industries', 'Combat', 'C2 Hercules', 'Cutlass Black', 'Ares Star Fighter'],
+        )
+        self.assertEqual(self.lookup('cr'), ['Crusader Industries', 'Ares Star Fighter', 'C2 Hercules'])
+
+    def test_every_word_must_prefix_a_word_of_the_suggestion(self):
+        self.assertEqual(self.lookup('crus star fi'), ['Ares Star Fighter'])
+        self.assertEqual(self.lookup('drake ares'), [])
+
+    def test_case_accents_and_punctuation_are_ignored(self):
+        self.assertEqual(self.lookup('CRÙSADER, ind.'), self.lookup('crusader ind'))
+        self.assertEqual(self.lookup('CRÙSADER, ind.')[0], 'Crusader Industries')
+
+    def test_limit(self):
+        self.assertEqual(self.lookup('c', limit=2), ['Crusader Industries', 'Combat'])
+        self.assertEqual(self.lookup('c', limit=0), [])
+        self.assertEqual(self.lookup(' ?! '), [])
+
+    def test_words_longer_than_the_indexed_prefix_are_compared_in_full(self):
+        word = 'supercalifragilisticexpialidocious'
+        self.assertGreater(len(word), MAX_PREFIX)
+
+        self.assertEqual(self.lookup(word), ['Supercalifragilisticexpialidocious'])
+        self.assertEqual(self.lookup(word[:MAX_PREFIX]), ['Supercalifragilisticexpialidocious'])
+        self.assertEqual(self.lookup(word[:MAX_PREFIX] + 'x'), [])
+        self.assertEqual(self.lookup(f'drake {word[:MAX_PREFIX]}x'), [])
+
+    def test_prefix_keys_are_capped(self):
+        self.assertLessEqual(max(len(key) for key in self.index.prefixes), MAX_PREFIX)
+        self.assertLessEqual(max(len(key) for key in self.index.phrases), MAX_PREFIX)
+
+
+class SuggestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        forget(CATALOG_VERSION)
+        # The index outlives each test's rolled back catalog
+        patcher = mock.patch.object(typeahead, '_index', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.drake = Manufacturer.objects.create(code='DRAK', name='Drake Interplanetary')
+            for n in range(MAX_LIMIT + 5):
+                Ship.objects.create(
+                    manufacturer=self.drake, name=f'Dragonfly {n:02}', type='Snub', api_id=f'dragonfly-{n}'
+                )
+
+    def suggest(self, **params):
+        response = self.client.get('/ships/suggest/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_suggestions_come_from_the_catalog(self):
+        results = self.suggest(q='drake')
+
+        self.assertEqual(results[0], {
+            'kind': 'manufacturer',
+            'label': 'Drake Interplanetary',
+            'detail': 'DRAK',
+            'url': '/ships/?manufacturer=DRAK',
+        })
+        self.assertEqual([result['kind'] for result in results[1:]], ['ship'] * 7)
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(len(self.suggest(q='dragonfly', limit='100')), MAX_LIMIT)
+        self.assertEqual(len(self.suggest(q='dragonfly', limit='3')), 3)
+        self.assertEqual(len(self.suggest(q='dragonfly', limit='-1')), 0)
+        self.assertEqual(len(self.suggest(q='dragonfly', limit='many')), typeahead.DEFAULT_LIMIT)
+
+    def test_index_is_rebuilt_when_the_catalog_changes(self):
+        self.assertEqual(self.suggest(q='cutlass'), [])
+        index = typeahead.get_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ship = Ship.objects.create(manufacturer=self.drake, name='Cutlass Black', api_id='cutlass')
+
+        self.assertEqual([result['url'] for result in self.suggest(q='cutlass')], [f'/ships/{ship.pk}/'])
+        self.assertIsNot(typeahead.get_index(), index)
+        self.assertIs(typeahead.get_index(), typeahead.get_index())
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        forget(CATALOG_VERSION)
+        makers = {
+            code: Manufacturer.objects.create(code=code, name=name)
+            for code, name in [('AEGS', 'Aegis'), ('DRAK', 'Drake'), ('RSI', 'Roberts Space Industries')]
+        }
+        for code, name, ship_type, size, status in [
+            ('AEGS', 'Gladius', 'combat', 'small', 'flight_ready'),
+            ('AEGS', 'Hammerhead', 'combat', 'large', 'flight_ready'),
+            ('AEGS', 'Nautilus', 'combat', 'capital', 'concept'),
+            ('DRAK', 'Cutlass', 'multi', 'medium', 'flight_ready'),
+            ('DRAK', 'Kraken', 'multi', 'capital', 'concept'),
+            ('RSI', 'Zeus', '', 'medium', ''),
+        ]:
+            Ship.objects.create(
+                manufacturer=makers[code], name=name, type=ship_type, size=size, api_id=name.lower(),
+                is_flight_ready=status == 'flight_ready', is_concept=status == 'concept',
+            )
+
+    def test_counts_without_filters(self):
+        self.assertEqual(count_facets({}), {
+            'manufacturer': [('AEGS', 'Aegis', 3), ('DRAK', 'Drake', 2), ('RSI', 'Roberts Space Industries', 1)],
+            'type': [('combat', 'combat', 3), ('multi', 'multi', 2)],
+            'size': [('small', '', 1), ('medium', '', 2), ('large', '', 1), ('capital', '', 2)],
+            'status': [('flight_ready', '', 3), ('concept', '', 2)],
+        })
+
+    def test_each_facet_ignores_its_own_filter(self):
+        counts = count_facets({'manufacturer': 'DRAK', 'size': 'capital'})
+
+        # Manufacturers among capital ships, sizes among Drake ships
+        self.assertEqual(counts['manufacturer'], [('AEGS', 'Aegis', 1), ('DRAK', 'Drake', 1)])
+        self.assertEqual(counts['size'], [('medium', '', 1), ('capital', '', 1)])
+        self.assertEqual(counts['type'], [('multi', 'multi', 1)])
+        self.assertEqual(counts['status'], [('concept', '', 1)])
+
+    def test_selected_options_are_kept_without_ships(self):
+        facets = get_facets({'manufacturer': 'RSI', 'type': 'combat'})
+
+        self.assertEqual([(option.value, option.count, option.selected) for option in facets['type']], [
+            ('combat', 0, True),
+        ])
+        selected = [option for option in facets['manufacturer'] if option.selected]
+        self.assertEqual([(option.value, option.count) for option in selected], [('RSI', 0)])
+
+    def test_choice_labels_are_filled_in(self):
+        facets = get_facets({})
+
+        self.assertEqual([option.label for option in facets['size']], ['Small', 'Medium', 'Large', 'Capital'])
+        self.assertEqual([option.label for option in facets['status']], ['Flight Ready', 'Concept'])
+
+    def test_unknown_and_empty_filters_are_dropped(self):
+        params = {'manufacturer': ' DRAK ', 'type': '', 'status': 'sold', 'q': 'cutlass'}
+
+        self.assertEqual(clean_filters(params), {'manufacturer': 'DRAK'})
+
+    def test_counts_are_cached_until_the_catalog_changes(self):
+        filters = {'manufacturer': 'AEGS'}
+        get_facets(filters)
+
+        with self.assertNumQueries(0):
+            get_facets(filters)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ship.objects.filter(name='Nautilus').get().delete()
+
+        self.assertEqual(
+            [(option.value, option.count) for option in get_facets(filters)['size']],
+            [('small', 1), ('large', 1)],
+        )
+
+
+class ShipCardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.aegis = Manufacturer.objects.create(code='AEGS', name='Aegis')
+        drake = Manufacturer.objects.create(code='DRAK', name='Drake')
+        for manufacturer, name in [(self.aegis, 'Gladius'), (self.aegis, 'Sabre'), (drake, 'Cutlass')]:
+            Ship.objects.create(manufacturer=manufacturer, name=name, api_id=name.lower())
+
+    def ships(self):
+        return Ship.objects.select_related('manufacturer').order_by('name')
+
+    def render(self):
+        with mock.patch.object(fragments, 'render_to_string', wraps=fragments.render_to_string) as render:
+            cards = fragments.render_cards(self.ships())
+        return cards, [call.args[1]['ship'].name for call in render.call_args_list]
+
+    def test_cards_are_rendered_once(self):
+        cards, rendered = self.render()
+        self.assertEqual(rendered, ['Cutlass', 'Gladius', 'Sabre'])
+        self.assertIn('Gladius', cards[1])
+
+        cached, rendered = self.render()
+
+        self.assertEqual(rendered, [])
+        self.assertEqual(cached, cards)
+
+    def test_a_page_reads_and_writes_the_cache_once(self):
+        with mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            self.render()
+        with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+            self.render()
+
+        set_many.assert_called_once()
+        get_many.assert_called_once()
+
+    def test_edited_ship_is_rendered_again(self):
+        self.render()
+        ship = Ship.objects.get(name='Sabre')
+        ship.is_flight_ready = True
+        ship.save()
+
+        cards, rendered = self.render()
+
+        self.assertEqual(rendered, ['Sabre'])
+        self.assertIn('Flight Ready', cards[2])
+
+    def test_renamed_manufacturer_renders_its_ships_again(self):
+        self.render()
+        self.aegis.name = 'Aegis Dynamics'
+        self.aegis.save()
+
+        cards, rendered = self.render()
+
+        self.assertEqual(rendered, ['Gladius', 'Sabre'])
+        self.assertIn('Aegis Dynamics', cards[1])
+
+    def test_cards_are_cached_per_language(self):
+        self.render()
+
+        with translation.override('de'):
+            _cards, rendered = self.render()
+
+        self.assertEqual(len(rendered), 3)
@@ -0,0 +1,173 @@
+"""
+In-process typeahead index for the ship catalog search box.
+
+The index holds every manufacturer (by name and code), ship type and ship
+(by name and manufacturer) as a suggestion. Each suggestion is reachable
+through a dict keyed on every prefix of its words. Lookups therefore never
+touch the database and take a few dict reads. The index is built once per
+process and rebuilt when the catalog data version moves on; see
+``apps.core.versions``.
+
+Suggestions are ranked statically, with manufacturers first, then types, then
+ships, each alphabetically. Suggestions whose label starts with the whole
+query come before those that only match word by word.
+"""
+import logging
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from django.urls import reverse
+from django.utils.http import urlencode
+from apps.core.versions import current
+from .models import CATALOG_VERSION, Manufacturer, Ship
+from .search import WORD
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+# Longer words are looked up by this prefix and then compared in full
+MAX_PREFIX = 20
+
+
+def normalize(text: str) -> str:
+    """Lowercase text and strip accents, so "Crusader" matches "crusader"."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def words(text: str) -> List[str]:
+    return WORD.findall(normalize(text))
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    kind: str
+    label: str
+    detail: str
+    url: str
+
+    def as_dict(self) -> Dict[str, str]:
+        return {'kind': self.kind, 'label': self.label, 'detail': self.detail, 'url': self.url}
+
+
+class TypeaheadIndex:
+    """
+    Prefix index over catalog suggestions.
+
+    ``prefixes`` maps every prefix of every word to the suggestions holding
+    that word, and ``phrases`` maps every prefix of every normalized label
+    to the suggestions with that label, both in rank order.
+    """
+
+    def __init__(self, entries: Sequence[Tuple[Suggestion, Sequence[str]]], version: int = 0):
+        self.version = version
+        self.suggestions: List[Suggestion] = []
+        self.tokens: List[Tuple[str, ...]] = []
+        self.labels: List[str] = []
+        self.prefixes: Dict[str, List[int]] = {}
+        self.phrases: Dict[str, List[int]] = {}
+
+        for suggestion, texts in entries:
+            position = len(self.suggestions)
+            tokens = tuple(dict.fromkeys(word for text in texts for word in words(text)))
+            phrase = ' '.join(words(suggestion.label))
+            self.suggestions.append(suggestion)
+            self.tokens.append(tokens)
+            self.labels.append(phrase)
+            keys = {token[:length] for token in tokens for length in range(1, min(len(token), MAX_PREFIX) + 1)}
+            for key in keys:
+                self.prefixes.setdefault(key, []).append(position)
+            for length in range(1, min(len(phrase), MAX_PREFIX) + 1):
+                self.phrases.setdefault(phrase[:length], []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.suggestions)
+
+    def matches(self, position: int, query: Sequence[str]) -> bool:
+        """Whether every query word is a prefix of one of the suggestion's words."""
+        tokens = self.tokens[position]
+        return all(any(token.startswith(word) for token in tokens) for word in query)
+
+    def lookup(self, text: str, limit: int = DEFAULT_LIMIT) -> List[Suggestion]:
+        """
+        Suggestions for search box input, best first.
+
+        Args:
+            text: What has been typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            Up to ``limit`` suggestions; none when the text holds no words
+        """
+        query = words(text)
+        if not query or limit < 1:
+            return []
+
+        found: List[int] = []
+        seen = set()
+        phrase = ' '.join(query)
+        for position in self.phrases.get(phrase[:MAX_PREFIX], ()):
+            if len(found) == limit:
+                break
+            if len(phrase) <= MAX_PREFIX or self.labels[position].startswith(phrase):
+                found.append(position)
+                seen.add(position)
+
+        if len(found) < limit:
+            # Scan the rarest word's list and check the others against each candidate
+            candidates = min((self.prefixes.get(word[:MAX_PREFIX], ()) for word in query), key=len)
+            for position in candidates:
+                if len(found) == limit:
+                    break
+                if position not in seen and self.matches(position, query):
+                    found.append(position)
+
+        return [self.suggestions[position] for position in found]
+
+
+def catalog_entries() -> List[Tuple[Suggestion, Sequence[str]]]:
+    """Read the catalog into suggestions and their searchable texts, in rank order."""
+    ship_list = reverse('starships:ship_list')
+    entries = []
+    for code, name in Manufacturer.objects.order_by('name', 'code').values_list('code', 'name'):
+        url = f"{ship_list}?{urlencode({'manufacturer': code})}"
+        entries.append((Suggestion('manufacturer', name, code, url), (name, code)))
+
+    ship_types = Ship.objects.exclude(type='').order_by('type').values_list('type', flat=True).distinct()
+    for ship_type in ship_types:
+        url = f"{ship_list}?{urlencode({'type': ship_type})}"
+        entries.append((Suggestion('type', ship_type, '', url), (ship_type,)))
+
+    ships = Ship.objects.order_by('name', 'manufacturer__name', 'pk').values_list(
+        'pk', 'name', 'manufacturer__name', 'manufacturer__code'
+    )
+    for pk, name, manufacturer_name, manufacturer_code in ships:
+        url = reverse('starships:ship_detail', args=[pk])
+        texts = (name, manufacturer_name, manufacturer_code)
+        entries.append((Suggestion('ship', name, manufacturer_name, url), texts))
+    return entries
+
+
+_lock = threading.Lock()
+_index: Optional[TypeaheadIndex] = None
+
+
+def get_index() -> TypeaheadIndex:
+    """The index for the current catalog version, rebuilt first if the catalog changed."""
+    global _index
+    version = current(CATALOG_VERSION)
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _lock:
+        if _index is None or _index.version != version:
+            _index = TypeaheadIndex(catalog_entries(), version)
+            logger.info(f"Built typeahead index of {len(_index)} suggestions for catalog v{version}")
+        return _index
+
+
+def suggest(text: str, limit: int = DEFAULT_LIMIT) -> List[Suggestion]:
+    """Typeahead suggestions for search box input."""
+    return get_index().lookup(text, max(0, min(limit, MAX_LIMIT)))
@@ -7,4 +7,5 @@ app_name = 'starships'
 urlpatterns = [
     path('', views.ShipListView.as_view(), name='ship_list'),
     path('<int:pk>/', views.ShipDetailView.as_view(), name='ship_detail'),
+    path('suggest/', views.ship_suggest, name='ship_suggest'),
 ]
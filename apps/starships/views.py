@@ -1,57 +1,79 @@
 """Starships views."""
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_GET
 from django.views.generic import ListView, DetailView
-from django.db.models import Q
-from .models import Ship, Manufacturer
+from apps.core.page_cache import cache_anonymous_page
+from apps.core.pagination import InvalidCursor, KeysetPaginator, estimate_count
+from .facets import clean_filters, filter_ships, get_facets
+from .fragments import fragment_timeout, render_cards
+from .models import CATALOG_VERSION, Ship
+from .search import search_ships
+from .typeahead import DEFAULT_LIMIT, suggest
 
+# Query parameters the catalog list reads; others don't change the page
+LIST_PARAMS = ['q', 'manufacturer', 'type', 'size', 'status', 'cursor']
 
+
+@method_decorator(cache_anonymous_page(CATALOG_VERSION, params=LIST_PARAMS), name='dispatch')
 class ShipListView(ListView):
-    """Ship catalog with search and filters."""
+    """Ship catalog with search and filters, paginated by cursor."""
     model = Ship
     template_name = 'starships/ship_list.html'
     context_object_name = 'ships'
     paginate_by = 50
+    # Show the number of matching ships, estimated by the planner on PostgreSQL
+    show_total = True
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.filters = clean_filters(request.GET)
 
     def get_queryset(self):
-        queryset = Ship.objects.select_related('manufacturer').all()
+        # The search vector is only used inside the database
+        queryset = Ship.objects.select_related('manufacturer').defer('search_vector')
+        queryset = filter_ships(queryset, self.filters).order_by('manufacturer_name', 'name', 'pk')
 
-        # Search
+        # Search, best matches first
         search = self.request.GET.get('q')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(manufacturer__name__icontains=search) |
-                Q(type__icontains=search)
-            )
-
-        # Filters
-        manufacturer = self.request.GET.get('manufacturer')
-        if manufacturer:
-            queryset = queryset.filter(manufacturer__code=manufacturer)
+            queryset = search_ships(queryset, search)
 
-        ship_type = self.request.GET.get('type')
-        if ship_type:
-            queryset = queryset.filter(type=ship_type)
+        return queryset
 
-        size = self.request.GET.get('size')
-        if size:
-            queryset = queryset.filter(size=size)
+    def paginate_queryset(self, queryset, page_size):
+        """Page by cursor over the queryset's ordering, so deep pages cost the same as the first."""
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            page = paginator.page()
+        return paginator, page, page.object_list, page.has_other_pages()
 
-        status = self.request.GET.get('status')
-        if status == 'flight_ready':
-            queryset = queryset.filter(is_flight_ready=True)
-        elif status == 'concept':
-            queryset = queryset.filter(is_concept=True)
-
-        return queryset.order_by('manufacturer__name', 'name')
+    def page_query(self, cursor):
+        """The current query string with the cursor replaced."""
+        params = {name: self.request.GET.get(name, '') for name in LIST_PARAMS}
+        params['cursor'] = cursor
+        return urlencode({name: value for name, value in params.items() if value})
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['manufacturers'] = Manufacturer.objects.all()
-        context['ship_types'] = Ship.objects.values_list('type', flat=True).distinct()
-        context['ship_sizes'] = Ship.objects.values_list('size', flat=True).distinct()
+        page = context['page_obj']
+        if page.has_next:
+            context['next_query'] = self.page_query(page.next_cursor)
+        if page.has_previous:
+            context['previous_query'] = self.page_query(page.previous_cursor)
+        if self.show_total:
+            context['total'] = estimate_count(self.object_list)
+        # Filter options with counts, cached until the catalog changes
+        context['facets'] = get_facets(self.filters)
+        context['cards'] = render_cards(context['ships'])
         return context
 
 
+@method_decorator(cache_anonymous_page(CATALOG_VERSION), name='dispatch')
 class ShipDetailView(DetailView):
     """Ship detail page."""
     model = Ship
@@ -59,4 +81,22 @@ class ShipDetailView(DetailView):
     context_object_name = 'ship'
 
     def get_queryset(self):
-        return Ship.objects.select_related('manufacturer').prefetch_related('components')
+        # Components are only read when the cached specifications need rendering
+        return Ship.objects.select_related('manufacturer').defer('search_vector')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['fragment_timeout'] = fragment_timeout()
+        return context
+
+
+@require_GET
+@cache_control(public=True, max_age=60)
+def ship_suggest(request):
+    """Typeahead suggestions for the catalog search box, served from memory."""
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    results = suggest(request.GET.get('q', ''), limit)
+    return JsonResponse({'results': [suggestion.as_dict() for suggestion in results]})
@@ -200,6 +200,49 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Star Citizen API
+STARCITIZEN_API_KEY = config('STARCITIZEN_API_KEY', default='')
+STARCITIZEN_API_CONCURRENCY = config('STARCITIZEN_API_CONCURRENCY', default=8, cast=int)
+# Organizations refreshed by sync_all, comma-separated SIDs
+STARCITIZEN_ORG_SIDS = config(
+    'STARCITIZEN_ORG_SIDS',
+    default='',
+    cast=lambda v: [s.strip().upper() for s in v.split(',') if s.strip()]
+)
+# Request pacing, retries and circuit breaker
+STARCITIZEN_API_TIMEOUT = config('STARCITIZEN_API_TIMEOUT', default=30, cast=float)
+STARCITIZEN_API_CONNECT_TIMEOUT = config('STARCITIZEN_API_CONNECT_TIMEOUT', default=5, cast=float)
+STARCITIZEN_API_RATE_LIMIT = config('STARCITIZEN_API_RATE_LIMIT', default=5, cast=float)  # requests/second per endpoint, 0 disables
+STARCITIZEN_API_RATE_BURST = config('STARCITIZEN_API_RATE_BURST', default=10, cast=int)
+STARCITIZEN_API_MAX_RETRIES = config('STARCITIZEN_API_MAX_RETRIES', default=3, cast=int)
+STARCITIZEN_API_BACKOFF_BASE = config('STARCITIZEN_API_BACKOFF_BASE', default=0.5, cast=float)
+STARCITIZEN_API_BACKOFF_MAX = config('STARCITIZEN_API_BACKOFF_MAX', default=30, cast=float)
+STARCITIZEN_API_CIRCUIT_THRESHOLD = config('STARCITIZEN_API_CIRCUIT_THRESHOLD', default=5, cast=int)  # 0 disables
+STARCITIZEN_API_CIRCUIT_RESET = config('STARCITIZEN_API_CIRCUIT_RESET', default=60, cast=float)
+# In-process cache in front of the shared cache for API payloads
+STARCITIZEN_API_LOCAL_CACHE_SIZE = config('STARCITIZEN_API_LOCAL_CACHE_SIZE', default=128, cast=int)
+STARCITIZEN_API_LOCAL_CACHE_TIMEOUT = config('STARCITIZEN_API_LOCAL_CACHE_TIMEOUT', default=5, cast=float)
+# Serialization of cached API payloads: pickle, zlib or lz4 (needs the lz4 package)
+STARCITIZEN_API_CACHE_CODEC = config('STARCITIZEN_API_CACHE_CODEC', default='zlib')
+STARCITIZEN_API_CACHE_COMPRESS_MIN_SIZE = config('STARCITIZEN_API_CACHE_COMPRESS_MIN_SIZE', default=1024, cast=int)
+STARCITIZEN_API_CACHE_MAX_ITEM_SIZE = config('STARCITIZEN_API_CACHE_MAX_ITEM_SIZE', default=1024 * 1024, cast=int)
+
+# Background sync jobs (run_sync_worker)
+SYNC_JOB_LEASE_SECONDS = config('SYNC_JOB_LEASE_SECONDS', default=300, cast=int)
+SYNC_WORKER_POLL_INTERVAL = config('SYNC_WORKER_POLL_INTERVAL', default=10, cast=float)
+
+# Seconds a process trusts its copy of a data version (see apps.core.versions)
+# before checking the shared cache again, e.g. to rebuild the ship typeahead index
+DATA_VERSION_CHECK_INTERVAL = config('DATA_VERSION_CHECK_INTERVAL', default=5, cast=float)
+# Seconds cached ship catalog filter counts are kept; catalog writes replace them sooner
+SHIP_FACETS_CACHE_TIMEOUT = config('SHIP_FACETS_CACHE_TIMEOUT', default=86400, cast=int)
+# Seconds rendered ship cards and specifications stay cached; edited ships get new keys
+SHIP_FRAGMENT_CACHE_TIMEOUT = config('SHIP_FRAGMENT_CACHE_TIMEOUT', default=86400, cast=int)
+# Whole catalog pages cached for anonymous visitors (apps.core.page_cache):
+# seconds kept in the shared cache, and pages kept in memory per process
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=3600, cast=int)
+PAGE_CACHE_LOCAL_SIZE = config('PAGE_CACHE_LOCAL_SIZE', default=256, cast=int)
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -20,6 +20,7 @@ urlpatterns = [
     # Core views
     path('', core_views.home, name='home'),
     path('dashboard/', core_views.dashboard, name='dashboard'),
+    path('export/<slug:dataset>/', core_views.export, name='export'),
 
     # Apps
     path('ships/', include('apps.starships.urls')),